@@ -4,15 +4,28 @@
 #######################################################
 
 import os
-import copy
+import warnings
+from collections import deque
+from multiprocessing import shared_memory
 from PIL import Image, ImageDraw
-from scipy.spatial import Delaunay                  # pip install scipy
-from scipy.interpolate import RectBivariateSpline   # pip install scipy
+from scipy.spatial import Delaunay, ConvexHull, QhullError  # pip install scipy
 import numpy as np                                  # pip install numpy
 
+try:
+    import cv2                                      # pip install opencv-python-headless (optional, enables the 'cv2' backend)
+except ImportError:
+    cv2 = None
+
 # Module  level  Variables
 #######################################################
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MIN_TRIANGLE_AREA = 1e-6     # Triangles with an absolute area below this (in pixels) are considered degenerate
+AREA_TOLERANCE = 1e-9        # Relative error allowed between the areas of a locally re-triangulated region of a Triangulation and its hole
+BAND_PIXELS = 1 << 18        # Number of pixels rendered per band, which bounds the size of Morpher's float scratch buffers
+READ_AHEAD = 4               # Default number of frames Morpher.iterFrames() keeps in flight on a worker pool
+PREVIEW_PIXELS = 1 << 19     # Size (in pixels) up to which a preview of Morpher.getPreview() is rendered - about half a megapixel
+ATTACHED_LIMIT = 4           # Number of live shared Morphers a process keeps attached before detaching the oldest one
+attachedMorphers = {}        # Morphers attached by this process through attachMorpher(), keyed by handle (oldest first)
 
 def loadTriangles(leftPointFilePath: str, rightPointFilePath: str) -> tuple:
     leftTriList = []
@@ -33,6 +46,31 @@ def loadTriangles(leftPointFilePath: str, rightPointFilePath: str) -> tuple:
     return leftTriList, rightTriList
 
 
+# Same as loadTriangles(), but returns the mesh as one Mesh of arrays instead of two lists of Triangles.
+# Raises a ValueError naming the file when a point file can't make a mesh, e.g. one left empty by the GUI's reset.
+def loadMesh(leftPointFilePath: str, rightPointFilePath: str):
+    arrays = []
+    for path in (leftPointFilePath, rightPointFilePath):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Empty point files are reported below
+            array = np.loadtxt(path, dtype=np.float64, ndmin=2)
+        if array.size and array.shape[1] != 2:
+            raise ValueError('Point file ' + path + ' is not made of "x y" pairs')
+        if len(array) < 3:
+            raise ValueError('Point file ' + path + ' has fewer than three points (was it reset?)')
+        arrays.append(array)
+    leftArray, rightArray = arrays
+    if len(leftArray) != len(rightArray):
+        raise ValueError('Point files ' + leftPointFilePath + ' and ' + rightPointFilePath + ' do not have the same number of points')
+    try:
+        simplices = Delaunay(leftArray).simplices
+    except QhullError:
+        raise ValueError('Point file ' + leftPointFilePath + ' has no three points that don\'t lie on a single line')
+    return Mesh(leftArray, rightArray, simplices)
+
+
+# View of one triangle of a mesh (a (3, 2) float64 array of its vertices), kept for code built on lists of Triangles.
+# Morpher works on a Mesh, which converts to and from them (Mesh.getTriangles() / meshFromTriangles()).
 class Triangle:
     def __init__(self, vertices):
         if isinstance(vertices, np.ndarray) == 0:
@@ -53,8 +91,382 @@ class Triangle:
 
         return coordArray
 
+# Returns the signed area of every triangle in an (N, 3, 2) stack of vertices.
+# A (near) zero area marks a degenerate triangle that has no invertible affine transformation.
+def triangleAreas(vertices):
+    edgeA = vertices[:, 1] - vertices[:, 0]
+    edgeB = vertices[:, 2] - vertices[:, 0]
+    return (edgeA[:, 0] * edgeB[:, 1] - edgeA[:, 1] * edgeB[:, 0]) / 2
+
+
+# Solves the affine transformation of every triangle pair at once.
+# Returns an (N, 3, 3) stack of matrices mapping targetVertices onto sourceVertices (i.e. the inverse projection),
+# with the identity in place of any triangle flagged False in the optional valid mask.
+def affineTransforms(sourceVertices, targetVertices, valid=None):
+    count = len(targetVertices)
+    homogeneous = np.ones((count, 3, 3), dtype=np.float64)
+    homogeneous[:, :, :2] = targetVertices
+    solution = np.zeros((count, 3, 2), dtype=np.float64)
+    solution[:, :, :] = sourceVertices
+    if valid is not None:
+        homogeneous[~valid] = np.eye(3)
+        solution[~valid] = np.eye(3)[:, :2]
+    transforms = np.zeros((count, 3, 3), dtype=np.float64)
+    transforms[:, :2, :] = np.transpose(np.linalg.solve(homogeneous, solution), (0, 2, 1))
+    transforms[:, 2, 2] = 1
+    return transforms
+
+
+# Rasterization stage: draws every triangle of a target mesh into one integer label map (pixel → triangle index).
+# Pixels outside of the mesh (or belonging to triangles flagged False in the optional valid mask) are labelled -1.
+# Triangles are drawn in order, so a pixel on a shared edge belongs to the last triangle that covers it.
+def rasterizeTriangles(vertices, height, width, valid=None):
+    labelImage = Image.new('I', (width, height), -1)
+    draw = ImageDraw.Draw(labelImage)
+    for index in (range(len(vertices)) if valid is None else np.flatnonzero(valid)):
+        draw.polygon(tuple(map(tuple, vertices[index])), outline=int(index), fill=int(index))
+    return np.asarray(labelImage, dtype=np.int32)
+
+
+# Returns a key per triangle pair of a mesh (its left and right vertices, in order) as an array of raw bytes, used with
+# np.isin() to tell which triangles of a mesh survived an edit of its points. The order of the vertices is part of the key
+# because PIL assigns the pixels on a triangle's edges differently depending on the vertex its outline starts from.
+def triangleKeys(leftVertices, rightVertices):
+    rows = np.ascontiguousarray(np.concatenate((leftVertices, rightVertices), axis=2), dtype=np.float64)
+    return rows.reshape(len(rows), -1).view(np.dtype((np.void, 3 * 4 * 8))).reshape(-1)
+
+
+# Returns the directed edges (N * 3, 2) of an (N, 3) stack of simplices: (a, b), (b, c) and (c, a) of every triangle, in order.
+def simplexEdges(simplices):
+    return np.stack((simplices, np.roll(simplices, -1, axis=1)), axis=2).reshape(-1, 2)
+
+
+# Structure-of-arrays mesh of a pair of corresponding point sets: the (N, 2) left and right points and the (M, 3) simplices they
+# share, along with the per-triangle data derived from them - (M, 3, 2) vertices, (M, 4) bounding boxes (min x, min y, max x,
+# max y) and signed areas - as contiguous read-only arrays. The input arrays are kept as they are when possible (e.g. views of
+# shared memory), and a Mesh pickles as its points and simplices only.
+# Morpher works on a Mesh; getTriangles() returns the Triangle lists of older code, as views of the vertex arrays.
+class Mesh:
+    def __init__(self, leftPoints, rightPoints, simplices):
+        self.leftPoints = readOnly(np.ascontiguousarray(leftPoints, dtype=np.float64))
+        self.rightPoints = readOnly(np.ascontiguousarray(rightPoints, dtype=np.float64))
+        self.simplices = readOnly(np.ascontiguousarray(simplices, dtype=np.intp))
+        if self.leftPoints.ndim != 2 or self.leftPoints.shape[1] != 2:
+            raise ValueError('Input leftPoints is not an (N, 2) array')
+        if self.rightPoints.shape != self.leftPoints.shape:
+            raise ValueError('Input rightPoints does not have the dimensions of leftPoints')
+        if self.simplices.ndim != 2 or self.simplices.shape[1] != 3:
+            raise ValueError('Input simplices is not an (M, 3) array')
+        if self.simplices.size and (self.simplices.min() < 0 or self.simplices.max() >= len(self.leftPoints)):
+            raise ValueError('Input simplices refers to points that do not exist')
+        self.leftVertices = readOnly(self.leftPoints[self.simplices])
+        self.rightVertices = readOnly(self.rightPoints[self.simplices])
+        self.leftBounds = readOnly(np.concatenate((self.leftVertices.min(axis=1), self.leftVertices.max(axis=1)), axis=1))
+        self.rightBounds = readOnly(np.concatenate((self.rightVertices.min(axis=1), self.rightVertices.max(axis=1)), axis=1))
+        self.leftAreas = readOnly(triangleAreas(self.leftVertices))
+        self.rightAreas = readOnly(triangleAreas(self.rightVertices))
+
+    def __len__(self):
+        return len(self.simplices)
+
+    def __reduce__(self):
+        return Mesh, (self.leftPoints, self.rightPoints, self.simplices)
+
+    # Returns the mesh as lists of left and right Triangles, like loadTriangles().
+    def getTriangles(self):
+        return [Triangle(x) for x in self.leftVertices], [Triangle(y) for y in self.rightVertices]
+
+
+# Returns a read-only view of an array, which can't be modified by accident through the object holding it.
+def readOnly(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+# Returns the Mesh of two lists of corresponding Triangles, whose vertices become its points (three per triangle).
+def meshFromTriangles(leftTriangles, rightTriangles):
+    if type(leftTriangles) != list:
+        raise TypeError('Input leftTriangles is not of type List')
+    for j in leftTriangles:
+        if isinstance(j, Triangle) == 0:
+            raise TypeError('Element of input leftTriangles is not of Class Triangle')
+    if type(rightTriangles) != list:
+        raise TypeError('Input rightTriangles is not of type List')
+    for k in rightTriangles:
+        if isinstance(k, Triangle) == 0:
+            raise TypeError('Element of input rightTriangles is not of Class Triangle')
+    if len(leftTriangles) != len(rightTriangles):
+        raise ValueError('Input leftTriangles and rightTriangles do not have the same length')
+    leftPoints = np.array([x.vertices for x in leftTriangles], dtype=np.float64).reshape(-1, 2)
+    rightPoints = np.array([y.vertices for y in rightTriangles], dtype=np.float64).reshape(-1, 2)
+    return Mesh(leftPoints, rightPoints, np.arange(len(leftPoints)).reshape(-1, 3))
+
+
+# In-memory Delaunay triangulation of a pair of corresponding point sets, which is kept up to date as points are added, moved and
+# deleted instead of being rebuilt from the point files. Like loadTriangles(), the left points are triangulated and the right
+# points share their simplices (getVertices() / getMesh()).
+# Additions go through SciPy's incremental Qhull (Delaunay.add_points()) for as long as the mesh has only grown since it was
+# built. Deleting or moving a point re-triangulates the hole it leaves (and the cavity of its new position) locally, which is
+# checked by area - should a local update fail that check (e.g. on cocircular points), the mesh is rebuilt instead.
+class Triangulation:
+    def __init__(self, leftPoints=(), rightPoints=()):
+        self.setPoints(leftPoints, rightPoints)
+
+    def __len__(self):
+        return len(self.leftPoints)
+
+    # Replaces every point and rebuilds the mesh.
+    def setPoints(self, leftPoints, rightPoints):
+        leftPoints = np.array(leftPoints, dtype=np.float64).reshape(-1, 2)
+        rightPoints = np.array(rightPoints, dtype=np.float64).reshape(-1, 2)
+        if leftPoints.shape != rightPoints.shape:
+            raise ValueError("Input point arrays do not have the same number of points.")
+        self.leftPoints = leftPoints
+        self.rightPoints = rightPoints
+        self.build()
+
+    # Triangulates every point from scratch (but the one at index exclude, if given). Fewer than three points, or collinear
+    # ones, leave the mesh empty.
+    def build(self, exclude=None):
+        self.delaunay = None
+        self.simplices = np.empty((0, 3), dtype=np.intp)
+        indices = np.delete(np.arange(len(self.leftPoints)), [] if exclude is None else [exclude])
+        if len(indices) >= 3:
+            try:
+                delaunay = Delaunay(self.leftPoints[indices], incremental=len(indices) > 3)  # Incremental Qhull needs four points to start
+            except QhullError:
+                return
+            self.setSimplices(indices[delaunay.simplices])
+            if exclude is None and len(indices) > 3:
+                self.delaunay = delaunay  # Kept for incremental additions until the next local update
+
+    # Stores the simplices with their vertices in counter-clockwise order (positive area), which the local updates rely on.
+    def setSimplices(self, simplices):
+        simplices = np.array(simplices, dtype=np.intp).reshape(-1, 3)
+        flipped = triangleAreas(self.leftPoints[simplices]) < 0
+        simplices[flipped] = simplices[flipped][:, ::-1]
+        self.simplices = simplices
+
+    # Returns the (N, 3, 2) left and right vertices of every triangle of the mesh.
+    def getVertices(self):
+        return self.leftPoints[self.simplices], self.rightPoints[self.simplices]
+
+    # Returns a snapshot of the mesh as a Mesh (e.g. for a Morpher), which later edits don't affect.
+    def getMesh(self):
+        return Mesh(self.leftPoints.copy(), self.rightPoints.copy(), self.simplices.copy())
+
+    # Returns the mesh as lists of left and right Triangles, like loadTriangles().
+    def getTriangles(self):
+        return self.getMesh().getTriangles()
+
+    # Appends one point pair (or a stack of them) to the end of both point sets.
+    def addPoints(self, leftPoints, rightPoints):
+        leftPoints = np.array(leftPoints, dtype=np.float64).reshape(-1, 2)
+        rightPoints = np.array(rightPoints, dtype=np.float64).reshape(-1, 2)
+        if leftPoints.shape != rightPoints.shape:
+            raise ValueError("Input point arrays do not have the same number of points.")
+        start = len(self.leftPoints)
+        self.leftPoints = np.concatenate((self.leftPoints, leftPoints))
+        self.rightPoints = np.concatenate((self.rightPoints, rightPoints))
+        if self.delaunay is not None:
+            self.delaunay.add_points(leftPoints)
+            self.setSimplices(self.delaunay.simplices)
+        elif len(self.simplices):
+            for index in range(start, len(self.leftPoints)):
+                self.insertVertex(index)
+        else:
+            self.build()
+
+    # Removes the point pair at the given index; the indices of the following points shift down by one.
+    def deletePoint(self, index):
+        self.removeVertex(index)
+        self.leftPoints = np.delete(self.leftPoints, index, axis=0)
+        self.rightPoints = np.delete(self.rightPoints, index, axis=0)
+        self.simplices[self.simplices > index] -= 1
+        if not len(self.simplices):
+            self.build()
+
+    # Inserts a point pair at the given index (e.g. to undo its deletion); the indices of the points from there on shift up by one.
+    def insertPoint(self, index, leftPoint, rightPoint):
+        if index == len(self.leftPoints):
+            self.addPoints(leftPoint, rightPoint)
+            return
+        self.delaunay = None
+        self.leftPoints = np.insert(self.leftPoints, index, leftPoint, axis=0)
+        self.rightPoints = np.insert(self.rightPoints, index, rightPoint, axis=0)
+        self.simplices[self.simplices >= index] += 1
+        if len(self.simplices):
+            self.insertVertex(index)
+        else:
+            self.build()
+
+    # Moves the left and / or right point at the given index. Only moving a left point changes the mesh.
+    def movePoint(self, index, leftPoint=None, rightPoint=None):
+        if rightPoint is not None:
+            self.rightPoints[index] = rightPoint
+        if leftPoint is not None and np.any(self.leftPoints[index] != leftPoint):
+            self.removeVertex(index)
+            self.leftPoints[index] = leftPoint
+            if len(self.simplices):
+                self.insertVertex(index)
+            else:
+                self.build()
+
+    # Returns the directed edges on the boundary of the given edges (those whose reverse is not among them).
+    def getBoundary(self, edges):
+        count = len(self.leftPoints)
+        return edges[~np.isin(edges[:, 1] * count + edges[:, 0], edges[:, 0] * count + edges[:, 1])]
+
+    # Bowyer-Watson insertion of the point at the given index into the mesh (which it isn't part of yet): the triangles whose
+    # circumcircle contains it - and the hull edges facing it, when it lies outside of the mesh - form a cavity, which is
+    # replaced by a fan of triangles around the point.
+    def insertVertex(self, index):
+        self.delaunay = None
+        point = self.leftPoints[index]
+        vertices = self.leftPoints[self.simplices] - point
+        lifts = np.einsum('ijk,ijk->ij', vertices, vertices)
+        if not lifts.all():
+            return  # Duplicate of a vertex of the mesh, which Qhull would leave out as well
+        crosses = vertices[:, [1, 2, 0], 0] * vertices[:, [2, 0, 1], 1] - vertices[:, [2, 0, 1], 0] * vertices[:, [1, 2, 0], 1]
+        scale = lifts.sum(axis=1)
+        containing = (crosses >= -1e-12 * scale[:, np.newaxis]).all(axis=1)
+        cavity = (np.einsum('ij,ij->i', lifts, crosses) > 1e-12 * scale * scale) | containing
+
+        facing = np.empty((0, 2), dtype=np.intp)
+        if not containing.any():
+            hull = self.getBoundary(simplexEdges(self.simplices))
+            hullVertices = self.leftPoints[hull] - point
+            hullCrosses = hullVertices[:, 0, 0] * hullVertices[:, 1, 1] - hullVertices[:, 0, 1] * hullVertices[:, 1, 0]
+            facing = hull[hullCrosses < -1e-12 * np.einsum('ijk,ijk->i', hullVertices, hullVertices)][:, ::-1]
+        boundary = self.getBoundary(np.concatenate((simplexEdges(self.simplices[cavity]), facing)))
+        created = np.column_stack((boundary, np.full(len(boundary), index)))
+        createdAreas = triangleAreas(self.leftPoints[created])
+        keep = np.abs(createdAreas) > MIN_TRIANGLE_AREA
+        created, createdAreas = created[keep], createdAreas[keep]
+
+        # The fan must cover exactly the cavity and the area the point adds to the hull
+        expected = triangleAreas(self.leftPoints[self.simplices[cavity]]).sum()
+        expected += triangleAreas(self.leftPoints[np.column_stack((facing, np.full(len(facing), index)))]).sum()
+        if (createdAreas <= 0).any() or abs(createdAreas.sum() - expected) > AREA_TOLERANCE * max(expected, 1.0):
+            self.build()
+            return
+        self.simplices = np.concatenate((self.simplices[~cavity], created))
+
+    # Takes the point at the given index out of the mesh (its index stays valid) and re-triangulates the hole it leaves, with the
+    # triangles of the Delaunay triangulation of its neighbours that lie within the hole.
+    def removeVertex(self, index):
+        self.delaunay = None
+        star = (self.simplices == index).any(axis=1)
+        if not star.any():
+            return
+        starSimplices = self.simplices[star]
+        neighbours = np.unique(starSimplices[starSimplices != index])
+        created = np.empty((0, 3), dtype=np.intp)
+        if len(neighbours) >= 3:
+            try:
+                candidates = neighbours[Delaunay(self.leftPoints[neighbours]).simplices]
+            except QhullError:
+                candidates = created
+            starVertices = self.leftPoints[starSimplices]
+            starEdges = np.roll(starVertices, -1, axis=1) - starVertices
+            offsets = self.leftPoints[candidates].mean(axis=1)[:, np.newaxis, np.newaxis, :] - starVertices
+            sides = starEdges[..., 0] * offsets[..., 1] - starEdges[..., 1] * offsets[..., 0]
+            created = candidates[(sides > 0).all(axis=2).any(axis=1)]  # Centroid inside of one of the removed triangles
+            flipped = triangleAreas(self.leftPoints[created]) < 0
+            created[flipped] = created[flipped][:, ::-1]
+        self.simplices = np.concatenate((self.simplices[~star], created))
+
+        # An interior point's hole must be filled exactly. A hull point's hole shrinks with the hull, so the whole mesh is checked.
+        if len(self.getBoundary(simplexEdges(starSimplices))) == len(starSimplices):
+            expected = triangleAreas(self.leftPoints[starSimplices]).sum()
+            valid = abs(triangleAreas(self.leftPoints[created]).sum() - expected) <= AREA_TOLERANCE * max(expected, 1.0)
+        else:
+            used = np.unique(self.simplices)
+            valid = len(used) >= 3
+            if valid:
+                expected = ConvexHull(self.leftPoints[used]).volume
+                valid = abs(triangleAreas(self.leftPoints[self.simplices]).sum() - expected) <= AREA_TOLERANCE * max(expected, 1.0)
+        if not valid:
+            self.build(exclude=index)
+            return
+
+        # Duplicates of the removed point (left out of the mesh so far) take its place
+        isolated = np.flatnonzero(np.bincount(self.simplices.ravel(), minlength=len(self.leftPoints)) == 0)
+        for vertex in isolated[isolated != index]:
+            self.insertVertex(vertex)
+
+
+# Returns the (N + 1, 2, 3) float32 coefficients of a stack of affine matrices, used to build coordinate maps.
+# The identity is appended last, so pixels outside of the mesh (label -1) map onto their own location.
+def mapCoefficients(transforms):
+    return np.concatenate((transforms[:, :2, :], np.eye(3)[np.newaxis, :2, :])).astype(np.float32)
+
+
+# Projects every pixel of a band of the label map (whose first row is rowOffset in the full frame, and first column
+# columnOffset) with the coefficients of the triangle it belongs to, writing the source x and y coordinates into mapX and mapY.
+def projectLabels(coefficients, labels, rowOffset, mapX, mapY, columnOffset=0):
+    rows = np.arange(rowOffset, rowOffset + labels.shape[0], dtype=np.float32)[:, np.newaxis]
+    columns = np.arange(columnOffset, columnOffset + labels.shape[1], dtype=np.float32)[np.newaxis, :]
+    for axis, coordinateMap in ((0, mapX), (1, mapY)):
+        np.multiply(coefficients[labels, axis, 0], columns, out=coordinateMap)
+        coordinateMap += coefficients[labels, axis, 1] * rows
+        coordinateMap += coefficients[labels, axis, 2]
+
+
+# Bilinear gather engine: samples the image at the fractional (x, y) coordinates of mapX / mapY in one vectorized pass.
+# Coordinates outside of the image are clamped to its border. The float32 result is written into out.
+def bilinearSample(image, mapX, mapY, out):
+    height, width = image.shape[:2]
+    pixels = image.reshape(height * width, -1)
+    mapX = np.clip(mapX, 0, width - 1)
+    mapY = np.clip(mapY, 0, height - 1)
+    x0 = mapX.astype(np.int32)
+    y0 = mapY.astype(np.int32)
+    xWeight = (mapX - np.floor(mapX)).reshape(-1, 1)
+    yWeight = (mapY - np.floor(mapY)).reshape(-1, 1)
+
+    # Flat indices of the four neighbours (the right / bottom neighbours collapse onto the border at the image's edge)
+    topLeft = (y0 * width + x0).ravel()
+    topRight = topLeft + (x0 < width - 1).ravel()
+    bottomLeft = topLeft + (y0 < height - 1).ravel() * width
+    bottomRight = bottomLeft + (topRight - topLeft)
+
+    top = pixels.take(topLeft, axis=0) * (1 - xWeight) + pixels.take(topRight, axis=0) * xWeight
+    bottom = pixels.take(bottomLeft, axis=0) * (1 - xWeight) + pixels.take(bottomRight, axis=0) * xWeight
+    top *= 1 - yWeight
+    top += bottom * yWeight
+    out.reshape(top.shape)[...] = top
+
+
+# OpenCV equivalent of bilinearSample(), used by the 'cv2' backend.
+def remapSample(image, mapX, mapY, out):
+    out[...] = cv2.remap(image, mapX, mapY, interpolation=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+SAMPLERS = {'numpy': bilinearSample, 'cv2': remapSample}
+
+
+# Morphs two images of the same dimensions, either grayscale (HxW) or with any number of channels (HxWxC, e.g. RGB / RGBA).
+# All channels are warped together, sharing one set of geometry and one gather per pixel.
+#
+# Memory: the input images are never copied (Morpher keeps read-only views of them, unless they aren't C-contiguous).
+# A morph allocates its uint8 output frame (or writes into the caller's) and the int32 label map of the target mesh, which
+# briefly exists twice while PIL hands it over to NumPy. All float work happens band by band in scratch buffers of
+# BAND_PIXELS pixels, which the caller may reuse across frames. Peak memory of a morph at a new alpha is therefore at most
+# (1 + 8 / C) times one input image plus the temporaries of one band (at most BAND_PIXELS * (64 + 16 * C) bytes, ~30 MB for
+# RGB), regardless of the image's resolution. Measured with tracemalloc on 2000x2000 images (reusing the scratch buffers):
+# 4.2x for RGB, 3.6x for RGBA and 9x for grayscale, approaching 3.7x for RGB on larger images as the band becomes negligible.
+# labelCache then keeps the label map of the last alpha alive - 4 / C times one input image (1.3x for RGB, 1x for RGBA and
+# 4x for grayscale) - and a render at that alpha again only peaks at its output frame (1x) plus the bands.
+# See test_Morphing.py, which checks these bounds.
+#
+# Rendering is reentrant: getImageAtAlpha() never writes to the instance (besides swapping in its label map cache), so one
+# Morpher can render many alphas at once, e.g. from a thread pool while NumPy / OpenCV release the GIL.
+#
+# The mesh is given either as a Mesh (leaving rightTriangles out) or as two lists of corresponding Triangles.
 class Morpher:
-    def __init__(self, leftImage, leftTriangles, rightImage, rightTriangles):
+    def __init__(self, leftImage, leftTriangles, rightImage, rightTriangles=None, backend='numpy'):
         if type(leftImage) != np.ndarray:
             raise TypeError('Input leftImage is not an np.ndarray')
         if leftImage.dtype != np.uint8:
@@ -63,68 +475,281 @@ class Morpher:
             raise TypeError('Input rightImage is not an np.ndarray')
         if rightImage.dtype != np.uint8:
             raise TypeError('Input rightImage is not of type np.uint8')
-        if type(leftTriangles) != list:
-            raise TypeError('Input leftTriangles is not of type List')
-        for j in leftTriangles:
-            if isinstance(j, Triangle) == 0:
-                raise TypeError('Element of input leftTriangles is not of Class Triangle')
-        if type(rightTriangles) != list:
-            raise TypeError('Input leftTriangles is not of type List')
-        for k in rightTriangles:
-            if isinstance(k, Triangle) == 0:
-                raise TypeError('Element of input rightTriangles is not of Class Triangle')
-        self.leftImage = copy.deepcopy(leftImage)
-        self.newLeftImage = copy.deepcopy(leftImage)
-        self.leftTriangles = leftTriangles  # Not of type np.uint8
-        self.rightImage = copy.deepcopy(rightImage)
-        self.newRightImage = copy.deepcopy(rightImage)
-        self.rightTriangles = rightTriangles  # Not of type np.uint8
-
-    def getImageAtAlpha(self, alpha):
-        for leftTriangle, rightTriangle in zip(self.leftTriangles, self.rightTriangles):
-            self.interpolatePoints(leftTriangle, rightTriangle, alpha)
-        return ((1 - alpha) * self.newLeftImage + alpha * self.newRightImage).astype(np.uint8)
-
-    def interpolatePoints(self, leftTriangle, rightTriangle, alpha):
-        targetTriangle = Triangle(leftTriangle.vertices + (rightTriangle.vertices - leftTriangle.vertices) * alpha)
-        targetVertices = targetTriangle.vertices.reshape(6, 1)
-        tempLeftMatrix = np.array([[leftTriangle.vertices[0][0], leftTriangle.vertices[0][1], 1, 0, 0, 0],
-                                   [0, 0, 0, leftTriangle.vertices[0][0], leftTriangle.vertices[0][1], 1],
-                                   [leftTriangle.vertices[1][0], leftTriangle.vertices[1][1], 1, 0, 0, 0],
-                                   [0, 0, 0, leftTriangle.vertices[1][0], leftTriangle.vertices[1][1], 1],
-                                   [leftTriangle.vertices[2][0], leftTriangle.vertices[2][1], 1, 0, 0, 0],
-                                   [0, 0, 0, leftTriangle.vertices[2][0], leftTriangle.vertices[2][1], 1]])
-        tempRightMatrix = np.array([[rightTriangle.vertices[0][0], rightTriangle.vertices[0][1], 1, 0, 0, 0],
-                                    [0, 0, 0, rightTriangle.vertices[0][0], rightTriangle.vertices[0][1], 1],
-                                    [rightTriangle.vertices[1][0], rightTriangle.vertices[1][1], 1, 0, 0, 0],
-                                    [0, 0, 0, rightTriangle.vertices[1][0], rightTriangle.vertices[1][1], 1],
-                                    [rightTriangle.vertices[2][0], rightTriangle.vertices[2][1], 1, 0, 0, 0],
-                                    [0, 0, 0, rightTriangle.vertices[2][0], rightTriangle.vertices[2][1], 1]])
-        try:
-            lefth = np.linalg.solve(tempLeftMatrix, targetVertices)
-            righth = np.linalg.solve(tempRightMatrix, targetVertices)
-            leftH = np.array([[lefth[0][0], lefth[1][0], lefth[2][0]], [lefth[3][0], lefth[4][0], lefth[5][0]], [0, 0, 1]])
-            rightH = np.array([[righth[0][0], righth[1][0], righth[2][0]], [righth[3][0], righth[4][0], righth[5][0]], [0, 0, 1]])
-            leftinvH = np.linalg.inv(leftH)
-            rightinvH = np.linalg.inv(rightH)
-            targetPoints = targetTriangle.getPoints()
-
-            # Credit to https://github.com/zhifeichen097/Image-Morphing for the following code block that I've adapted. Exceptional work on discovering
-            # RectBivariateSpline's .ev() method! I noticed the method but didn't think much of it at the time due to the website's poor documentation..
-            xp, yp = np.transpose(targetPoints)
-            leftXValues = leftinvH[1, 1] * xp + leftinvH[1, 0] * yp + leftinvH[1, 2]
-            leftYValues = leftinvH[0, 1] * xp + leftinvH[0, 0] * yp + leftinvH[0, 2]
-            leftXParam = np.arange(np.amin(leftTriangle.vertices[:, 1]), np.amax(leftTriangle.vertices[:, 1]), 1)
-            leftYParam = np.arange(np.amin(leftTriangle.vertices[:, 0]), np.amax(leftTriangle.vertices[:, 0]), 1)
-            leftImageValues = self.leftImage[int(leftXParam[0]):int(leftXParam[-1] + 1), int(leftYParam[0]):int(leftYParam[-1] + 1)]
-
-            rightXValues = rightinvH[1, 1] * xp + rightinvH[1, 0] * yp + rightinvH[1, 2]
-            rightYValues = rightinvH[0, 1] * xp + rightinvH[0, 0] * yp + rightinvH[0, 2]
-            rightXParam = np.arange(np.amin(rightTriangle.vertices[:, 1]), np.amax(rightTriangle.vertices[:, 1]), 1)
-            rightYParam = np.arange(np.amin(rightTriangle.vertices[:, 0]), np.amax(rightTriangle.vertices[:, 0]), 1)
-            rightImageValues = self.rightImage[int(rightXParam[0]):int(rightXParam[-1] + 1), int(rightYParam[0]):int(rightYParam[-1] + 1)]
-
-            self.newLeftImage[xp, yp] = RectBivariateSpline(leftXParam, leftYParam, leftImageValues, kx=1, ky=1).ev(leftXValues, leftYValues)
-            self.newRightImage[xp, yp] = RectBivariateSpline(rightXParam, rightYParam, rightImageValues, kx=1, ky=1).ev(rightXValues, rightYValues)
-        except:
+        if leftImage.ndim not in (2, 3):
+            raise ValueError('Input leftImage is not an HxW or HxWxC array')
+        if leftImage.shape != rightImage.shape:
+            raise ValueError('Input leftImage and rightImage do not have the same dimensions')
+        if isinstance(leftTriangles, Mesh):
+            if rightTriangles is not None:
+                raise TypeError('Input rightTriangles must be left out when leftTriangles is a Mesh')
+            mesh = leftTriangles
+        else:
+            mesh = meshFromTriangles(leftTriangles, rightTriangles)
+        if backend not in SAMPLERS:
+            raise ValueError('Input backend must be one of: ' + ', '.join(SAMPLERS))
+        if backend == 'cv2' and cv2 is None:
+            raise ValueError("Input backend 'cv2' requires OpenCV (pip install opencv-python-headless)")
+        self.leftImage = readOnly(np.ascontiguousarray(leftImage))
+        self.rightImage = readOnly(np.ascontiguousarray(rightImage))
+        self.mesh = mesh
+        self.backend = backend
+
+        # Stacked (N, 3, 2) triangle vertices of the mesh, so that the geometry of the whole mesh is solved in one operation
+        self.leftVertices = mesh.leftVertices
+        self.rightVertices = mesh.rightVertices
+        self.labelCache = (None, None)  # (alpha, label map) of the most recently rasterized target mesh
+        self.sharedHandle = None        # Set by share() (or attachMorpher()) once the inputs live in shared memory
+        self.sharedMemory = []          # Shared memory blocks created by share(), owned (and unlinked) by this instance
+        self.previews = {}              # Reduced resolution Morphers built by getPreview(), keyed by factor
+
+    # Pickling a shared Morpher only sends its handle, which the receiving process attaches to with attachMorpher().
+    # Unshared Morphers are pickled whole, images and triangles included.
+    def __reduce_ex__(self, protocol):
+        if self.sharedHandle is None:
+            return super().__reduce_ex__(protocol)
+        return attachMorpher, (self.sharedHandle,)
+
+    # Copies both input images and the mesh's points and simplices into shared memory (once) and returns the handle naming them.
+    # From then on, sending this Morpher to a worker process costs a few hundred bytes instead of the whole morph.
+    # The blocks live until release() is called, so call it once no worker needs this Morpher anymore.
+    # A one byte status block is shared alongside them: release() clears it, which tells workers to drop their mappings.
+    def share(self):
+        if self.sharedHandle is None:
+            status = shared_memory.SharedMemory(create=True, size=1)
+            status.buf[0] = 1
+            self.sharedMemory.append(status)
+            blocks = []
+            for array in (self.leftImage, self.rightImage, self.mesh.leftPoints, self.mesh.rightPoints, self.mesh.simplices):
+                memory = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+                np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+                self.sharedMemory.append(memory)
+                blocks.append((memory.name, array.shape, array.dtype.str))
+            self.sharedHandle = (self.backend, status.name, tuple(blocks))
+        return self.sharedHandle
+
+    # Frees the shared memory blocks created by share(). The Morpher itself keeps working (unshared) afterwards.
+    # Workers still attached to it see its status cleared and detach on their next attachMorpher() call.
+    def release(self):
+        if self.sharedMemory:
+            self.sharedMemory[0].buf[0] = 0
+        for memory in self.sharedMemory:
+            memory.close()
+            memory.unlink()
+        self.sharedMemory = []
+        self.sharedHandle = None
+
+    # Returns the factor (4 or 8) by which getPreview() should shrink this morph for a quick first look, or None when the
+    # images are small enough to be rendered at full resolution right away.
+    def getPreviewFactor(self):
+        pixels = self.leftImage.shape[0] * self.leftImage.shape[1]
+        if pixels <= PREVIEW_PIXELS * 4:
+            return None
+        return 4 if pixels <= PREVIEW_PIXELS * 16 else 8
+
+    # Returns this morph at 1 / factor of its resolution: a Morpher of the matching image pyramid level (box filtered by PIL)
+    # and of both meshes scaled accordingly. Each preview is built once and kept on this instance.
+    def getPreview(self, factor):
+        if factor not in self.previews:
+            leftImage = np.asarray(Image.fromarray(self.leftImage).reduce(factor))
+            rightImage = np.asarray(Image.fromarray(self.rightImage).reduce(factor))
+            leftPoints = (self.mesh.leftPoints + 0.5) / factor - 0.5  # Pixel centres of the full image onto those of the reduced one
+            rightPoints = (self.mesh.rightPoints + 0.5) / factor - 0.5
+            self.previews[factor] = Morpher(leftImage, Mesh(leftPoints, rightPoints, self.mesh.simplices), rightImage, backend=self.backend)
+        return self.previews[factor]
+
+    # Vectorized check that rejects triangles which can't be projected before any per-triangle work is done.
+    # A triangle pair is usable when every one of its three triangles (left, right, target) has a non-zero area.
+    def getValidTriangles(self, targetVertices):
+        valid = np.abs(triangleAreas(targetVertices)) > MIN_TRIANGLE_AREA
+        valid &= np.abs(self.mesh.leftAreas) > MIN_TRIANGLE_AREA
+        valid &= np.abs(self.mesh.rightAreas) > MIN_TRIANGLE_AREA
+        return valid
+
+    # Batched geometry stage: computes the target mesh for the given alpha along with every target-to-left and
+    # target-to-right inverse affine matrix in one stacked operation. Invalid triangles carry an identity matrix.
+    def getTransforms(self, alpha):
+        targetPoints = self.mesh.leftPoints + (self.mesh.rightPoints - self.mesh.leftPoints) * alpha
+        targetVertices = targetPoints[self.mesh.simplices]
+        valid = self.getValidTriangles(targetVertices)
+        leftInvH = affineTransforms(self.leftVertices, targetVertices, valid)
+        rightInvH = affineTransforms(self.rightVertices, targetVertices, valid)
+        return targetVertices, leftInvH, rightInvH, valid
+
+    # Returns the label map of the target mesh at the given alpha, rasterizing it only when the alpha has changed.
+    # The cache is read and replaced as a whole tuple, which keeps it consistent when several threads render at once.
+    def getLabelMap(self, alpha, targetVertices, valid):
+        cachedAlpha, labelMap = self.labelCache
+        if cachedAlpha != alpha:
+            labelMap = rasterizeTriangles(targetVertices, self.leftImage.shape[0], self.leftImage.shape[1], valid)
+            self.labelCache = (alpha, labelMap)
+        return labelMap
+
+    # Allocates the scratch buffers for rendering one band: the two coordinate maps and the two warped images.
+    # Pass the result to getImageAtAlpha() to reuse it across frames (one set of buffers per thread).
+    def newScratch(self):
+        rows = max(1, BAND_PIXELS // self.leftImage.shape[1])
+        bandShape = (min(rows, self.leftImage.shape[0]),) + self.leftImage.shape[1:]
+        return {'mapX': np.empty(bandShape[:2], dtype=np.float32), 'mapY': np.empty(bandShape[:2], dtype=np.float32),
+                'left': np.empty(bandShape, dtype=np.float32), 'right': np.empty(bandShape, dtype=np.float32)}
+
+    # Renders the morph at the given alpha, one band of rows at a time, and returns it.
+    # The frame is written into out (a new uint8 frame when omitted) using the given (or newly allocated) scratch buffers.
+    # Passing rows = (start, stop) only renders that range of rows of out, so that several workers can each fill one tile of
+    # a shared frame. Those workers may also pass the alpha's labelMap (see getLabelMap()) instead of each rasterizing it.
+    def getImageAtAlpha(self, alpha, out=None, scratch=None, rows=None, labelMap=None):
+        if out is None:
+            out = np.empty(self.leftImage.shape, dtype=np.uint8)
+        elif out.shape != self.leftImage.shape or out.dtype != np.uint8:
+            raise ValueError('Input out is not a np.uint8 array with the dimensions of the input images')
+        first, last = (0, self.leftImage.shape[0]) if rows is None else rows
+        if not 0 <= first <= last <= self.leftImage.shape[0]:
+            raise ValueError('Input rows is not a (start, stop) range within the height of the input images')
+        if labelMap is not None and labelMap.shape != self.leftImage.shape[:2]:
+            raise ValueError('Input labelMap does not have the height and width of the input images')
+        if scratch is None:
+            scratch = self.newScratch()
+        targetVertices, leftInvH, rightInvH, valid = self.getTransforms(alpha)
+        if labelMap is None:
+            labelMap = self.getLabelMap(alpha, targetVertices, valid)
+        leftCoefficients = mapCoefficients(leftInvH)
+        rightCoefficients = mapCoefficients(rightInvH)
+        sample = SAMPLERS[self.backend]
+        bandRows = len(scratch['mapX'])
+
+        for start in range(first, last, bandRows):
+            labels = labelMap[start:min(start + bandRows, last)]
+            mapX, mapY = scratch['mapX'][:len(labels)], scratch['mapY'][:len(labels)]
+            leftBand, rightBand = scratch['left'][:len(labels)], scratch['right'][:len(labels)]
+            projectLabels(leftCoefficients, labels, start, mapX, mapY)
+            sample(self.leftImage, mapX, mapY, leftBand)
+            projectLabels(rightCoefficients, labels, start, mapX, mapY)
+            sample(self.rightImage, mapX, mapY, rightBand)
+            leftBand *= 1 - alpha
+            rightBand *= alpha
+            leftBand += rightBand
+            np.copyto(out[start:start + len(labels)], leftBand, casting='unsafe')
+        return out
+
+    # Incremental re-morph: returns the frame at the given alpha by re-rendering only the region of previousFrame (a frame of the
+    # same images at the same alpha, with the mesh given by previousLeftVertices / previousRightVertices) that a mesh edit touched.
+    # Triangles that exist in both meshes keep their pixels, so moving or deleting a point of a dense mesh only re-warps the
+    # window around its triangles. The result is identical to a full render: a pixel on an edge shared by two triangles belongs
+    # to the one drawn last, so when the triangles that survived the edit were reordered (e.g. by a rebuild of the mesh) the
+    # whole frame is rendered instead.
+    def updateImageAtAlpha(self, alpha, previousFrame, previousLeftVertices, previousRightVertices, out=None, scratch=None):
+        if previousFrame.shape != self.leftImage.shape or previousFrame.dtype != np.uint8:
+            raise ValueError('Input previousFrame is not a np.uint8 array with the dimensions of the input images')
+        if out is None:
+            out = previousFrame.copy()
+        elif out is not previousFrame:
+            np.copyto(out, previousFrame)
+        keys = triangleKeys(self.leftVertices, self.rightVertices)
+        previousKeys = triangleKeys(previousLeftVertices, previousRightVertices)
+        changed = ~np.isin(keys, previousKeys)
+        removed = ~np.isin(previousKeys, keys)
+        if not changed.any() and not removed.any():
+            return out
+        _, ids = np.unique(np.concatenate((previousKeys, keys)), return_inverse=True)
+        previousOrder = np.empty(len(previousKeys) + len(keys), dtype=np.intp)
+        previousOrder[ids[:len(previousKeys)]] = np.arange(len(previousKeys))
+        if (np.diff(previousOrder[ids[len(previousKeys):][~changed]]) <= 0).any():
+            return self.getImageAtAlpha(alpha, out=out, scratch=scratch)
+
+        # Window (in the target frame) covering every triangle that was added or removed by the edit
+        targetVertices, leftInvH, rightInvH, valid = self.getTransforms(alpha)
+        previousTarget = previousLeftVertices + (previousRightVertices - previousLeftVertices) * alpha
+        dirty = np.concatenate((targetVertices[changed], previousTarget[removed])).reshape(-1, 2)
+        height, width = self.leftImage.shape[:2]
+        left, top = max(int(np.floor(dirty[:, 0].min())) - 1, 0), max(int(np.floor(dirty[:, 1].min())) - 1, 0)
+        right, bottom = min(int(np.ceil(dirty[:, 0].max())) + 2, width), min(int(np.ceil(dirty[:, 1].max())) + 2, height)
+        if left >= right or top >= bottom:
+            return out
+
+        # Only the triangles overlapping the window are rasterized. The mesh's bounding boxes interpolated to this alpha contain
+        # those of the target triangles, which makes them a cheap (conservative) test. They are drawn at their position in the
+        # frame (and the window cropped out) rather than shifted to the window's origin, because PIL doesn't assign the pixels
+        # on a triangle's edges the same way once its vertices are translated - the window would then disagree with a full render.
+        bounds = self.mesh.leftBounds + (self.mesh.rightBounds - self.mesh.leftBounds) * alpha
+        overlap = valid & (bounds[:, 2] >= left - 1) & (bounds[:, 0] <= right) & (bounds[:, 3] >= top - 1) & (bounds[:, 1] <= bottom)
+        labelMap = rasterizeTriangles(targetVertices, bottom, right, overlap)[top:, left:]
+        leftCoefficients = mapCoefficients(leftInvH)
+        rightCoefficients = mapCoefficients(rightInvH)
+        sample = SAMPLERS[self.backend]
+        if scratch is None:
+            scratch = self.newScratch()
+        windowWidth = right - left
+        bandRows = max(1, scratch['mapX'].size // windowWidth)
+
+        for start in range(0, labelMap.shape[0], bandRows):
+            labels = labelMap[start:start + bandRows]
+            bandShape = labels.shape + self.leftImage.shape[2:]
+            mapX = scratch['mapX'].reshape(-1)[:labels.size].reshape(labels.shape)
+            mapY = scratch['mapY'].reshape(-1)[:labels.size].reshape(labels.shape)
+            leftBand = scratch['left'].reshape(-1)[:int(np.prod(bandShape))].reshape(bandShape)
+            rightBand = scratch['right'].reshape(-1)[:int(np.prod(bandShape))].reshape(bandShape)
+            projectLabels(leftCoefficients, labels, top + start, mapX, mapY, left)
+            sample(self.leftImage, mapX, mapY, leftBand)
+            projectLabels(rightCoefficients, labels, top + start, mapX, mapY, left)
+            sample(self.rightImage, mapX, mapY, rightBand)
+            leftBand *= 1 - alpha
+            rightBand *= alpha
+            leftBand += rightBand
+            np.copyto(out[top + start:top + start + len(labels), left:right], leftBand, casting='unsafe')
+        return out
+
+    # Lazily yields the frame of every alpha of the given iterable, in order, so that a sequence can be consumed (e.g. saved)
+    # one frame at a time instead of being collected in memory first.
+    # Frames are rendered here, or on the given worker pool with at most readAhead of them in flight (share() first, so
+    # that submitting a frame only sends its alpha and the handle). Either way, memory stays flat however long the sequence.
+    def iterFrames(self, alphas, pool=None, readAhead=READ_AHEAD):
+        if pool is None:
+            scratch = self.newScratch()
+            for alpha in alphas:
+                yield self.getImageAtAlpha(alpha, scratch=scratch)
             return
+        if readAhead < 1:
+            raise ValueError('Input readAhead must be at least 1')
+        pending = deque()
+        for alpha in alphas:
+            pending.append(pool.apply_async(self.getImageAtAlpha, (alpha,)))
+            if len(pending) >= readAhead:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+# Returns the Morpher published under the given handle by Morpher.share(), mapping its images and meshes from shared memory
+# without copying them. Attached Morphers are cached per process, so a worker maps each morph once no matter how many
+# frames it renders, and keeps its label map cache between them. Morphers released by their owner since are detached first.
+def attachMorpher(handle):
+    for attached in [attached for attached, (morpher, memory) in attachedMorphers.items() if not memory[0].buf[0]]:
+        detachMorpher(attached)
+    if handle not in attachedMorphers:
+        while len(attachedMorphers) >= ATTACHED_LIMIT:
+            detachMorpher(next(iter(attachedMorphers)))
+        backend, statusName, blocks = handle
+        memory = []
+        try:
+            for name in (statusName,) + tuple(name for name, shape, dtype in blocks):
+                memory.append(shared_memory.SharedMemory(name=name))
+        except FileNotFoundError:  # Released before this task got to it - don't keep whatever was mapped so far
+            for block in memory:
+                block.close()
+            raise
+        leftImage, rightImage, leftPoints, rightPoints, simplices = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                                                                     for block, (name, shape, dtype) in zip(memory[1:], blocks)]
+        morpher = Morpher(leftImage, Mesh(leftPoints, rightPoints, simplices), rightImage, backend=backend)
+        morpher.sharedHandle = handle
+        attachedMorphers[handle] = (morpher, memory)
+    return attachedMorphers[handle][0]
+
+
+# Drops this process' mapping of a shared Morpher (the owner's blocks are left alone - see Morpher.release()).
+def detachMorpher(handle):
+    morpher, memory = attachedMorphers.pop(handle)
+    del morpher
+    for block in memory:
+        try:
+            block.close()
+        except BufferError:  # Still referenced elsewhere in this process - the mapping goes away with the last view
+            pass
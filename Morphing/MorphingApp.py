@@ -8,9 +8,8 @@ import queue
 import multiprocessing
 import sys
 import os
-import warnings
 import time
-import shutil
+import threading
 import requests
 import math
 import webbrowser
@@ -18,21 +17,25 @@ import webbrowser
 # External Modules - These require installation via the command: "pip install -r requirements.txt" #
 import PyQt5.QtCore
 import cv2
-import imageio
 from PyQt5.QtWidgets import QMainWindow, QApplication, QFileDialog
 from pynput import mouse
 
 from Morphing import *
 from MorphingGUI import *
+from MorphingPool import createPool, closePool, renderIndexedFrame, renderTiledFrame
+from MorphingExport import saveGif, saveVideo
+from MorphingCache import FrameStore, StoredFrames, RenderCache, FrameLRU, jobKey, morphDigest, frameKey
+from MorphingPoints import PointStore, PointIndex, EditHistory, AddTempPoint, AddPointPairs, DeletePointPair, MovePoint, ReplacePoints
 
 # Module  level  Variables
 #######################################################
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
-grayScale = None
-colorScaleR = None
-colorScaleG = None
-colorScaleB = None
-colorScaleA = None
+CHECKPOINT_DIR = os.path.join(ROOT_DIR, 'Checkpoints')    # Frames of full blends, which interrupted blends resume from and finished ones are displayed and saved from
+CACHE_DIR = os.path.join(ROOT_DIR, 'Cache')                # Persistent cache of rendered frames, shared by every session (see RenderCache)
+morpher = None
+morpherDigest = None                                       # morphDigest() of the current morpher, from which the cache key of each of its frames is derived
+morpherLock = threading.Lock()                             # Held while the scrubber renders with the morpher, and while a new blend releases or replaces it
+SCRUB_PREFETCH = 4                                         # Number of neighbouring slider positions (on each side) that are rendered ahead while scrubbing
 start_time = 0.00
 alphaValue = None
 
@@ -44,84 +47,130 @@ def on_click(x, y, button, pressed):
         return False
 
 
-class ImagerThread(QtCore.QThread):
-    image_complete = QtCore.pyqtSignal(list)
+# Returns the alpha of an alpha slider position, rounded to the alpha value field's three decimals (which single blends are
+# rendered at), so that frames are cached under the same key whether they were blended or rendered while scrubbing.
+def sliderAlpha(value, maximum):
+    return float(format(value / maximum, ".3f"))
+
 
+class ImagerThread(QtCore.QThread):
+    def __init__(self, pool, cache, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self.pool = pool
+        self.cache = cache
+        self.previous = None
+    image_complete = QtCore.pyqtSignal(object)
+    preview_complete = QtCore.pyqtSignal(object)
+
+    # Serves the frame from the render cache when it has already been rendered, and renders (then caches) it otherwise.
+    # When previous holds the last single blend of the same images at the same alpha (its frame and both of its meshes), only
+    # the triangles changed since then are re-rendered (see Morpher.updateImageAtAlpha()).
+    # Otherwise, large morphs first emit a quick reduced resolution preview (see Morpher.getPreview()) while the full frame renders.
     def run(self):
-        global grayScale, colorScaleR, colorScaleG, colorScaleB, colorScaleA, alphaValue, start_time
-        pool = multiprocessing.Pool(4)
-        if grayScale is not None:
-            blendGray = grayScale.getImageAtAlpha(alphaValue)
-        elif colorScaleA is None:
-            results = [pool.apply_async(colorScaleR.getImageAtAlpha, (alphaValue,)),
-                       pool.apply_async(colorScaleG.getImageAtAlpha, (alphaValue,)),
-                       pool.apply_async(colorScaleB.getImageAtAlpha, (alphaValue,))]
-            blendR = results[0].get()
-            blendG = results[1].get()
-            blendB = results[2].get()
-        else:
-            results = [pool.apply_async(colorScaleR.getImageAtAlpha, (alphaValue,)),
-                       pool.apply_async(colorScaleG.getImageAtAlpha, (alphaValue,)),
-                       pool.apply_async(colorScaleB.getImageAtAlpha, (alphaValue,)),
-                       pool.apply_async(colorScaleA.getImageAtAlpha, (alphaValue,))]
-            blendR = results[0].get()
-            blendG = results[1].get()
-            blendB = results[2].get()
-            blendA = results[3].get()
-        pool.close()
-        pool.terminate()
-        pool.join()
-        if grayScale is not None:
-            self.image_complete.emit([blendGray])
-        elif colorScaleA is None:
-            self.image_complete.emit([blendR, blendG, blendB])
-        else:
-            self.image_complete.emit([blendR, blendG, blendB, blendA])
+        global morpher, morpherDigest, alphaValue, start_time
+        key = frameKey(morpherDigest, alphaValue)
+        blendedImage = self.cache.get(key)
+        if blendedImage is None and self.previous is not None:
+            blendedImage = morpher.updateImageAtAlpha(alphaValue, *self.previous)
+            self.cache.put(key, blendedImage)
+        elif blendedImage is None:
+            factor = morpher.getPreviewFactor()
+            if factor is not None:
+                self.preview_complete.emit(morpher.getPreview(factor).getImageAtAlpha(alphaValue))
+            blendedImage = renderTiledFrame(self.pool, morpher, alphaValue)
+            self.cache.put(key, blendedImage)
+        self.image_complete.emit(blendedImage)
 
 
 class FrameThread(QtCore.QThread):
-    def __init__(self, threadQueue, parent=None):
+    def __init__(self, threadQueue, pool, cache, parent=None):
         QtCore.QThread.__init__(self, parent)
         self.queue = threadQueue
-    frame_complete = QtCore.pyqtSignal(list)
+        self.pool = pool
+        self.cache = cache
+    frame_complete = QtCore.pyqtSignal(int, object)
     update_progress = QtCore.pyqtSignal(int)
 
+    # Each queue entry is the full list of alphas of one blend and its checkpoint (FrameStore). Frames checkpointed by an
+    # earlier, interrupted run of the same blend or found in the render cache are loaded; the rest are spread across every
+    # worker of the pool, checkpointed and emitted (with their index in the sequence) as soon as they land, which is not
+    # necessarily in order. Every frame ends up in the checkpoint, which holds the sequence on disk instead of in memory, so
+    # rendered frames aren't written to the render cache as well.
     def run(self):
-        global grayScale, colorScaleR, colorScaleG, colorScaleB, colorScaleA, start_time
+        global morpher, morpherDigest, start_time
         while True:
-            value = self.queue.get()
-            pool = multiprocessing.Pool(4)
-            if grayScale is not None:
-                blendGray = grayScale.getImageAtAlpha(value)
-            elif colorScaleA is None:
-                results = [pool.apply_async(colorScaleR.getImageAtAlpha, (value,)),
-                           pool.apply_async(colorScaleG.getImageAtAlpha, (value,)),
-                           pool.apply_async(colorScaleB.getImageAtAlpha, (value,))]
-                blendR = results[0].get()
-                blendG = results[1].get()
-                blendB = results[2].get()
-            else:
-                results = [pool.apply_async(colorScaleR.getImageAtAlpha, (value,)),
-                           pool.apply_async(colorScaleG.getImageAtAlpha, (value,)),
-                           pool.apply_async(colorScaleB.getImageAtAlpha, (value,)),
-                           pool.apply_async(colorScaleA.getImageAtAlpha, (value,))]
-                blendR = results[0].get()
-                blendG = results[1].get()
-                blendB = results[2].get()
-                blendA = results[3].get()
-            pool.close()
-            pool.terminate()
-            pool.join()
-            if grayScale is not None:
-                self.frame_complete.emit([blendGray])
-            elif colorScaleA is None:
-                self.frame_complete.emit([blendR, blendG, blendB])
-            else:
-                self.frame_complete.emit([blendR, blendG, blendB, blendA])
-            self.update_progress.emit(1)
+            alphas, store = self.queue.get()
+            tasks = []
+            for index, value in enumerate(alphas):
+                if store.has(index):
+                    blendedImage = store.load(index)
+                else:
+                    blendedImage = self.cache.get(frameKey(morpherDigest, value))
+                    if blendedImage is not None:
+                        store.save(index, blendedImage)
+                if blendedImage is not None:
+                    self.frame_complete.emit(index, blendedImage)
+                    self.update_progress.emit(1)
+                else:
+                    tasks.append((morpher, index, value))
+            for index, blendedImage in self.pool.imap_unordered(renderIndexedFrame, tasks):
+                store.save(index, blendedImage)
+                self.frame_complete.emit(index, blendedImage)
+                self.update_progress.emit(1)
             self.queue.task_done()
 
 
+# Renders frames on demand while the user scrubs the alpha slider without a full blend.
+# Requests are slider positions: only the latest one is rendered (on the whole pool), after which the neighbouring positions
+# are prefetched, nearest first, for as long as no new request comes in. Frames are kept in a memory-capped LRU (and the render cache).
+class ScrubThread(QtCore.QThread):
+    def __init__(self, pool, cache, memory, parent=None):
+        QtCore.QThread.__init__(self, parent)
+        self.requests = queue.Queue()
+        self.pool = pool
+        self.cache = cache
+        self.memory = memory
+    frame_ready = QtCore.pyqtSignal(int, int, object)
+    render_failed = QtCore.pyqtSignal(str)
+
+    def request(self, value, maximum):
+        self.requests.put((value, maximum))
+
+    # Returns the frame of the given alpha from memory, the render cache or (failing both) the pool.
+    # Returns None while a new blend is replacing the morpher, which can't be released until the frame is rendered (morpherLock).
+    def getFrame(self, alpha):
+        global morpher, morpherDigest
+        with morpherLock:
+            if morpherDigest is None or morpher is None:
+                return None
+            key = frameKey(morpherDigest, alpha)
+            frame = self.memory.get(key)
+            if frame is None:
+                frame = self.cache.get(key)
+                if frame is None:
+                    frame = renderTiledFrame(self.pool, morpher, alpha)
+                    self.cache.put(key, frame)
+                self.memory.put(key, frame)
+        return frame
+
+    def run(self):
+        while True:
+            value, maximum = self.requests.get()
+            while not self.requests.empty():
+                value, maximum = self.requests.get()
+            try:
+                frame = self.getFrame(sliderAlpha(value, maximum))
+                if frame is not None:
+                    self.frame_ready.emit(value, maximum, frame)
+                for offset in [sign * step for step in range(1, SCRUB_PREFETCH + 1) for sign in (1, -1)]:
+                    if not self.requests.empty():
+                        break
+                    if 0 <= value + offset <= maximum:
+                        self.getFrame(sliderAlpha(value + offset, maximum))
+            except Exception as error:
+                self.render_failed.emit(type(error).__name__ + ': ' + str(error))
+
+
 class MorphingApp(QMainWindow, Ui_MainWindow):
     def __init__(self, parent=None):
         super(MorphingApp, self).__init__(parent)
@@ -146,11 +195,19 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         self.added_right_points = []                                                    # List used to store temporary points added in current session (RIGHT)
         self.confirmed_left_points = []                                                 # List used to store existing points confirmed in current session (LEFT)
         self.confirmed_right_points = []                                                # List used to store existing points confirmed in current session (RIGHT)
-        self.placed_points_history = []                                                 # List used to log recent points placed during this session for CTRL + Y
-        self.clicked_window_history = [-1]                                              # List used to log the order in which the image windows have been clicked - functions as a "stack"
         self.leftPolyList = []                                                          # List used to store delaunay triangles (LEFT)
         self.rightPolyList = []                                                         # List used to store delaunay triangles (RIGHT)
-        self.blendList = []                                                             # List used to store a variable amount of alpha increment frames for full blending
+        self.leftPolyCache = {}                                                         # Dictionary of the displayed triangles' polygons by corner coordinates, reused by the next displayTriangles() (LEFT)
+        self.rightPolyCache = {}                                                        # Dictionary of the displayed triangles' polygons by corner coordinates, reused by the next displayTriangles() (RIGHT)
+        self.triangulation = Triangulation()                                            # In-memory Delaunay mesh of the confirmed point pairs (in original image coordinates), updated on every edit
+        self.leftStore = PointStore()                                                   # Journaled store of the left image's confirmed points (in original image coordinates), in file order
+        self.rightStore = PointStore()                                                  # Journaled store of the right image's confirmed points (in original image coordinates), in file order
+        self.leftIndex = PointIndex()                                                   # Spatial index of the left image's displayed red and blue points (in file order), for hit-testing and duplicate checks
+        self.rightIndex = PointIndex()                                                  # Spatial index of the right image's displayed red and blue points (in file order), for hit-testing and duplicate checks
+        self.history = EditHistory(self)                                                # Undo / redo history (CTRL + Z / CTRL + Y) of every point edit, applied through the point editing methods below
+        self.blendList = []                                                             # Frames of the last full blend, loaded one at a time from its checkpoint on disk (StoredFrames)
+        self.blendCount = 0                                                             # Number of frames of the running full blend that have landed in its checkpoint so far
+        self.frameStore = None                                                          # On-disk checkpoint (FrameStore) of the last full blend's frames, cleared by the next one or on exit
         self.zoomPanRef = []                                                            # List used to store the source image and coordinate that initiate a zoom panning event
         self.movingPoint = ['', '', 0, QtCore.QPoint(-1, -1), QtCore.QPoint(-1, -1)]    # List used to store the type of point being moved as well as it's source, index, previous & current coordinates
 
@@ -166,8 +223,6 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         self.endingImageType = ''                                               # String used to store the right image's file type
         self.leftTempPath = ''                                                  # String used to store temp file path for resizing left image in GUI
         self.rightTempPath = ''                                                 # String used to store temp file path for resizing right image in GUI
-        self.leftTempTextPath = ''                                              # String used to store temp file path for resizing left image in GUI
-        self.rightTempTextPath = ''                                             # String used to store temp text file path for resizing right image in GUI
         self.configFilePath = os.path.join(ROOT_DIR, 'configuration.txt')       # String used to store path for PIM's configuration file (GUI defaults)
 
         self.enableDeletion = 0                                                 # Flag used to indicate whether the most recently created point can be deleted with Backspace
@@ -195,9 +250,18 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         self.moveMode = False                                                   # Flag used to indicate whether the user is currently attempting to move specific points via GUI
 
         self.blendedImage = None                                                # Pre-made reference to a variable that is used to store a singular blended image
-        self.threadQueue = queue.Queue()                                        # Constructed queue of all image frames and their RGB[A] layers to be morphed when user starts a full blend. Aids in performance as well as preventing GUI lockup.
-        self.imager = ImagerThread()                                            # Object for handling asynchronous execution of blends for the layers of a single-frame blend
-        self.framer = FrameThread(self.threadQueue)                             # Object for handling asynchronous execution of blends for the layers of a multiple-frame blend (full blend)
+        self.lastBlend = None                                                   # Images, alpha, frame and meshes of the last single blend, from which a blend after a mesh edit only re-renders the changed triangles
+        self.threadQueue = queue.Queue()                                        # Constructed queue of all image frames to be morphed when user starts a full blend. Aids in performance as well as preventing GUI lockup.
+        self.pool = createPool()                                                # Long-lived pool of worker processes (pre-warmed with NumPy/SciPy) that is reused by every blend until the GUI is closed
+        self.renderCache = RenderCache(CACHE_DIR)                               # Persistent cache of rendered frames, which serves re-blends of unchanged images and points instantly
+        self.imager = ImagerThread(self.pool, self.renderCache)                 # Object for handling asynchronous execution of a single-frame blend
+        self.framer = FrameThread(self.threadQueue, self.pool, self.renderCache)  # Object for handling asynchronous execution of a multiple-frame blend (full blend)
+        self.scrubMemory = FrameLRU()                                           # Recently viewed frames while scrubbing the alpha slider (memory-capped)
+        self.scrubber = ScrubThread(self.pool, self.renderCache, self.scrubMemory)  # Object for rendering (and prefetching) frames on demand while scrubbing
+        self.scrubber.frame_ready.connect(self.scrubFinished)
+        self.scrubber.render_failed.connect(self.scrubFailed)
+        self.imager.preview_complete.connect(self.previewFinished)
+        self.scrubReady = False                                                 # Flag used to indicate whether the alpha slider can render frames on demand (after a blend)
         self.framer.frame_complete.connect(self.frameFinished)                  # Method signal definition to handle and render GUI updates as image frames are blended
         self.framer.update_progress.connect(self.updateProgress)                # Method signal definition to handle and render GUI updates as image frames are blended
 
@@ -229,6 +293,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         self.saveTab_multiRadio.clicked.connect(self.updateSaveTab)
         self.saveTab_frameRadio.clicked.connect(self.updateSaveTab)
         self.saveTab_gifRadio.clicked.connect(self.updateSaveTab)
+        self.saveTab_videoRadio.clicked.connect(self.updateSaveTab)
         self.saveTab_jpgRadio.clicked.connect(self.updateSaveTab)
         self.saveTab_pngRadio.clicked.connect(self.updateSaveTab)
         self.saveTab_folderSelectButton.clicked.connect(self.selectSaveFolder)
@@ -322,61 +387,49 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             elif source == self.triangleBlueValue:  self.verifyValue('blue')
         return super().eventFilter(source, event)
 
-    def imageFinished(self, blendList):
-        global start_time
-        if len(blendList) == 1:
-            self.blendedImage = blendList[0]
-            self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(self.blendedImage.data, self.blendedImage.shape[1], self.blendedImage.shape[0], QtGui.QImage.Format_Grayscale8)))
-            self.notificationLine.setText(" Morph took " + "{:.3f}".format(time.time() - start_time) + " seconds.\n")
-        elif len(blendList) == 3:
-            self.blendedImage = np.dstack((blendList[0], blendList[1], blendList[2]))
-            self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(self.blendedImage.data, self.blendedImage.shape[1], self.blendedImage.shape[0], self.blendedImage.shape[1] * 3, QtGui.QImage.Format_RGB888)))
-            self.notificationLine.setText(" RGB morph took " + "{:.3f}".format(time.time() - start_time) + " seconds.\n")
-        else:
-            self.blendedImage = np.dstack((blendList[0], blendList[1], blendList[2], blendList[3]))
-            self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(self.blendedImage.data, self.blendedImage.shape[1], self.blendedImage.shape[0], QtGui.QImage.Format_RGBA8888)))
-            self.notificationLine.setText(" RGBA morph took " + "{:.3f}".format(time.time() - start_time) + " seconds.\n")
+    # Macro function to save unnecessary repetitions of the same few lines of code.
+    # Displays a blended frame (grayscale, RGB or RGBA) in the blending window and returns a description of its format.
+    def setBlendingPixmap(self, image):
+        if image.ndim == 2:
+            self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(image.data, image.shape[1], image.shape[0], image.shape[1], QtGui.QImage.Format_Grayscale8)))
+            return "Morph"
+        elif image.shape[2] == 3:
+            self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(image.data, image.shape[1], image.shape[0], image.shape[1] * 3, QtGui.QImage.Format_RGB888)))
+            return "RGB morph"
+        elif image.shape[2] == 4:
+            self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(image.data, image.shape[1], image.shape[0], image.shape[1] * 4, QtGui.QImage.Format_RGBA8888)))
+            return "RGBA morph"
+        print("Generic catching error: Something went wrong when loading the image.")
+        return "Morph"
+
+    # Displays the reduced resolution preview of a single blend until the full resolution frame replaces it.
+    def previewFinished(self, previewImage):
+        imageFormat = self.setBlendingPixmap(previewImage)
+        self.notificationLine.setText(" " + imageFormat + " preview shown, refining to full resolution...")
+
+    def imageFinished(self, blendedImage):
+        global morpher, morpherDigest, alphaValue, start_time
+        self.blendedImage = blendedImage
+        self.lastBlend = (morpher.leftImage, morpher.rightImage, morpher.backend, alphaValue, blendedImage, morpher.leftVertices, morpher.rightVertices)
+        self.scrubMemory.put(frameKey(morpherDigest, alphaValue), blendedImage)  # Shown at once when scrubbing back to this alpha
+        self.scrubReady = True
+        imageFormat = self.setBlendingPixmap(self.blendedImage)
+        self.notificationLine.setText(" " + imageFormat + " took " + "{:.3f}".format(time.time() - start_time) + " seconds (cache: " + self.renderCache.getStatistics() + ").\n")
         self.updateMorphingWidget(True)
         self.updateSaveTab()
         self.setFocus()
 
-    def frameFinished(self, blendList):
+    def frameFinished(self, index, blendedImage):
         global start_time
-        if len(blendList) == 1:
-            self.blendList.append(blendList[0])
-            try:
-                temp = self.blendList[-1]
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], QtGui.QImage.Format_Grayscale8)))
-            except IndexError:
-                pass
-        elif len(blendList) == 3:
-            self.blendList.append(np.dstack((blendList[0], blendList[1], blendList[2])))
-            try:
-                temp = self.blendList[-1]
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], temp.shape[1] * 3, QtGui.QImage.Format_RGB888)))
-            except IndexError:
-                pass
-        else:
-            self.blendList.append(np.dstack((blendList[0], blendList[1], blendList[2], blendList[3])))
-            try:
-                temp = self.blendList[-1]
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], QtGui.QImage.Format_RGBA8888)))
-            except IndexError:
-                pass
-
-        if self.threadQueue.empty() and len(self.blendList) == math.ceil(1 / self.fullBlendValue) + 1:
-            temp = self.blendList[int(float(self.alphaValue.text()) / self.fullBlendValue)]
-            if len(blendList) == 1:
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], QtGui.QImage.Format_Grayscale8)))
-                self.notificationLine.setText(" Morph took " + "{:.3f}".format(time.time() - start_time) + " seconds.\n")
-            if len(blendList) == 3:
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], temp.shape[1] * 3, QtGui.QImage.Format_RGB888)))
-                self.notificationLine.setText(" RGB morph took " + "{:.3f}".format(time.time() - start_time) + " seconds.\n")
-            else:
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], QtGui.QImage.Format_RGBA8888)))
-                self.notificationLine.setText(" RGBA morph took " + "{:.3f}".format(time.time() - start_time) + " seconds.\n")
+        self.blendCount += 1
+        self.setBlendingPixmap(blendedImage)
+
+        if self.blendCount == len(self.blendList):
+            imageFormat = self.setBlendingPixmap(self.blendList[int(float(self.alphaValue.text()) / self.fullBlendValue)])
+            self.notificationLine.setText(" " + imageFormat + " took " + "{:.3f}".format(time.time() - start_time) + " seconds (cache: " + self.renderCache.getStatistics() + ").\n")
             self.updateMorphingWidget(True)
             self.fullBlendComplete = True
+            self.scrubReady = True
             self.updateSaveTab()
             self.animateProgressBar()
         self.setFocus()
@@ -409,9 +462,18 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             self.animationShrink.start()
 
     # Function override for when the program is closed.
-    # Ensures that the asynchronous resize event observer terminates and removes any temporary files generated.
+    # Ensures that the asynchronous resize event observer terminates, shuts down the worker pool, saves both point stores and removes any temporary files generated.
     def closeEvent(self, event):
+        global morpher
         self.openFlag = False
+        self.leftStore.close()
+        self.rightStore.close()
+        with morpherLock:
+            closePool(self.pool)
+            if morpher is not None:
+                morpher.release()
+        if self.frameStore is not None and self.fullBlendComplete:  # Interrupted blends are kept to be resumed
+            self.frameStore.clear()
         for file in os.listdir(ROOT_DIR):
             if file.startswith("PIM_Temp_"):
                 os.remove(os.path.join(ROOT_DIR, file))
@@ -656,6 +718,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
     # Handles dynamic GUI behavior of save tab with respect to morphing and user input
     def updateSaveTab(self):
         isOutput = self.blendingImage.hasScaledContents()
+        isAnimation = self.saveTab_gifRadio.isChecked() or self.saveTab_videoRadio.isChecked()  # Frame time, reverse and rewind apply to both
         self.saveTab_outputFormatGroup.setEnabled(isOutput)
         self.saveTab_fileSettingsGroup.setEnabled(isOutput)
         # self.saveTab_fileEstimateLabel.setEnabled(isOutput)
@@ -665,13 +728,13 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         self.saveButton.setEnabled(isOutput)
         self.saveTab_multiRadio.setEnabled(isOutput and self.saveTab_outputFormatGroup.isEnabled() and self.fullBlendComplete)
         self.saveTab_fullBlendGroup.setEnabled(isOutput and self.saveTab_outputFormatGroup.isEnabled() and self.fullBlendComplete and self.saveTab_multiRadio.isChecked())
-        self.saveTab_gifSettingsGroup.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
-        self.gifText.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
-        self.saveTab_checkBoxGroup.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
+        self.saveTab_gifSettingsGroup.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and isAnimation)
+        self.gifText.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and isAnimation)
+        self.saveTab_checkBoxGroup.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and isAnimation)
         self.saveTab_loopBox.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
-        self.saveTab_reverseBox.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
-        self.saveTab_rewindBox.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
-        self.saveTab_gifIntervalLabel.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
+        self.saveTab_reverseBox.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and isAnimation)
+        self.saveTab_rewindBox.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and isAnimation)
+        self.saveTab_gifIntervalLabel.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and isAnimation)
         self.saveTab_gifQualityBox.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
         self.saveTab_gifQualityLabel.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
         self.saveTab_gifQualitySlider.setEnabled(isOutput and self.saveTab_fullBlendGroup.isEnabled() and self.fullBlendComplete and self.saveTab_gifRadio.isChecked())
@@ -708,35 +771,14 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
 
         self.triangleBox.setEnabled(1)
 
-        counter = 0
+        leftPoints, rightPoints = [], []
         for leftPoint, rightPoint in zip(tempLeft, tempRight):
-            if leftPoint not in self.confirmed_left_points and leftPoint not in self.chosen_left_points and rightPoint not in self.confirmed_right_points and rightPoint not in self.chosen_right_points:
-                counter += 1
-                self.confirmed_left_points.append(leftPoint)
-                self.confirmed_right_points.append(rightPoint)
-                self.clicked_window_history.append(0)
-                self.clicked_window_history.append(1)
-
-                with open(self.startingTextCorePath, "a") as startingFile:
-                    if not os.stat(self.startingTextCorePath).st_size:  # left file is empty
-                        startingFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x() * self.trueLeftSize[0] / self.leftSize[0], ".1f")), str(format(self.confirmed_left_points[-1].y() * self.trueLeftSize[1] / self.leftSize[1], ".1f"))))
-                    else:
-                        startingFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x() * self.trueLeftSize[0] / self.leftSize[0], ".1f")), str(format(self.confirmed_left_points[-1].y() * self.trueLeftSize[1] / self.leftSize[1], ".1f"))))
-                with open(self.leftTempTextPath, "a") as startingTempFile:
-                    if not os.stat(self.leftTempTextPath).st_size:  # left file is empty
-                        startingTempFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x(), ".1f")), str(format(self.confirmed_left_points[-1].y(), ".1f"))))
-                    else:
-                        startingTempFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x(), ".1f")), str(format(self.confirmed_left_points[-1].y(), ".1f"))))
-                with open(self.endingTextCorePath, "a") as endingFile:
-                    if not os.stat(self.endingTextCorePath).st_size:  # right file is empty
-                        endingFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x() * self.trueRightSize[0] / self.rightSize[0], ".1f")), str(format(self.confirmed_right_points[-1].y() * self.trueRightSize[1] / self.rightSize[1], ".1f"))))
-                    else:
-                        endingFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x() * self.trueRightSize[0] / self.rightSize[0], ".1f")), str(format(self.confirmed_right_points[-1].y() * self.trueRightSize[1] / self.rightSize[1], ".1f"))))
-                with open(self.rightTempTextPath, "a") as endingTempFile:
-                    if not os.stat(self.rightTempTextPath).st_size:  # right file is empty
-                        endingTempFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x(), ".1f")), str(format(self.confirmed_right_points[-1].y(), ".1f"))))
-                    else:
-                        endingTempFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x(), ".1f")), str(format(self.confirmed_right_points[-1].y(), ".1f"))))
+            if self.leftIndex.nearest((leftPoint.x(), leftPoint.y()), 0) is None and self.rightIndex.nearest((rightPoint.x(), rightPoint.y()), 0) is None:
+                leftPoints.append(self.getTruePoint(leftPoint, 'LEFT'))
+                rightPoints.append(self.getTruePoint(rightPoint, 'RIGHT'))
+        counter = len(leftPoints)
+        if counter:
+            self.history.do(AddPointPairs(len(self.chosen_left_points) + len(self.confirmed_left_points), leftPoints, rightPoints, 'corner point' + ('s' if counter > 1 else '')))
         if counter:
             self.refreshPaint()
             if counter == 1:
@@ -756,52 +798,121 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
     def resetPoints(self):
         userResponse = QtWidgets.QMessageBox.question(self, "Warning", "Are you sure you want to reset points?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.Cancel)
         if userResponse == QtWidgets.QMessageBox.Yes:
-            self.triangleUpdatePref = int(self.triangleBox.isChecked())
-            self.blendButton.setEnabled(0)
-            self.resetPointsButton.setEnabled(0)
-            self.autoCornerButton.setEnabled(1)
-            self.triangleBox.setChecked(0)
-            self.triangleBox.setEnabled(0)
-            self.added_left_points.clear()
-            self.added_right_points.clear()
-            self.confirmed_left_points.clear()
-            self.confirmed_right_points.clear()
-            self.chosen_left_points.clear()
-            self.chosen_right_points.clear()
-            self.leftPolyList.clear()
-            self.rightPolyList.clear()
-
-            if os.path.isfile(self.startingTextCorePath):
-                os.remove(self.startingTextCorePath)
+            self.history.do(ReplacePoints(self.getPointState(), ((), (), 0, [], [])))
+            self.enableDeletion = 0
+            self.updatePointControls()
 
-            if os.path.isfile(self.endingTextCorePath):
-                os.remove(self.endingTextCorePath)
+            self.notificationLine.setText(" Successfully reset points.")
 
-            if os.path.isfile(self.leftTempTextPath):
-                os.remove(self.leftTempTextPath)
+    # Point editing methods, through which self.history applies and reverts its commands (see EditHistory in MorphingPoints.py).
+    # Point pairs are addressed by their index in the point stores - red points (loaded from the point files) first, then blue
+    # points (confirmed this session) - and given in original image coordinates; the displayed lists and the mesh follow along.
 
-            if os.path.isfile(self.rightTempTextPath):
-                os.remove(self.rightTempTextPath)
+    def addTempPoint(self, side, point):
+        (self.added_left_points if side == 'LEFT' else self.added_right_points).append(point)
 
-            self.enableDeletion = 0
-            self.refreshPaint()
+    def removeTempPoint(self, side):
+        (self.added_left_points if side == 'LEFT' else self.added_right_points).pop()
 
-            self.notificationLine.setText(" Successfully reset points.")
-
-    # Macro function to save unnecessary repetitions of the same few lines of code.
-    # Deletes the user's highlighted point pair (in delete mode) from all four relevant files in use.
-    def deletePoint(self, filePath):
-        index = self.movingPoint[2] + (0 if self.movingPoint[0] == 'red' else (len(self.chosen_left_points) if 'left' in filePath else len(self.chosen_right_points)))
-        data = open(filePath, 'r').readlines()
-        del data[index]
-        if data:
-            if len(data) - 1 > index:
-                data[index] = data[index][0:int(len(data[index]) - 1)] + '\n'
+    # Inserts point pairs from the given index on, as red points if saved is set (i.e. restoring deleted red points) or else blue.
+    def insertPointPairs(self, index, leftPoints, rightPoints, saved=False):
+        synced = len(self.leftStore) == len(self.rightStore) == len(self.triangulation)
+        for position, leftPoint, rightPoint in zip(range(index, index + len(leftPoints)), leftPoints, rightPoints):
+            leftDisplayPoint, rightDisplayPoint = self.getDisplayPoint(leftPoint, 'LEFT'), self.getDisplayPoint(rightPoint, 'RIGHT')
+            if saved:
+                self.chosen_left_points.insert(position, leftDisplayPoint)
+                self.chosen_right_points.insert(position, rightDisplayPoint)
             else:
-                data[-1] = data[-1][0:int(len(data[-1]) - 1)]  # Remove \n
-            open(filePath, 'w').writelines(data)
+                self.confirmed_left_points.insert(position - len(self.chosen_left_points), leftDisplayPoint)
+                self.confirmed_right_points.insert(position - len(self.chosen_right_points), rightDisplayPoint)
+            self.leftIndex.insert(position, (leftDisplayPoint.x(), leftDisplayPoint.y()))
+            self.rightIndex.insert(position, (rightDisplayPoint.x(), rightDisplayPoint.y()))
+            self.leftStore.insert(min(position, len(self.leftStore)), leftPoint)
+            self.rightStore.insert(min(position, len(self.rightStore)), rightPoint)
+            if synced:
+                self.triangulation.insertPoint(position, leftPoint, rightPoint)
+        if not synced:
+            self.loadTriangulation()
+
+    def deletePointPairs(self, index, count):
+        synced = len(self.leftStore) == len(self.rightStore) == len(self.triangulation)
+        for _ in range(count):
+            for chosen, confirmed in ((self.chosen_left_points, self.confirmed_left_points), (self.chosen_right_points, self.confirmed_right_points)):
+                if index < len(chosen):
+                    chosen.pop(index)
+                else:
+                    confirmed.pop(index - len(chosen))
+            self.leftIndex.delete(index)
+            self.rightIndex.delete(index)
+            self.leftStore.delete(index)
+            self.rightStore.delete(index)
+            if synced:
+                self.triangulation.deletePoint(index)
+        if not synced:
+            self.loadTriangulation()
+
+    def movePoint(self, index, side, point):
+        chosen, confirmed = (self.chosen_left_points, self.confirmed_left_points) if side == 'LEFT' else (self.chosen_right_points, self.confirmed_right_points)
+        displayPoint = self.getDisplayPoint(point, side)
+        if index < len(chosen):
+            chosen[index] = displayPoint
         else:
-            os.remove(filePath)
+            confirmed[index - len(chosen)] = displayPoint
+        (self.leftIndex if side == 'LEFT' else self.rightIndex).move(index, (displayPoint.x(), displayPoint.y()))
+        synced = len(self.leftStore) == len(self.rightStore) == len(self.triangulation)
+        (self.leftStore if side == 'LEFT' else self.rightStore).move(index, point)
+        if not synced:
+            self.loadTriangulation()
+        elif side == 'LEFT':
+            self.triangulation.movePoint(index, leftPoint=point)
+        else:
+            self.triangulation.movePoint(index, rightPoint=point)
+
+    # Returns every point as (left points, right points, number of red points, left temporary points, right temporary points).
+    def getPointState(self):
+        return self.leftStore.getPoints(), self.rightStore.getPoints(), len(self.chosen_left_points), list(self.added_left_points), list(self.added_right_points)
+
+    def setPointState(self, state):
+        leftPoints, rightPoints, savedCount, leftTempPoints, rightTempPoints = state
+        self.leftStore.setPoints(leftPoints)
+        self.rightStore.setPoints(rightPoints)
+        for store, chosen, confirmed, side in ((self.leftStore, self.chosen_left_points, self.confirmed_left_points, 'LEFT'), (self.rightStore, self.chosen_right_points, self.confirmed_right_points, 'RIGHT')):
+            displayPoints = [self.getDisplayPoint(point, side) for point in store.getPoints().tolist()]
+            chosen[:] = displayPoints[:savedCount]
+            confirmed[:] = displayPoints[savedCount:]
+        self.added_left_points[:] = leftTempPoints
+        self.added_right_points[:] = rightTempPoints
+        self.indexPoints()
+        self.loadTriangulation()
+
+    # Rebuilds both spatial indices from the displayed red and blue points, e.g. once they have all been rescaled.
+    def indexPoints(self):
+        self.leftIndex.setPoints([(point.x(), point.y()) for point in self.chosen_left_points + self.confirmed_left_points])
+        self.rightIndex.setPoints([(point.x(), point.y()) for point in self.chosen_right_points + self.confirmed_right_points])
+
+    # Persists the edits of a command to both point stores at once.
+    def flushEdits(self):
+        self.leftStore.flush()
+        self.rightStore.flush()
+
+    # Updates the controls that depend on the points (and the displayed triangles), e.g. after an undo or a redo.
+    def updatePointControls(self):
+        pairs = len(self.chosen_left_points) + len(self.confirmed_left_points)
+        if pairs == len(self.chosen_right_points) + len(self.confirmed_right_points) >= 3:
+            if not self.triangleBox.isEnabled():
+                self.triangleBox.setEnabled(1)
+                self.triangleBox.setChecked(self.triangleUpdatePref)
+            self.blendButton.setEnabled(1)
+        else:
+            if self.triangleBox.isEnabled():
+                self.triangleUpdatePref = int(self.triangleBox.isChecked())
+            self.triangleBox.setChecked(0)
+            self.triangleBox.setEnabled(0)
+            self.blendButton.setEnabled(0)
+        self.resetPointsButton.setEnabled(bool(pairs))
+        self.autoCornerButton.setEnabled(len(self.added_left_points) == len(self.added_right_points) == 0)
+        self.displayTriangles()
+        self.refreshPaint()
 
     # Function that resets the alpha slider (for use after setting a full blend value that has modified the slider).
     # Resets the full blend value as well, just to prevent any weird behavior from ever occurring.
@@ -1029,131 +1140,35 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             self.tabWidget.setCurrentIndex(max(self.tabWidget.currentIndex() - 1, 0))
         # Undo
         if type(key_event) == QtGui.QKeyEvent and key_event.modifiers() == QtCore.Qt.ControlModifier and key_event.key() == QtCore.Qt.Key_Z:
-            undoFlag = 0
-            if self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents():
-                if self.clicked_window_history[-1] == 1 and len(self.added_right_points):
-                    self.placed_points_history.append([self.added_right_points.pop(), self.clicked_window_history.pop()])
-                    undoFlag = 1
-                    self.notificationLine.setText(" Removed right temporary point!")
-                elif self.clicked_window_history[-1] == 0 and len(self.added_left_points):
-                    self.placed_points_history.append([self.added_left_points.pop(), self.clicked_window_history.pop()])
-                    undoFlag = 1
-                    self.notificationLine.setText(" Removed left temporary point!")
-                elif len(self.confirmed_left_points) and len(self.confirmed_right_points):
-                    self.clicked_window_history.pop()
-                    self.clicked_window_history.pop()
-                    self.placed_points_history.append((self.confirmed_left_points.pop(), self.confirmed_right_points.pop()))
-
-                    data1 = open(self.startingTextCorePath, 'r').readlines()
-                    del data1[-1]
-                    if data1:
-                        data1[-1] = data1[-1][0:int(len(data1[-1]) - 1)]  # Remove \n from the previously second to last line
-                        open(self.startingTextCorePath, 'w').writelines(data1)
-                    else:
-                        os.remove(self.startingTextCorePath)
-                    data2 = open(self.endingTextCorePath, 'r').readlines()
-                    del data2[-1]
-                    if data2:
-                        data2[-1] = data2[-1][0:int(len(data2[-1]) - 1)]  # Remove \n from the previously second to last line
-                        open(self.endingTextCorePath, 'w').writelines(data2)
-                    else:
-                        os.remove(self.endingTextCorePath)
-
-                    data3 = open(self.leftTempTextPath, 'r').readlines()
-                    del data3[-1]
-                    if data3:
-                        data3[-1] = data3[-1][0:int(len(data3[-1]) - 1)]  # Remove \n from the previously second to last line
-                        open(self.leftTempTextPath, 'w').writelines(data3)
-                    else:
-                        os.remove(self.leftTempTextPath)
-                    data4 = open(self.rightTempTextPath, 'r').readlines()
-                    del data4[-1]
-                    if data4:
-                        data4[-1] = data4[-1][0:int(len(data4[-1]) - 1)]  # Remove \n from the previously second to last line
-                        open(self.rightTempTextPath, 'w').writelines(data4)
-                    else:
-                        os.remove(self.rightTempTextPath)
-
-                    if len(self.chosen_left_points) + len(self.confirmed_left_points) >= 3:
-                        self.displayTriangles()
-                        self.blendButton.setEnabled(1)
-                    else:
-                        self.triangleUpdatePref = int(self.triangleBox.isChecked())
-                        self.triangleBox.setChecked(0)
-                        self.triangleBox.setEnabled(0)
-                        self.blendButton.setEnabled(0)
-                        self.displayTriangles()
-                        if len(self.chosen_left_points) + len(self.confirmed_left_points) == 0:
-                            self.resetPointsButton.setEnabled(0)
-                    undoFlag = 1
-                    self.notificationLine.setText(" Removed confirmed point pair!")
-                self.refreshPaint()
-            self.autoCornerButton.setEnabled(len(self.added_left_points) == len(self.added_right_points) == 0)
-            if undoFlag == 0:
+            command = None
+            if self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents() and not self.hoverFlag:
+                command = self.history.undo()
+            if command is None:
                 self.notificationLine.setText(" Can't undo!")
+                return
+            self.enableDeletion = int(isinstance(self.history.peek(), AddTempPoint))
+            self.updatePointControls()
+            self.notificationLine.setText(" Undid " + command.name + "!")
 
         # Redo
         elif type(key_event) == QtGui.QKeyEvent and key_event.modifiers() == QtCore.Qt.ControlModifier and key_event.key() == QtCore.Qt.Key_Y:
-            if not len(self.placed_points_history) > 0:
+            command = None
+            if not self.hoverFlag:
+                command = self.history.redo()
+            if command is None:
                 self.notificationLine.setText(" Can't redo!")
                 return
-
-            recoveredData = self.placed_points_history.pop()
-            if type(recoveredData) is list:  # Restore added point
-                if recoveredData[1] == 0:
-                    self.added_left_points.append(recoveredData[0])
-                    self.clicked_window_history.append(0)
-                    self.notificationLine.setText(" Recovered left temporary point!")
-                elif recoveredData[1] == 1:
-                    self.added_right_points.append(recoveredData[0])
-                    self.clicked_window_history.append(1)
-                    self.notificationLine.setText(" Recovered right temporary point!")
-                self.refreshPaint()
-                self.enableDeletion = 1
-                self.autoCornerButton.setEnabled(0)
-            elif type(recoveredData) is tuple:  # Restore confirmed point pair
-                self.confirmed_left_points.append(recoveredData[0])
-                self.confirmed_right_points.append(recoveredData[1])
-                self.clicked_window_history.append(0)
-                self.clicked_window_history.append(1)
-
-                with open(self.startingTextCorePath, "a") as startingFile:
-                    if not os.stat(self.startingTextCorePath).st_size:  # left file is empty
-                        startingFile.write('{:>8}{:>8}'.format(
-                            str(format(self.confirmed_left_points[-1].x(), ".1f")),
-                            str(format(self.confirmed_left_points[-1].y(), ".1f"))))
-                    else:
-                        startingFile.write('\n{:>8}{:>8}'.format(
-                            str(format(self.confirmed_left_points[-1].x(), ".1f")),
-                            str(format(self.confirmed_left_points[-1].y(), ".1f"))))
-                with open(self.endingTextCorePath, "a") as endingFile:
-                    if not os.stat(self.endingTextCorePath).st_size:  # right file is empty
-                        endingFile.write('{:>8}{:>8}'.format(
-                            str(format(self.confirmed_right_points[-1].x(), ".1f")),
-                            str(format(self.confirmed_right_points[-1].y(), ".1f"))))
-                    else:
-                        endingFile.write('\n{:>8}{:>8}'.format(
-                            str(format(self.confirmed_right_points[-1].x(), ".1f")),
-                            str(format(self.confirmed_right_points[-1].y(), ".1f"))))
-                self.refreshPaint()
-                self.displayTriangles()
-                self.autoCornerButton.setEnabled(1)
-                self.resetPointsButton.setEnabled(1)
-                self.notificationLine.setText(" Recovered confirmed point pair!")
+            self.enableDeletion = int(isinstance(command, AddTempPoint))
+            self.updatePointControls()
+            self.notificationLine.setText(" Redid " + command.name + "!")
 
         # Delete recent temp
         elif type(key_event) == QtGui.QKeyEvent and key_event.key() == QtCore.Qt.Key_Backspace:
-            if self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents() and self.enableDeletion == 1:
-                if self.clicked_window_history[-1] == 1 and len(self.added_right_points):
-                    self.placed_points_history.append([self.added_right_points.pop(), self.clicked_window_history.pop()])
-                    self.enableDeletion = 0
-                    self.refreshPaint()
-                    self.notificationLine.setText(" Successfully deleted recent temporary point.")
-                elif self.clicked_window_history[-1] == 0 and len(self.added_left_points):
-                    self.placed_points_history.append([self.added_left_points.pop(), self.clicked_window_history.pop()])
-                    self.enableDeletion = 0
-                    self.refreshPaint()
-                    self.notificationLine.setText(" Successfully deleted recent temporary point.")
+            if self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents() and self.enableDeletion == 1 and isinstance(self.history.peek(), AddTempPoint):
+                self.history.undo()
+                self.enableDeletion = 0
+                self.refreshPaint()
+                self.notificationLine.setText(" Successfully deleted recent temporary point.")
                 self.autoCornerButton.setEnabled(len(self.added_left_points) == len(self.added_right_points) == 0)
 
     # Function override of the window resize event.
@@ -1195,22 +1210,6 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             cv2.imwrite(self.rightTempPath, tempRight)
             self.rightSize = (tempRight.shape[1], tempRight.shape[0])
 
-            # Update Text Files (for Triangle Display)
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                if os.path.isfile(self.leftTempTextPath):
-                    tempData = np.loadtxt(self.leftTempTextPath)
-                    for x in tempData:
-                        x *= (self.leftSize[0] / self.lastLeftSize[0], self.leftSize[1] / self.lastLeftSize[1])
-                    np.savetxt(self.leftTempTextPath, tempData, fmt='%.1f')
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                if os.path.isfile(self.rightTempTextPath):
-                    tempData = np.loadtxt(self.rightTempTextPath)
-                    for y in tempData:
-                        y *= (self.rightSize[0] / self.lastRightSize[0], self.rightSize[1] / self.lastRightSize[1])
-                    np.savetxt(self.rightTempTextPath, tempData, fmt='%.1f')
-
             # Scale Green Points
             if self.added_left_points:
                 self.added_left_points[0] = QtCore.QPoint(int(self.added_left_points[0].x() * self.leftSize[0] / self.lastLeftSize[0]), int(self.added_left_points[0].y() * self.leftSize[1] / self.lastLeftSize[1]))
@@ -1230,6 +1229,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             self.lastLeftSize = (self.startingImage.width(), self.startingImage.height())
             self.lastRightSize = (self.endingImage.width(), self.endingImage.height())
             self.imageScalar = (self.leftSize[0] / self.startingImage.width(), self.leftSize[1] / self.startingImage.height())
+            self.indexPoints()
             self.displayTriangles()
             self.refreshPaint()
 
@@ -1254,21 +1254,11 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             textPath = ROOT_DIR + '/Images_Points/' + self.startingImageName + '-' + str(self.trueRightSize[0]) + 'x' + str(self.trueRightSize[1]) + '-' + self.startingImageType[1:] + '.txt'
             cv2.imwrite(path, img)
 
-            open(textPath, 'w').close()
-            writeFlag = False
-            with open(textPath, "a") as startingFile:
-                for pointPair in self.chosen_left_points:
-                    if not writeFlag:
-                        startingFile.write('{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
-                        writeFlag = True
-                    else:
-                        startingFile.write('\n{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
-                for pointPair in self.confirmed_left_points:
-                    if not writeFlag:
-                        startingFile.write('{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
-                        writeFlag = True
-                    else:
-                        startingFile.write('\n{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
+            self.leftStore.close()
+            self.leftStore = PointStore(textPath)
+            self.leftStore.setPoints([(pointPair.x(), pointPair.y()) for pointPair in self.chosen_left_points + self.confirmed_left_points])
+            self.history.clear()
+            self.indexPoints()
             self.startingImageName += '-' + str(self.rightSize[0]) + 'x' + str(self.rightSize[1])
             self.startingImagePath = path
             self.startingTextCorePath = textPath
@@ -1300,21 +1290,11 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             textPath = ROOT_DIR + '/Images_Points/' + self.endingImageName + '-' + str(self.trueLeftSize[0]) + 'x' + str(self.trueLeftSize[1]) + '-' + self.endingImageType[1:] + '.txt'
             cv2.imwrite(path, img)
 
-            open(textPath, 'w').close()
-            writeFlag = False
-            with open(textPath, "a") as endingFile:
-                for pointPair in self.chosen_right_points:
-                    if not writeFlag:
-                        endingFile.write('{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
-                        writeFlag = True
-                    else:
-                        endingFile.write('\n{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
-                for pointPair in self.confirmed_right_points:
-                    if not writeFlag:
-                        endingFile.write('{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
-                        writeFlag = True
-                    else:
-                        endingFile.write('\n{:>8}{:>8}'.format(str(format(pointPair.x(), ".1f")), str(format(pointPair.y(), ".1f"))))
+            self.rightStore.close()
+            self.rightStore = PointStore(textPath)
+            self.rightStore.setPoints([(pointPair.x(), pointPair.y()) for pointPair in self.chosen_right_points + self.confirmed_right_points])
+            self.history.clear()
+            self.indexPoints()
             self.endingImageName += '-' + str(self.trueLeftSize[0]) + 'x' + str(self.trueLeftSize[1])
             self.endingImagePath = path
             self.endingTextCorePath = textPath
@@ -1342,6 +1322,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             self.triangleBox.setEnabled(0)
             self.triangleBox.setChecked(0)
         self.autoCornerButton.setEnabled(1)
+        self.loadTriangulation()
         self.displayTriangles()
         self.resizeLeftButton.setStyleSheet("")
         self.resizeRightButton.setStyleSheet("")
@@ -1349,7 +1330,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
     # Function that handles GUI and file behavior when the mouse is clicked.
     def mousePressEvent(self, cursor_event):
         if (self.deleteMode or self.moveMode) and cursor_event.button() == QtCore.Qt.LeftButton:
-            if 15 < cursor_event.pos().x() < self.startingImage.geometry().topRight().x() + 15 and 38 < cursor_event.pos().y() < self.startingImage.geometry().bottomRight().y() + 38 and os.path.exists(self.leftTempTextPath):
+            if 15 < cursor_event.pos().x() < self.startingImage.geometry().topRight().x() + 15 and 38 < cursor_event.pos().y() < self.startingImage.geometry().bottomRight().y() + 38 and self.startingImage.hasScaledContents():
                 if not self.leftZoomData:
                     leftCoord = QtCore.QPoint(int(cursor_event.pos().x() * self.imageScalar[0]), int(cursor_event.pos().y() * self.imageScalar[1]))
                 else:
@@ -1358,21 +1339,18 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
                     yPos = int(self.leftZoomData[3] + int(cursor_event.pos().y() * self.imageScalar[1] / self.zoomSlider.value()))
                     leftCoord = QtCore.QPoint(xPos, yPos)
                 self.movingPoint[3] = QtCore.QPoint(-1, -1)
-                for index, x in enumerate(self.confirmed_left_points):
-                    if abs(float(x.x()) - (leftCoord.x() - 15)) <= self.pointSlider.value() - 1 and abs(float(x.y()) - (leftCoord.y() - 38)) <= self.pointSlider.value() - 1:
-                        if self.movingPoint[3] == QtCore.QPoint(-1, -1) or (self.movingPoint[3] != QtCore.QPoint(-1, -1) and math.sqrt(math.pow(leftCoord.x() - 15 - x.x(), 2) + math.pow(leftCoord.y() - 38 - x.y(), 2) < math.sqrt(math.pow(leftCoord.x() - 15 - self.movingPoint[3].x(), 2) + math.pow(leftCoord.y() - 38 - self.movingPoint[3].y(), 2)))):
-                            if not self.leftZoomData:
-                                self.movingPoint = ['blue', 'LEFT', index, x, QtCore.QPoint(leftCoord.x() - 15, leftCoord.y() - 38)]
-                            else:
-                                self.movingPoint = ['blue', 'LEFT', index, x, QtCore.QPoint(int(self.leftZoomData[2] + int((cursor_event.pos().x() - 15) * self.imageScalar[0] / self.zoomSlider.value())), int(self.leftZoomData[3] + int((cursor_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value())))]
-                for index, x in enumerate(self.chosen_left_points):
-                    if abs(float(x.x()) - (leftCoord.x() - 15)) <= self.pointSlider.value() - 1 and abs(float(x.y()) - (leftCoord.y() - 38)) <= self.pointSlider.value() - 1:
-                        if self.movingPoint[3] == QtCore.QPoint(-1, -1) or (self.movingPoint[3] != QtCore.QPoint(-1, -1) and math.sqrt(math.pow(leftCoord.x() - 15 - x.x(), 2) + math.pow(leftCoord.y() - 38 - x.y(), 2) < math.sqrt(math.pow(leftCoord.x() - 15 - self.movingPoint[3].x(), 2) + math.pow(leftCoord.y() - 38 - self.movingPoint[3].y(), 2)))):
-                            if not self.leftZoomData:
-                                self.movingPoint = ['red', 'LEFT', index, x, QtCore.QPoint(leftCoord.x() - 15, leftCoord.y() - 38)]
-                            else:
-                                self.movingPoint = ['red', 'LEFT', index, x, QtCore.QPoint(leftCoord.x() - 15, leftCoord.y() - 38)]
-            elif self.endingImage.geometry().topLeft().x() + 12 < cursor_event.pos().x() < self.endingImage.geometry().topRight().x() + 12 and 38 < cursor_event.pos().y() < self.endingImage.geometry().bottomRight().y() + 38 and os.path.exists(self.rightTempTextPath):
+                index = self.leftIndex.nearest((leftCoord.x() - 15, leftCoord.y() - 38), self.pointSlider.value() - 1)
+                if index is not None:
+                    red = index < len(self.chosen_left_points)
+                    if not self.leftZoomData or red:
+                        movedPoint = QtCore.QPoint(leftCoord.x() - 15, leftCoord.y() - 38)
+                    else:
+                        movedPoint = QtCore.QPoint(int(self.leftZoomData[2] + int((cursor_event.pos().x() - 15) * self.imageScalar[0] / self.zoomSlider.value())), int(self.leftZoomData[3] + int((cursor_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value())))
+                    if red:
+                        self.movingPoint = ['red', 'LEFT', index, self.chosen_left_points[index], movedPoint]
+                    else:
+                        self.movingPoint = ['blue', 'LEFT', index - len(self.chosen_left_points), self.confirmed_left_points[index - len(self.chosen_left_points)], movedPoint]
+            elif self.endingImage.geometry().topLeft().x() + 12 < cursor_event.pos().x() < self.endingImage.geometry().topRight().x() + 12 and 38 < cursor_event.pos().y() < self.endingImage.geometry().bottomRight().y() + 38 and self.endingImage.hasScaledContents():
                 if not self.rightZoomData:
                     rightCoord = QtCore.QPoint(int(cursor_event.pos().x() * self.imageScalar[0]), int(cursor_event.pos().y() * self.imageScalar[1]))
                 else:
@@ -1381,48 +1359,29 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
                     yPos = int(self.rightZoomData[3] + int(cursor_event.pos().y() * self.imageScalar[1] / self.zoomSlider.value()))
                     rightCoord = QtCore.QPoint(xPos, yPos)
                 self.movingPoint[3] = QtCore.QPoint(-1, -1)
-                for index, x in enumerate(self.confirmed_right_points):
-                    if abs(float(x.x()) - (rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12))) <= self.pointSlider.value() - 1 and abs(float(x.y()) - (rightCoord.y() - 38)) <= self.pointSlider.value() - 1:
-                        if self.movingPoint[3] == QtCore.QPoint(-1, -1) or (self.movingPoint[3] != QtCore.QPoint(-1, -1) and math.sqrt(math.pow(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12) - x.x(), 2) + math.pow(rightCoord.y() - 38 - x.y(), 2) < math.sqrt(math.pow(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12) - self.movingPoint[3].x(), 2) + math.pow(rightCoord.y() - 38 - self.movingPoint[3].y(), 2)))):
-                            if not self.rightZoomData:
-                                self.movingPoint = ['blue', 'RIGHT', index, x, QtCore.QPoint(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12), rightCoord.y() - 38)]
-                            else:
-                                self.movingPoint = ['blue', 'RIGHT', index, x, QtCore.QPoint(int(self.rightZoomData[2] + int((cursor_event.pos().x() - (self.endingImage.geometry().topLeft().x() + 12)) * self.imageScalar[0] / self.zoomSlider.value())), int(self.rightZoomData[3] + int((cursor_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value())))]
-                for index, x in enumerate(self.chosen_right_points):
-                    if abs(float(x.x()) - (rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12))) <= self.pointSlider.value() - 1 and abs(float(x.y()) - (rightCoord.y() - 38)) <= self.pointSlider.value() - 1:
-                        if self.movingPoint[3] == QtCore.QPoint(-1, -1) or (self.movingPoint[3] != QtCore.QPoint(-1, -1) and math.sqrt(math.pow(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12) - x.x(), 2) + math.pow(rightCoord.y() - 38 - x.y(), 2) < math.sqrt(math.pow(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12) - self.movingPoint[3].x(), 2) + math.pow(rightCoord.y() - 38 - self.movingPoint[3].y(), 2)))):
-                            if not self.rightZoomData:
-                                self.movingPoint = ['red', 'RIGHT', index, x, QtCore.QPoint(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12), rightCoord.y() - 38)]
-                            else:
-                                self.movingPoint = ['red', 'RIGHT', index, x, QtCore.QPoint(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12), rightCoord.y() - 38)]
+                index = self.rightIndex.nearest((rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12), rightCoord.y() - 38), self.pointSlider.value() - 1)
+                if index is not None:
+                    red = index < len(self.chosen_right_points)
+                    if not self.rightZoomData or red:
+                        movedPoint = QtCore.QPoint(rightCoord.x() - (self.endingImage.geometry().topLeft().x() + 12), rightCoord.y() - 38)
+                    else:
+                        movedPoint = QtCore.QPoint(int(self.rightZoomData[2] + int((cursor_event.pos().x() - (self.endingImage.geometry().topLeft().x() + 12)) * self.imageScalar[0] / self.zoomSlider.value())), int(self.rightZoomData[3] + int((cursor_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value())))
+                    if red:
+                        self.movingPoint = ['red', 'RIGHT', index, self.chosen_right_points[index], movedPoint]
+                    else:
+                        self.movingPoint = ['blue', 'RIGHT', index - len(self.chosen_right_points), self.confirmed_right_points[index - len(self.chosen_right_points)], movedPoint]
             if self.movingPoint[3] != QtCore.QPoint(-1, -1):
-                if self.movingPoint[1] == 'LEFT': (self.confirmed_left_points if self.movingPoint[0] == 'blue' else self.chosen_left_points).remove(self.movingPoint[3])
-                elif self.movingPoint[1] == 'RIGHT': (self.confirmed_right_points if self.movingPoint[0] == 'blue' else self.chosen_right_points).remove(self.movingPoint[3])
+                index = self.getMovingIndex()
                 if self.deleteMode:
-                    if self.movingPoint[1] == 'LEFT': (self.confirmed_right_points if self.movingPoint[0] == 'blue' else self.chosen_right_points).pop(self.movingPoint[2])
-                    elif self.movingPoint[1] == 'RIGHT': (self.confirmed_left_points if self.movingPoint[0] == 'blue' else self.chosen_left_points).pop(self.movingPoint[2])
-                    self.deletePoint(self.startingTextCorePath)
-                    self.deletePoint(self.leftTempTextPath)
-                    self.deletePoint(self.endingTextCorePath)
-                    self.deletePoint(self.rightTempTextPath)
-
-                    if len(self.chosen_left_points) + len(self.confirmed_left_points) >= 3:
-                        self.displayTriangles()
-                        self.blendButton.setEnabled(1)
-                    else:
-                        self.triangleUpdatePref = int(self.triangleBox.isChecked())
-                        self.triangleBox.setChecked(0)
-                        self.triangleBox.setEnabled(0)
-                        self.blendButton.setEnabled(0)
-                        self.displayTriangles()
-                        if len(self.chosen_left_points) + len(self.confirmed_left_points) == 0:
-                            self.resetPointsButton.setEnabled(0)
-                    self.refreshPaint()
-                    self.autoCornerButton.setEnabled(len(self.added_left_points) == len(self.added_right_points) == 0)
+                    self.history.do(DeletePointPair(index, self.leftStore.getPoint(index), self.rightStore.getPoint(index), self.movingPoint[0] == 'red'))
+                    self.enableDeletion = 0
+                    self.updatePointControls()
                 elif self.moveMode:
+                    if self.movingPoint[1] == 'LEFT': (self.confirmed_left_points if self.movingPoint[0] == 'blue' else self.chosen_left_points).pop(self.movingPoint[2])
+                    elif self.movingPoint[1] == 'RIGHT': (self.confirmed_right_points if self.movingPoint[0] == 'blue' else self.chosen_right_points).pop(self.movingPoint[2])
                     self.setMouseTracking(True)
                     self.hoverFlag = True
-                self.displayTriangles()
+                    self.displayTriangles()
         # LMB (Place Point)
         elif cursor_event.button() == QtCore.Qt.LeftButton:
             if self.trueLeftSize == self.trueRightSize:
@@ -1431,29 +1390,12 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
                 if self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents():
                     # If there are a set of points to confirm
                     if len(self.added_left_points) == len(self.added_right_points) == 1:
-                        self.placed_points_history.clear()
-                        self.confirmed_left_points.append(self.added_left_points.pop())
-                        self.confirmed_right_points.append(self.added_right_points.pop())
-                        with open(self.startingTextCorePath, "a") as startingFile:
-                            if not os.stat(self.startingTextCorePath).st_size:  # left file is empty
-                                startingFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x() * self.trueLeftSize[0] / self.leftSize[0], ".1f")), str(format(self.confirmed_left_points[-1].y() * self.trueLeftSize[1] / self.leftSize[1], ".1f"))))
-                            else:
-                                startingFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x() * self.trueLeftSize[0] / self.leftSize[0], ".1f")), str(format(self.confirmed_left_points[-1].y() * self.trueLeftSize[1] / self.leftSize[1], ".1f"))))
-                        with open(self.leftTempTextPath, "a") as startingTempFile:
-                            if not os.stat(self.leftTempTextPath).st_size:  # left file is empty
-                                startingTempFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x(), ".1f")), str(format(self.confirmed_left_points[-1].y(), ".1f"))))
-                            else:
-                                startingTempFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_left_points[-1].x(), ".1f")), str(format(self.confirmed_left_points[-1].y(), ".1f"))))
-                        with open(self.endingTextCorePath, "a") as endingFile:
-                            if not os.stat(self.endingTextCorePath).st_size:  # right file is empty
-                                endingFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x() * self.trueRightSize[0] / self.rightSize[0], ".1f")), str(format(self.confirmed_right_points[-1].y() * self.trueRightSize[1] / self.rightSize[1], ".1f"))))
-                            else:
-                                endingFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x() * self.trueRightSize[0] / self.rightSize[0], ".1f")), str(format(self.confirmed_right_points[-1].y() * self.trueRightSize[1] / self.rightSize[1], ".1f"))))
-                        with open(self.rightTempTextPath, "a") as endingTempFile:
-                            if not os.stat(self.rightTempTextPath).st_size:  # right file is empty
-                                endingTempFile.write('{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x(), ".1f")), str(format(self.confirmed_right_points[-1].y(), ".1f"))))
-                            else:
-                                endingTempFile.write('\n{:>8}{:>8}'.format(str(format(self.confirmed_right_points[-1].x(), ".1f")), str(format(self.confirmed_right_points[-1].y(), ".1f"))))
+                        index = len(self.chosen_left_points) + len(self.confirmed_left_points)
+                        leftPoint, rightPoint = self.getTruePoint(self.added_left_points[0], 'LEFT'), self.getTruePoint(self.added_right_points[0], 'RIGHT')
+                        self.history.replace(AddTempPoint, 2, AddPointPairs(index, [leftPoint], [rightPoint]))
+                        self.removeTempPoint('LEFT')
+                        self.removeTempPoint('RIGHT')
+                        self.enableDeletion = 0
                         self.refreshPaint()
                         self.displayTriangles()
                         self.autoCornerButton.setEnabled(1)
@@ -1461,31 +1403,27 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
                         self.notificationLine.setText(" Successfully confirmed set of added points.")
                     # LMB was clicked inside left image
                     if 15 < cursor_event.pos().x() < self.startingImage.geometry().topRight().x() + 15 and 38 < cursor_event.pos().y() < self.startingImage.geometry().bottomRight().y() + 38 and len(self.added_left_points) == 0:
-                        self.placed_points_history.clear()
                         if not self.leftZoomData:
                             leftCoord = QtCore.QPoint(int((cursor_event.pos().x() - 15) * self.imageScalar[0]), int((cursor_event.pos().y() - 38) * self.imageScalar[1]))
                         else:
                             xPos = int(self.leftZoomData[2] + int((cursor_event.pos().x() - 15) * self.imageScalar[0] / self.zoomSlider.value()))
                             yPos = int(self.leftZoomData[3] + int((cursor_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value()))
                             leftCoord = QtCore.QPoint(xPos, yPos)
-                        self.added_left_points.append(leftCoord)
+                        self.history.do(AddTempPoint('LEFT', leftCoord))
                         self.refreshPaint()
-                        self.clicked_window_history.append(0)
                         self.enableDeletion = 1
                         self.autoCornerButton.setEnabled(0)
                         self.notificationLine.setText(" Successfully added left temporary point.")
                     # LMB was clicked inside right image
                     elif self.endingImage.geometry().topLeft().x() + 12 < cursor_event.pos().x() < self.endingImage.geometry().topRight().x() + 12 and 38 < cursor_event.pos().y() < self.endingImage.geometry().bottomRight().y() + 38 and len(self.added_right_points) == 0:
-                        self.placed_points_history.clear()
                         if not self.rightZoomData:
                             rightCoord = QtCore.QPoint(int((cursor_event.pos().x() - (self.endingImage.geometry().topLeft().x() + 12)) * self.imageScalar[0]), int((cursor_event.pos().y() - 38) * self.imageScalar[1]))
                         else:
                             xPos = int(self.rightZoomData[2] + int((cursor_event.pos().x() - (self.endingImage.geometry().topLeft().x() + 12)) * self.imageScalar[0] / self.zoomSlider.value()))
                             yPos = int(self.rightZoomData[3] + int((cursor_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value()))
                             rightCoord = QtCore.QPoint(xPos, yPos)
-                        self.added_right_points.append(rightCoord)
+                        self.history.do(AddTempPoint('RIGHT', rightCoord))
                         self.refreshPaint()
-                        self.clicked_window_history.append(1)
                         self.enableDeletion = 1
                         self.notificationLine.setText(" Successfully added right temporary point.")
 
@@ -1566,6 +1504,14 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
                                                             int(self.rightZoomData[3] + int((move_event.pos().y() - 38) * self.imageScalar[1] / self.zoomSlider.value())))
                 self.refreshPaint()
 
+    # Returns the point store index of the point grabbed by a click (self.movingPoint): the red points of a side come first in
+    # its store, followed by its blue points.
+    def getMovingIndex(self):
+        color, side, index = self.movingPoint[:3]
+        if color == 'red':
+            return index
+        return index + len(self.chosen_left_points if side == 'LEFT' else self.chosen_right_points)
+
     # Function that ends the zoom panning process when MMB is released
     def mouseReleaseEvent(self, release_event):
         if release_event.button() == QtCore.Qt.MidButton and self.zoomPanRef:
@@ -1575,48 +1521,11 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         elif release_event.button() == QtCore.Qt.LeftButton and self.hoverFlag:
             self.setMouseTracking(False)
             self.hoverFlag = False
-            if self.movingPoint[1] == 'LEFT':
-                if self.movingPoint[0] == 'blue':
-                    self.confirmed_left_points.insert(self.movingPoint[2], self.movingPoint[4])
-                    origData = open(self.startingTextCorePath, 'r').readlines()
-                    if origData:
-                        origData[len(self.chosen_left_points) + self.movingPoint[2]] = ('\n' if len(self.chosen_left_points) + self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.confirmed_left_points[self.movingPoint[2]].x() * self.trueLeftSize[0] / self.leftSize[0], ".1f")), str(format(self.confirmed_left_points[self.movingPoint[2]].y() * self.trueLeftSize[1] / self.leftSize[1], ".1f"))) + ('\n' if len(self.chosen_left_points) + self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.startingTextCorePath, 'w').writelines(origData)
-                    tempData = open(self.leftTempTextPath, 'r').readlines()
-                    if tempData:
-                        tempData[len(self.chosen_left_points) + self.movingPoint[2]] = ('\n' if len(self.chosen_left_points) + self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.confirmed_left_points[self.movingPoint[2]].x(), ".1f")), str(format(self.confirmed_left_points[self.movingPoint[2]].y(), ".1f"))) + ('\n' if len(self.chosen_left_points) + self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.leftTempTextPath, 'w').writelines(tempData)
-                elif self.movingPoint[0] == 'red':
-                    self.chosen_left_points.insert(self.movingPoint[2], self.movingPoint[4])
-                    origData = open(self.startingTextCorePath, 'r').readlines()
-                    if origData:
-                        origData[self.movingPoint[2]] = ('\n' if self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.chosen_left_points[self.movingPoint[2]].x() * self.trueLeftSize[0] / self.leftSize[0], ".1f")), str(format(self.chosen_left_points[self.movingPoint[2]].y() * self.trueLeftSize[1] / self.leftSize[1], ".1f"))) + ('\n' if self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.startingTextCorePath, 'w').writelines(origData)
-                    tempData = open(self.leftTempTextPath, 'r').readlines()
-                    if tempData:
-                        tempData[self.movingPoint[2]] = ('\n' if self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.chosen_left_points[self.movingPoint[2]].x(), ".1f")), str(format(self.chosen_left_points[self.movingPoint[2]].y(), ".1f"))) + ('\n' if self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.leftTempTextPath, 'w').writelines(tempData)
-            elif self.movingPoint[1] == 'RIGHT':
-                if self.movingPoint[0] == 'blue':
-                    self.confirmed_right_points.insert(self.movingPoint[2], self.movingPoint[4])
-                    origData = open(self.endingTextCorePath, 'r').readlines()
-                    if origData:
-                        origData[len(self.chosen_right_points) + self.movingPoint[2]] = ('\n' if len(self.chosen_right_points) + self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.confirmed_right_points[self.movingPoint[2]].x() * self.trueRightSize[0] / self.rightSize[0], ".1f")), str(format(self.confirmed_right_points[self.movingPoint[2]].y() * self.trueRightSize[1] / self.rightSize[1], ".1f"))) + ('\n' if len(self.chosen_right_points) + self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.endingTextCorePath, 'w').writelines(origData)
-                    tempData = open(self.rightTempTextPath, 'r').readlines()
-                    if tempData:
-                        tempData[len(self.chosen_right_points) + self.movingPoint[2]] = ('\n' if len(self.chosen_right_points) + self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.confirmed_right_points[self.movingPoint[2]].x(), ".1f")), str(format(self.confirmed_right_points[self.movingPoint[2]].y(), ".1f"))) + ('\n' if len(self.chosen_right_points) + self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.rightTempTextPath, 'w').writelines(tempData)
-                elif self.movingPoint[0] == 'red':
-                    self.chosen_right_points.insert(self.movingPoint[2], self.movingPoint[4])
-                    origData = open(self.endingTextCorePath, 'r').readlines()
-                    if origData:
-                        origData[self.movingPoint[2]] = ('\n' if self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.chosen_right_points[self.movingPoint[2]].x() * self.trueRightSize[0] / self.rightSize[0], ".1f")), str(format(self.chosen_right_points[self.movingPoint[2]].y() * self.trueRightSize[1] / self.rightSize[1], ".1f"))) + ('\n' if self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.endingTextCorePath, 'w').writelines(origData)
-                    tempData = open(self.rightTempTextPath, 'r').readlines()
-                    if tempData:
-                        tempData[self.movingPoint[2]] = ('\n' if self.movingPoint[2] == 0 else '') + '{:>8}{:>8}'.format(str(format(self.chosen_right_points[self.movingPoint[2]].x(), ".1f")), str(format(self.chosen_right_points[self.movingPoint[2]].y(), ".1f"))) + ('\n' if self.movingPoint[2] != len(origData) - 1 else '')
-                        open(self.rightTempTextPath, 'w').writelines(tempData)
+            index = self.getMovingIndex()
+            store = self.leftStore if self.movingPoint[1] == 'LEFT' else self.rightStore
+            ((self.confirmed_left_points if self.movingPoint[0] == 'blue' else self.chosen_left_points) if self.movingPoint[1] == 'LEFT' else (self.confirmed_right_points if self.movingPoint[0] == 'blue' else self.chosen_right_points)).insert(self.movingPoint[2], self.movingPoint[3])
+            self.history.do(MovePoint(index, self.movingPoint[1], store.getPoint(index), self.getTruePoint(self.movingPoint[4], self.movingPoint[1])))
+            self.enableDeletion = 0
             self.displayTriangles()
 
     # Very simple function for updating user preference for blending transparency in images
@@ -1634,20 +1543,14 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
 
     # Function that dynamically updates the list of triangles for the image pair provided, when manually invoked.
     # When a process wants to see triangles update properly, THIS is what needs to be called (not self.triangleUpdate).
+    # The triangles come from the in-memory mesh (self.triangulation), scaled to the displayed images - no point file is read.
     def displayTriangles(self):
         if self.triangleBox.isEnabled() and (self.triangleBox.isChecked() or self.triangleUpdatePref):
-            if os.path.exists(self.leftTempTextPath) and os.path.exists(self.rightTempTextPath):
+            if len(self.triangulation.simplices) and self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents():
                 self.updateTriangleWidget(1)
-                leftTriList, rightTriList = loadTriangles(self.leftTempTextPath, self.rightTempTextPath)
-                self.leftPolyList.clear()
-                self.rightPolyList.clear()
-
-                for x in leftTriList:
-                    temp = QtGui.QPolygon((QtCore.QPoint(int(x.vertices[0][0]), int(x.vertices[0][1])), QtCore.QPoint(int(x.vertices[1][0]), int(x.vertices[1][1])), QtCore.QPoint(int(x.vertices[2][0]), int(x.vertices[2][1])), QtCore.QPoint(int(x.vertices[0][0]), int(x.vertices[0][1]))))
-                    self.leftPolyList.append(temp)
-                for y in rightTriList:
-                    temp = QtGui.QPolygon((QtCore.QPoint(int(y.vertices[0][0]), int(y.vertices[0][1])), QtCore.QPoint(int(y.vertices[1][0]), int(y.vertices[1][1])), QtCore.QPoint(int(y.vertices[2][0]), int(y.vertices[2][1])), QtCore.QPoint(int(y.vertices[0][0]), int(y.vertices[0][1]))))
-                    self.rightPolyList.append(temp)
+                leftVertices, rightVertices = self.triangulation.getVertices()
+                self.leftPolyList = self.getPolygons(leftVertices * (self.leftSize[0] / self.trueLeftSize[0], self.leftSize[1] / self.trueLeftSize[1]), self.leftPolyCache)
+                self.rightPolyList = self.getPolygons(rightVertices * (self.rightSize[0] / self.trueRightSize[0], self.rightSize[1] / self.trueRightSize[1]), self.rightPolyCache)
                 self.triangleUpdate = 1
                 self.refreshPaint()
 
@@ -1659,24 +1562,71 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         self.triangleUpdate = 0
         self.refreshPaint()
 
+    # Returns the polygons of an (N, 3, 2) stack of displayed triangle vertices. Polygons of triangles that were displayed by the
+    # previous call are reused from cache (which is then replaced by the current ones), so an edit only builds those it changed.
+    def getPolygons(self, vertices, cache):
+        polygons = []
+        currentCache = {}
+        for corners in vertices.reshape(-1, 6).astype(int).tolist():
+            key = tuple(corners)
+            polygon = cache.get(key)
+            if polygon is None:
+                polygon = QtGui.QPolygon((QtCore.QPoint(corners[0], corners[1]), QtCore.QPoint(corners[2], corners[3]), QtCore.QPoint(corners[4], corners[5]), QtCore.QPoint(corners[0], corners[1])))
+            currentCache[key] = polygon
+            polygons.append(polygon)
+        cache.clear()
+        cache.update(currentCache)
+        return polygons
+
+    # Returns a displayed point of the left or right image in the original image's coordinates, rounded like the point files.
+    def getTruePoint(self, point, side):
+        if side == 'LEFT':
+            return round(point.x() * self.trueLeftSize[0] / self.leftSize[0], 1), round(point.y() * self.trueLeftSize[1] / self.leftSize[1], 1)
+        return round(point.x() * self.trueRightSize[0] / self.rightSize[0], 1), round(point.y() * self.trueRightSize[1] / self.rightSize[1], 1)
+
+    # Returns a point of the left or right original image in the displayed image's coordinates (the inverse of getTruePoint()).
+    def getDisplayPoint(self, point, side):
+        if side == 'LEFT':
+            return QtCore.QPoint(int(round(point[0] * self.leftSize[0] / self.trueLeftSize[0], 1)), int(round(point[1] * self.leftSize[1] / self.trueLeftSize[1], 1)))
+        return QtCore.QPoint(int(round(point[0] * self.rightSize[0] / self.trueRightSize[0], 1)), int(round(point[1] * self.rightSize[1] / self.trueRightSize[1], 1)))
+
+    # Rebuilds the in-memory mesh from both point stores, e.g. once an image has been (re)loaded or resized.
+    # The mesh is left empty until both images are loaded with the same number of points.
+    def loadTriangulation(self):
+        leftPoints, rightPoints = self.leftStore.getPoints(), self.rightStore.getPoints()
+        if not (self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents()) or len(leftPoints) != len(rightPoints):
+            leftPoints = rightPoints = ()
+        self.triangulation.setPoints(leftPoints, rightPoints)
+
     # Function that handles movement of the alpha slider.
     # Typically will only update the alpha value in use unless a full blend has been completed (and is available).
     # If so, movement of this slider will also display the new alpha value's corresponding morph frame.
+    # Otherwise, once any blend has been made, the frame is rendered on demand (scrubbing) - instantly if it was viewed recently.
     def updateAlpha(self):
+        global morpherDigest
         value_num = ((self.alphaSlider.value() / self.alphaSlider.maximum()) / self.fullBlendValue) * self.fullBlendValue
-        value = format(value_num, ".3f")
+        value = format(sliderAlpha(self.alphaSlider.value(), self.alphaSlider.maximum()), ".3f")
         self.notificationLine.setText(" Alpha value changed from " + self.alphaValue.text() + " to " + str(value) + ".")
         self.alphaValue.setText(str(value))
         if self.fullBlendComplete:
-            temp = self.blendList[round(value_num / self.fullBlendValue)]
-            if len(temp.shape) == 2:
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], QtGui.QImage.Format_Grayscale8)))
-            elif temp.shape[2] == 3:
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], temp.shape[1] * 3, QtGui.QImage.Format_RGB888)))
-            elif temp.shape[2] == 4:
-                self.blendingImage.setPixmap(QtGui.QPixmap.fromImage(QtGui.QImage(temp.data, temp.shape[1], temp.shape[0], QtGui.QImage.Format_RGBA8888)))
-            else:
-                print("Generic catching error: Something went wrong when loading the image.")
+            self.setBlendingPixmap(self.blendList[round(value_num / self.fullBlendValue)])
+        elif self.scrubReady:
+            blendedImage = self.scrubMemory.get(frameKey(morpherDigest, sliderAlpha(self.alphaSlider.value(), self.alphaSlider.maximum())))
+            if blendedImage is not None:
+                self.blendedImage = blendedImage
+                self.setBlendingPixmap(blendedImage)
+            self.scrubber.request(self.alphaSlider.value(), self.alphaSlider.maximum())
+            if not self.scrubber.isRunning():
+                self.scrubber.start()
+
+    # Displays a frame rendered while scrubbing, unless the slider has already moved on to another alpha.
+    def scrubFinished(self, value, maximum, blendedImage):
+        if self.scrubReady and not self.fullBlendComplete and value == self.alphaSlider.value() and maximum == self.alphaSlider.maximum():
+            self.blendedImage = blendedImage
+            self.setBlendingPixmap(blendedImage)
+
+    def scrubFailed(self, error):
+        self.notificationLine.setText(" Failed to render the frame at alpha " + self.alphaValue.text() + " (" + error + ")")
 
     # Function that handles movement of the quality slider
     def updateGifQuality(self):
@@ -1696,88 +1646,79 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
     #     > 24-Bit Color .JPG / .PNG                   (QtGui.QImage.Format_RGB888)
     #     > 24-Bit Color, 8-Bit Transparency .PNG      (QtGui.QImage.Format_RGBA8888)
     def blendImages(self):
-        global grayScale, colorScaleR, colorScaleG, colorScaleB, colorScaleA, alphaValue, start_time
+        global morpher, morpherDigest, alphaValue, start_time
         self.updateMorphingWidget(False)
-        triangleTuple = loadTriangles(self.startingTextCorePath, self.endingTextCorePath)
+        self.scrubReady = False
+        mesh = self.triangulation.getMesh()  # The mesh displayed by displayTriangles(), kept in sync with the point stores
         leftImageRaw = cv2.imread(self.startingImagePath)
         rightImageRaw = cv2.imread(self.endingImagePath)
-        leftImageARR = np.asarray(leftImageRaw)
-        rightImageARR = np.asarray(rightImageRaw)
         self.progressBar.setValue(0)
         self.blendedImage = None
-        grayScale = None
-        colorScaleR = None
-        colorScaleG = None
-        colorScaleB = None
-        colorScaleA = None
+        with morpherLock:  # Waits for a frame the scrubber is rendering with the previous morpher
+            morpherDigest = None
+            if morpher is not None:
+                morpher.release()  # The previous blend is done with, so free its shared memory
+            morpher = None
         errorFlag = False
 
         if self.blendBox.isChecked() and self.blendText.text() == '.':
             self.notificationLine.setText(" Failed to morph. Please disable full blending or specify a valid value (0.001 to 0.25)")
             errorFlag = True
+        elif not len(mesh):
+            self.notificationLine.setText(" Failed to morph. Please place at least three point pairs that don't lie on a single line.")
+            errorFlag = True
         elif len(leftImageRaw.shape) != len(rightImageRaw.shape):
             self.notificationLine.setText(" Failed to morph due to difference in image formats. Check image file types..")
             errorFlag = True
         elif len(leftImageRaw.shape) == len(rightImageRaw.shape) < 3:  # if grayscale
             self.notificationLine.setText(" Calculating grayscale morph...")
-            grayScale = Morpher(leftImageARR, triangleTuple[0], rightImageARR, triangleTuple[1])
-            alphaValue = float(self.alphaValue.text())
-            self.fullBlendComplete = False
-            self.blendList.clear()
-            start_time = time.time()
+            morpher = Morpher(leftImageRaw, mesh, rightImageRaw, backend='cv2')
             if self.blendBox.isChecked():
-                self.animateProgressBar()
                 self.verifyValue("blend")
-                for x in range(0, math.ceil(1 / self.fullBlendValue) + 1, 1):
-                    x *= self.fullBlendValue
-                    self.threadQueue.put(x)
-                self.framer.start()
-            else:
-                self.gifText.setEnabled(0)
-                self.imager.start()
-                self.imager.image_complete.connect(self.imageFinished)
         elif not self.transparencyBox.isChecked() or (leftImageRaw.shape[2] == rightImageRaw.shape[2] == 3):  # if color, no alpha (.JPG)
             self.notificationLine.setText(" Calculating RGB (.jpg) morph...")
-            self.fullBlendComplete = False
-            self.blendList.clear()
-            colorScaleB = Morpher(leftImageARR[:, :, 0], triangleTuple[0], rightImageARR[:, :, 0], triangleTuple[1])
-            colorScaleG = Morpher(leftImageARR[:, :, 1], triangleTuple[0], rightImageARR[:, :, 1], triangleTuple[1])
-            colorScaleR = Morpher(leftImageARR[:, :, 2], triangleTuple[0], rightImageARR[:, :, 2], triangleTuple[1])
-            alphaValue = float(self.alphaValue.text())
-            start_time = time.time()
-            if self.blendBox.isChecked():
-                self.animateProgressBar()
-                for x in range(0, math.ceil(1 / self.fullBlendValue) + 1, 1):
-                    x *= self.fullBlendValue
-                    self.threadQueue.put(x)
-                self.framer.start()
-            else:
-                self.gifText.setEnabled(0)
-                self.imager.start()
-                self.imager.image_complete.connect(self.imageFinished)
+            colorConversion = cv2.COLOR_BGR2RGB if leftImageRaw.shape[2] == 3 else cv2.COLOR_BGRA2RGB
+            morpher = Morpher(cv2.cvtColor(leftImageRaw, colorConversion), mesh, cv2.cvtColor(rightImageRaw, colorConversion), backend='cv2')
         elif self.transparencyBox.isChecked() and leftImageRaw.shape[2] == rightImageRaw.shape[2] == 4:   # if color, alpha (.PNG)
             self.notificationLine.setText(" Calculating RGBA (.png) morph...")
             QtCore.QCoreApplication.processEvents()
-            colorScaleB = Morpher(leftImageARR[:, :, 0], triangleTuple[0], rightImageARR[:, :, 0], triangleTuple[1])
-            colorScaleG = Morpher(leftImageARR[:, :, 1], triangleTuple[0], rightImageARR[:, :, 1], triangleTuple[1])
-            colorScaleR = Morpher(leftImageARR[:, :, 2], triangleTuple[0], rightImageARR[:, :, 2], triangleTuple[1])
-            colorScaleA = Morpher(leftImageARR[:, :, 3], triangleTuple[0], rightImageARR[:, :, 3], triangleTuple[1])
+            morpher = Morpher(cv2.cvtColor(leftImageRaw, cv2.COLOR_BGRA2RGBA), mesh, cv2.cvtColor(rightImageRaw, cv2.COLOR_BGRA2RGBA), backend='cv2')
+        else:
+            errorFlag = True
+
+        if morpher is not None:
+            morpher.share()  # Workers attach to the images by name - each task only sends the alpha and this handle
+            morpherDigest = morphDigest(morpher)
             alphaValue = float(self.alphaValue.text())
             self.fullBlendComplete = False
-            self.blendList.clear()
+            self.blendList = []
             start_time = time.time()
             if self.blendBox.isChecked():
                 self.animateProgressBar()
-                for x in range(0, math.ceil(1 / self.fullBlendValue) + 1, 1):
-                    x *= self.fullBlendValue
-                    self.threadQueue.put(x)
+                alphas = [x * self.fullBlendValue for x in range(0, math.ceil(1 / self.fullBlendValue) + 1, 1)]
+                self.blendCount = 0
+                self.leftStore.save()  # The checkpoint is keyed by the contents of both (legacy) point files
+                self.rightStore.save()
+                frameStore = FrameStore(CHECKPOINT_DIR, jobKey(self.startingImagePath, self.endingImagePath, self.startingTextCorePath,
+                                                               self.endingTextCorePath, alphas, morpher.leftImage.shape))
+                if self.frameStore is not None and self.frameStore.folder != frameStore.folder:
+                    self.frameStore.clear()  # The previous blend's frames are replaced by this one's
+                self.frameStore = frameStore
+                self.blendList = StoredFrames(frameStore, len(alphas))  # Frames land out of order, straight into the checkpoint
+                self.threadQueue.put((alphas, self.frameStore))
                 self.framer.start()
             else:
                 self.gifText.setEnabled(0)
+                if self.frameStore is not None:  # The last full blend's frames aren't shown anymore
+                    self.frameStore.clear()
+                    self.frameStore = None
+                self.imager.previous = None
+                if self.lastBlend is not None:
+                    leftImage, rightImage, backend, lastAlpha, lastImage, leftVertices, rightVertices = self.lastBlend
+                    if lastAlpha == alphaValue and backend == morpher.backend and np.array_equal(leftImage, morpher.leftImage) and np.array_equal(rightImage, morpher.rightImage):
+                        self.imager.previous = (lastImage, leftVertices, rightVertices)  # Same images and alpha: only the mesh changed
                 self.imager.start()
                 self.imager.image_complete.connect(self.imageFinished)
-        else:
-            errorFlag = True
         if not errorFlag:
             self.blendingImage.setScaledContents(1)
         else:
@@ -1796,34 +1737,39 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
     #     Single Blend → Grayscale .jpg/.jpeg
     #     Single Blend → Color     .jpg/.jpeg/.png
     #     Full Blend → Grayscale/Color .gif (default frame time: 100 ms)
+    #     Full Blend → Grayscale/Color .mp4/.avi (frame rate derived from the frame time)
     def saveMorph(self):
         if self.blendingImage.hasScaledContents():
             # GIF
-            if self.saveTab_multiRadio.isChecked() and self.saveTab_gifRadio.isChecked() and self.blendList != []:
+            if self.saveTab_multiRadio.isChecked() and self.saveTab_gifRadio.isChecked() and len(self.blendList):
                 self.gifTextDone()
                 filepath, _ = QFileDialog.getSaveFileName(self, 'Save the gif as ...', "Morph.gif", "Images (*.gif)")
                 if filepath == "":
                     return
 
-                temp = copy.deepcopy(self.blendList)
-                #temp = []
-                scalar = int(self.saveTab_gifQualityBox.text()[:-1]) / 100
-                #for x in temp1:
-                #    temp.append(cv2.resize(x, (x.width() * scalar, x.height() * scalar), interpolation=cv2.INTER_AREA))
-
-                if self.saveTab_reverseBox.isChecked():
-                    temp = list(reversed(temp))
-
-                if self.saveTab_rewindBox.isChecked():
-                    temp += list(reversed(temp))
+                # Frames are loaded from the blend's checkpoint and appended to the .gif one by one, so only one is in memory at a
+                # time; reverse / rewind replay blendList by index instead of copying it
+                saveGif(filepath, self.blendList, duration=float(self.gifValue / 1000), loop=int(not self.saveTab_loopBox.isChecked()),
+                        reverse=self.saveTab_reverseBox.isChecked(), rewind=self.saveTab_rewindBox.isChecked())
 
-                imageio.mimsave(filepath, temp, duration=float(self.gifValue / 1000), loop=int(not self.saveTab_loopBox.isChecked()))
-
-                self.notificationLine.setText(" Full blend successfully saved as .gif")
                 if os.path.exists(filepath):
                     self.notificationLine.setText(" Full blend successfully saved as .gif")
                 else:
                     self.notificationLine.setText(" Generic Catching Error: Full blend can't be saved as .gif..")
+            # Video
+            elif self.saveTab_multiRadio.isChecked() and self.saveTab_videoRadio.isChecked() and len(self.blendList):
+                self.gifTextDone()
+                filepath, _ = QFileDialog.getSaveFileName(self, 'Save the video as ...', "Morph.mp4", "Videos (*.mp4 *.avi)")
+                if filepath == "":
+                    return
+
+                # Frames are encoded one by one (codec picked from the extension); the frame time sets the frame rate
+                try:
+                    saveVideo(filepath, self.blendList, fps=1000 / max(self.gifValue, 1), reverse=self.saveTab_reverseBox.isChecked(), rewind=self.saveTab_rewindBox.isChecked())
+                except (ValueError, cv2.error) as error:
+                    self.notificationLine.setText(" Full blend can't be saved as video: " + str(error))
+                    return
+                self.notificationLine.setText(" Full blend successfully saved as video (" + os.path.splitext(filepath)[1] + ")")
             # Image(s)
             else:
                 if self.saveTab_pngRadio.isChecked():
@@ -1877,6 +1823,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
     def loadDataLeft(self, fromDrag=False):
         self.triangleUpdatePref = int(self.triangleBox.isChecked())
         self.fullBlendComplete = False
+        self.scrubReady = False
         self.alphaValue.setEnabled(0)
         self.alphaSlider.setEnabled(0)
         self.autoCornerButton.setEnabled(0)
@@ -1890,8 +1837,11 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             self.startingImagePath, _ = QFileDialog.getOpenFileName(self, caption='Open Starting Image File ...', directory=os.path.join(ROOT_DIR, 'Images_Points'), filter="Images (*.png *.jpg *.jpeg)")
         if not self.startingImagePath:
             self.leftTempPath = ''
-            self.leftTempTextPath = ''
             self.startingImage.setScaledContents(0)
+            self.leftStore.close()
+            self.leftStore = PointStore()
+            self.triangulation.setPoints((), ())
+            self.history.clear()
             return
 
         self.notificationLine.setText(" Left image loaded.")
@@ -1922,14 +1872,14 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         # Now assign file's name to desired path for information storage (appending .txt at the end)
         # self.startingTextCorePath = 'C:/Users/USER/PycharmProjects/Personal/Morphing/Images_Points/' + 'TestImage' + '-' + 'jpg' + '.txt'
         self.startingTextCorePath = os.path.join(ROOT_DIR, 'Images_Points' + os.path.sep + self.startingImageName + '-' + self.startingImageType[1:] + '.txt')
-        self.leftTempTextPath = os.path.join(ROOT_DIR, 'PIM_Temp_Left-' + self.startingImageType[1:] + '.txt')
 
-        self.checkFiles('loadDataLeft', self.startingTextPath, self.startingTextCorePath, self.leftTempTextPath)
+        self.checkFiles('loadDataLeft', self.startingTextPath, self.startingTextCorePath)
 
     # Function that handles behavior for loading the user's right image
     def loadDataRight(self, fromDrag=False):
         self.triangleUpdatePref = int(self.triangleBox.isChecked())
         self.fullBlendComplete = False
+        self.scrubReady = False
         self.alphaValue.setEnabled(0)
         self.alphaSlider.setEnabled(0)
         self.autoCornerButton.setEnabled(0)
@@ -1943,8 +1893,11 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
             self.endingImagePath, _ = QFileDialog.getOpenFileName(self, caption='Open Ending Image File ...', directory=os.path.join(ROOT_DIR, 'Images_Points'), filter="Images (*.png *.jpg *.jpeg)")
         if not self.endingImagePath:
             self.rightTempPath = ''
-            self.rightTempTextPath = ''
             self.endingImage.setScaledContents(0)
+            self.rightStore.close()
+            self.rightStore = PointStore()
+            self.triangulation.setPoints((), ())
+            self.history.clear()
             return
 
         self.notificationLine.setText(" Right image loaded.")
@@ -1975,80 +1928,37 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
         # Now assign file's name to desired path for information storage (appending .txt at the end)
         # self.endingTextCorePath = 'C:/Users/USER/PycharmProjects/Personal/Morphing/Images_Points/' + 'TestImage' + '-' + 'jpg' + '.txt'
         self.endingTextCorePath = os.path.join(ROOT_DIR, 'Images_Points' + os.path.sep + self.endingImageName + '-' + self.endingImageType[1:] + '.txt')
-        self.rightTempTextPath = os.path.join(ROOT_DIR, 'PIM_Temp_Right-' + self.endingImageType[1:] + '.txt')
 
-        self.checkFiles('loadDataRight', self.endingTextPath, self.endingTextCorePath, self.rightTempTextPath)
+        self.checkFiles('loadDataRight', self.endingTextPath, self.endingTextCorePath)
 
     # Helper function for loadDataLeft and loadDataRight to reduce duplication of code
-    # Handles text file generation, loads data, and sets flags where appropriate
-    def checkFiles(self, sourceFunc, basePath, rootPath, tempPath):
+    # Opens the image's point store, loads its points and sets flags where appropriate
+    def checkFiles(self, sourceFunc, basePath, rootPath):
+        if sourceFunc == 'loadDataLeft':
+            self.leftStore.close()
+            self.leftStore = store = PointStore(rootPath)
+        elif sourceFunc == 'loadDataRight':
+            self.rightStore.close()
+            self.rightStore = store = PointStore(rootPath)
+
         # If there is already a text file at the location of the selected image, the program assumes that it is what
-        # the user intends to start with and moves it to the root path for future manipulation.
-        # Otherwise, the program creates an empty file at the root path instead.
-        if os.path.isfile(basePath):
-            try:
-                shutil.copy(basePath, rootPath)
-                os.remove(basePath)
-            except shutil.SameFileError:
-                pass
-        else:
-            if not os.path.exists(os.path.dirname(rootPath)):  # if Images_Points doesn't exist, create it
-                os.makedirs(os.path.dirname(rootPath))
-            open(rootPath, 'a').close()
-
-        # Copy source data to scaled temp file
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            tempData = np.loadtxt(rootPath)
-            with open(tempPath, 'w') as file:
-                if sourceFunc == 'loadDataLeft':
-                    if len(tempData.shape) == 1 and len(tempData) > 0:  # only one point pair in files (this requires different loading syntax...)
-                        if not os.stat(tempPath).st_size:  # left file is empty
-                            file.write('{:>8}{:>8}'.format(str(format(tempData[0] * (self.leftSize[0] / self.trueLeftSize[0]), ".1f")), str(format(tempData[1] * (self.leftSize[1] / self.trueLeftSize[1]), ".1f"))))
-                        else:
-                            file.write('\n{:>8}{:>8}'.format(str(format(tempData[0] * (self.leftSize[0] / self.trueLeftSize[0]), ".1f")), str(format(tempData[1] * (self.leftSize[1] / self.trueLeftSize[1]), ".1f"))))
-                    else:
-                        for index, x in enumerate(tempData):
-                            if not index and not os.stat(tempPath).st_size:  # left file is empty
-                                file.write('{:>8}{:>8}'.format(str(format(x[0] * (self.leftSize[0] / self.trueLeftSize[0]), ".1f")), str(format(x[1] * (self.leftSize[1] / self.trueLeftSize[1]), ".1f"))))
-                            else:
-                                file.write('\n{:>8}{:>8}'.format(str(format(x[0] * (self.leftSize[0] / self.trueLeftSize[0]), ".1f")), str(format(x[1] * (self.leftSize[1] / self.trueLeftSize[1]), ".1f"))))
-                elif sourceFunc == 'loadDataRight':
-                    if len(tempData.shape) == 1 and len(tempData) > 0:  # only one point pair in files (this requires different loading syntax...)
-                        if not os.stat(tempPath).st_size:  # left file is empty
-                            file.write('{:>8}{:>8}'.format(str(format(tempData[0] * (self.rightSize[0] / self.trueRightSize[0]), ".1f")), str(format(tempData[1] * (self.rightSize[1] / self.trueRightSize[1]), ".1f"))))
-                        else:
-                            file.write('\n{:>8}{:>8}'.format(str(format(tempData[0] * (self.rightSize[0] / self.trueRightSize[0]), ".1f")), str(format(tempData[1] * (self.rightSize[1] / self.trueRightSize[1]), ".1f"))))
-                    else:
-                        for index, y in enumerate(tempData):
-                            if not index and not os.stat(tempPath).st_size:  # left file is empty
-                                file.write('{:>8}{:>8}'.format(str(format(y[0] * (self.rightSize[0] / self.trueRightSize[0]), ".1f")), str(format(y[1] * (self.rightSize[1] / self.trueRightSize[1]), ".1f"))))
-                            else:
-                                file.write('\n{:>8}{:>8}'.format(str(format(y[0] * (self.rightSize[0] / self.trueRightSize[0]), ".1f")), str(format(y[1] * (self.rightSize[1] / self.trueRightSize[1]), ".1f"))))
-
-        # if sourceFunc == 'loadDataLeft':
-        #     for x in tempData:
-        #         x *= (self.leftSize[0] / self.trueLeftSize[0], self.leftSize[1] / self.trueLeftSize[1])
-        # elif sourceFunc == 'loadDataRight':
-        #     for y in tempData:
-        #         y *= (self.rightSize[0] / self.trueRightSize[0], self.rightSize[1] / self.trueRightSize[1])
-        # np.savetxt(tempPath, tempData, fmt='%.1f')
+        # the user intends to start with and imports it into the image's point store for future manipulation.
+        if os.path.isfile(basePath) and not (os.path.isfile(rootPath) and os.path.samefile(basePath, rootPath)):
+            store.importText(basePath)
+            os.remove(basePath)
 
         self.added_left_points.clear()
         self.added_right_points.clear()
         self.confirmed_left_points.clear()
         self.confirmed_right_points.clear()
 
-        # TODO: Do the same thing here with tempPath & self.tempChosen_left_points or some variable like that.
-        with open(tempPath, "r") as textFile:
-            if sourceFunc == 'loadDataLeft':
-                self.chosen_left_points.clear()
-                for x in textFile:
-                    self.chosen_left_points.append(QtCore.QPoint(int(float(x.split()[0])), int(float(x.split()[1]))))
-            elif sourceFunc == 'loadDataRight':
-                self.chosen_right_points.clear()
-                for x in textFile:
-                    self.chosen_right_points.append(QtCore.QPoint(int(float(x.split()[0])), int(float(x.split()[1]))))
+        # Scale the stored points of both images to the displayed images
+        # (Points confirmed on the other image this session are now among its stored points, so they are reloaded as well.)
+        self.chosen_left_points[:] = [self.getDisplayPoint(point, 'LEFT') for point in self.leftStore.getPoints().tolist()]
+        self.chosen_right_points[:] = [self.getDisplayPoint(point, 'RIGHT') for point in self.rightStore.getPoints().tolist()]
+        self.indexPoints()
+        self.history.clear()
+        self.enableDeletion = 0
 
         if self.startingImage.hasScaledContents() and self.endingImage.hasScaledContents():
             self.resizeLeftButton.setEnabled(1)
@@ -2076,6 +1986,7 @@ class MorphingApp(QMainWindow, Ui_MainWindow):
                     self.notificationLine.setText(" Left image loaded - WARNING: Input images must be the same size!")
                 elif sourceFunc == 'loadDataRight':
                     self.notificationLine.setText(" Right image loaded - WARNING: Input images must be the same size!")
+        self.loadTriangulation()
         self.displayTriangles()
 
 
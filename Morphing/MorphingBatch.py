@@ -0,0 +1,190 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+# Batch mode of PIM: morphs every image pair of a manifest across a pool of worker processes and writes a status report.
+# Example: python MorphingBatch.py nightly.csv --workers 32 --report nightly-report.csv
+#
+# A manifest is a .csv file (one job per row, with a header) or a .json list of objects, using the following keys:
+#     leftImage, rightImage     Paths of the two images (required)
+#     output                    Output path (.gif, video or image frames - see MorphingCLI.writeFrames()) (required)
+#     leftPoints, rightPoints   Point files, defaulting to the GUI's naming next to each image: <name>-<ext>.txt
+#     alpha                     Alpha value(s) to render, separated by ';' or spaces in a .csv (default: 0.5)
+#     step                      Renders a full blend from 0 to 1 with this increment instead of alpha
+#     fps                       Frame rate of .gif / video output (default: 10)
+#     name                      Name of the job in the report (default: the output's filename)
+# Relative paths are resolved from the manifest's folder.
+
+import os
+import sys
+import csv
+import json
+import math
+import time
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from Morphing import loadMesh, Morpher
+from MorphingPool import POOL_WORKERS, createPool, closePool
+from MorphingExport import DEFAULT_FPS
+from MorphingCLI import alphaSteps, readImages, writeFrames, isSupportedOutput
+from MorphingCache import FrameStore, jobKey, checkpointedFrames
+
+# Module  level  Variables
+#######################################################
+BATCH_CHUNK = 4                                     # Most jobs handed to a worker at once (which decodes the next job's images while rendering)
+REPORT_FIELDS = ('name', 'status', 'frames', 'seconds', 'output', 'error')
+
+
+# Returns the point file the GUI keeps for an image, e.g. Images_Points/face-png.txt for Images_Points/face.png.
+def defaultPointPath(imagePath):
+    root, extension = os.path.splitext(imagePath)
+    return root + '-' + extension[1:] + '.txt'
+
+
+# Validates one manifest entry and returns it as a job with absolute paths and its list of alphas.
+def makeJob(entry, folder, row):
+    def value(key):
+        field = entry.get(key)
+        return None if field is None or str(field).strip() == '' else field
+
+    def path(key):
+        return os.path.join(folder, str(value(key)))
+
+    for key in ('leftImage', 'rightImage', 'output'):
+        if value(key) is None:
+            raise ValueError('Manifest job ' + str(row) + ' is missing "' + key + '"')
+    job = {'leftImage': path('leftImage'), 'rightImage': path('rightImage'), 'output': path('output')}
+    job['leftPoints'] = path('leftPoints') if value('leftPoints') is not None else defaultPointPath(job['leftImage'])
+    job['rightPoints'] = path('rightPoints') if value('rightPoints') is not None else defaultPointPath(job['rightImage'])
+    job['name'] = str(value('name') or os.path.basename(job['output']))
+    if not isSupportedOutput(job['output']):
+        raise ValueError('Manifest job ' + str(row) + ' has an unsupported output extension')
+    try:
+        job['fps'] = float(value('fps') or DEFAULT_FPS)
+        if value('step') is not None:
+            job['alphas'] = alphaSteps(float(value('step')))
+        elif isinstance(value('alpha'), (int, float)):
+            job['alphas'] = [float(value('alpha'))]
+        elif isinstance(value('alpha'), list):
+            job['alphas'] = [float(alpha) for alpha in value('alpha')]
+        else:
+            job['alphas'] = [float(alpha) for alpha in str(value('alpha') or 0.5).replace(';', ' ').split()]
+    except ValueError as error:
+        raise ValueError('Manifest job ' + str(row) + ' has an invalid alpha, step or fps (' + str(error) + ')')
+    if job['fps'] <= 0:
+        raise ValueError('Manifest job ' + str(row) + ' has an fps that is not greater than 0')
+    return job
+
+
+# Reads a .csv or .json manifest (see the top of this file) into a list of jobs.
+def readManifest(path):
+    folder = os.path.dirname(os.path.abspath(path))
+    if path.lower().endswith('.json'):
+        with open(path) as file:
+            entries = json.load(file)
+        if isinstance(entries, dict):
+            entries = entries.get('jobs', [])
+    else:
+        with open(path, newline='') as file:
+            entries = list(csv.DictReader(file))
+    return [makeJob(entry, folder, row) for row, entry in enumerate(entries, 1)]
+
+
+# Decodes everything a job needs before rendering: both images and the mesh of both point files.
+def decodeJob(job):
+    mesh = loadMesh(job['leftPoints'], job['rightPoints'])
+    leftImage, rightImage = readImages(job['leftImage'], job['rightImage'], job['output'])
+    return leftImage, mesh, rightImage
+
+
+# Renders and saves one job from its (possibly still pending) decoded inputs, and returns its status for the report.
+# With a checkpoint folder, frames left behind by an interrupted run are reused and only the missing ones are rendered.
+def runJob(job, decoded, checkpoint=None):
+    start_time = time.time()
+    status = {'name': job['name'], 'status': 'ok', 'frames': 0, 'output': job['output'], 'error': ''}
+    try:
+        morpher = Morpher(*decoded.result())
+        os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+        if checkpoint is not None:
+            store = FrameStore(checkpoint, jobKey(job['leftImage'], job['rightImage'], job['leftPoints'], job['rightPoints'], job['alphas'],
+                                                  os.path.abspath(job['output'])))
+            writeFrames(job['output'], checkpointedFrames(store, morpher, job['alphas']), len(job['alphas']), fps=job['fps'])
+            store.clear()
+        else:
+            writeFrames(job['output'], morpher.iterFrames(job['alphas']), len(job['alphas']), fps=job['fps'])
+        status['frames'] = len(job['alphas'])
+    except Exception as error:
+        status['status'] = 'failed'
+        status['error'] = type(error).__name__ + ': ' + str(error)
+    status['seconds'] = "{:.3f}".format(time.time() - start_time)
+    return status
+
+
+# Task executed by the pool's workers: runs a chunk of jobs one after the other, decoding the images of the next job on a
+# background thread while the current one renders. Returns the status of every job.
+def runJobs(jobs, checkpoint=None):
+    statuses = []
+    with ThreadPoolExecutor(max_workers=1) as decoder:
+        upcoming = decoder.submit(decodeJob, jobs[0])
+        for index, job in enumerate(jobs):
+            decoded = upcoming
+            if index + 1 < len(jobs):
+                upcoming = decoder.submit(decodeJob, jobs[index + 1])
+            statuses.append(runJob(job, decoded, checkpoint))
+    return statuses
+
+
+# Runs every job across the given number of worker processes (0 runs them in this process), writing each job's status to
+# the .csv report as soon as it finishes. Jobs are handed out in small chunks, so every worker stays busy until the end.
+# Frames are checkpointed in the given folder (if any), so that re-running an interrupted batch resumes its jobs.
+# Returns the number of failed jobs.
+def runBatch(jobs, reportPath, workers=POOL_WORKERS, checkpoint=None):
+    size = max(1, min(BATCH_CHUNK, math.ceil(len(jobs) / max(workers, 1))))
+    chunks = [jobs[start:start + size] for start in range(0, len(jobs), size)]
+    pool = createPool(workers) if workers > 0 else None
+    failures = 0
+    try:
+        with open(reportPath, 'w', newline='') as file:
+            report = csv.DictWriter(file, REPORT_FIELDS)
+            report.writeheader()
+            tasks = functools.partial(runJobs, checkpoint=checkpoint)
+            for statuses in (pool.imap_unordered(tasks, chunks) if pool is not None else map(tasks, chunks)):
+                for status in statuses:
+                    report.writerow(status)
+                    failures += status['status'] != 'ok'
+                    print(status['status'].upper() + ' ' + status['name'] + ' (' + status['seconds'] + ' s) ' + status['error'])
+                file.flush()
+    finally:
+        if pool is not None:
+            closePool(pool)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Morphs every image pair of a .csv / .json manifest across a pool of workers.')
+    parser.add_argument('manifest', help='path of the .csv or .json manifest (see MorphingBatch.py for its keys)')
+    parser.add_argument('-w', '--workers', type=int, default=POOL_WORKERS,
+                        help='number of worker processes, 0 runs the jobs in this process (default: ' + str(POOL_WORKERS) + ')')
+    parser.add_argument('--checkpoint', metavar='FOLDER',
+                        help='checkpoints rendered frames in this folder, so that re-running an interrupted batch only renders the missing frames')
+    parser.add_argument('-r', '--report', help='path of the .csv status report (default: <manifest>-report.csv)')
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error('--workers must be 0 or greater')
+    try:
+        jobs = readManifest(args.manifest)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    start_time = time.time()
+    reportPath = args.report or os.path.splitext(args.manifest)[0] + '-report.csv'
+    failures = runBatch(jobs, reportPath, args.workers, args.checkpoint)
+    print('Ran ' + str(len(jobs)) + ' job(s), ' + str(failures) + ' failed, in ' + "{:.3f}".format(time.time() - start_time) + ' seconds. Report: ' + reportPath)
+    return int(failures > 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+# Headless front end of PIM: morphs two images from their point files without Qt, pynput or an update check.
+# Example: python MorphingCLI.py left.jpg right.jpg left-jpg.txt right-jpg.txt --step 0.05 --output Morph.mp4
+
+import os
+import sys
+import math
+import time
+import argparse
+import numpy as np                                  # pip install numpy
+from PIL import Image                               # pip install pillow
+
+from Morphing import loadMesh, Morpher, SAMPLERS
+from MorphingPool import POOL_WORKERS, createPool, closePool, renderTiledFrame
+from MorphingExport import DEFAULT_FPS, VIDEO_CODECS, saveGif, saveVideo
+from MorphingCache import CACHE_LIMIT, FrameStore, RenderCache, jobKey, checkpointedFrames, morphDigest, cachedFrames
+
+# Module  level  Variables
+#######################################################
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')
+IMAGE_MODES = ('L', 'RGB', 'RGBA')                  # Channel layouts a morph is rendered in, from the fewest channels to the most
+OPAQUE_EXTENSIONS = ('.jpg', '.jpeg', '.bmp')       # Output formats that can't store an alpha channel
+
+
+# Returns the alphas of a full blend with the given increment (0 to 1 inclusive), like the GUI's full blend option.
+def alphaSteps(step):
+    if not 0 < step <= 1:
+        raise ValueError('Input step must be within (0, 1]')
+    return [min(x * step, 1.0) for x in range(0, math.ceil(1 / step) + 1)]
+
+
+# Opens an image in one of IMAGE_MODES: RGB(A) or grayscale, the channel layouts a morph is rendered (and saved) in.
+def openImage(path):
+    image = Image.open(path)
+    if image.mode not in IMAGE_MODES:
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image
+
+
+# Reads an image as an RGB(A) or grayscale uint8 array (see openImage()).
+def readImage(path):
+    return np.asarray(openImage(path))
+
+
+# Reads both images of a morph as uint8 arrays of the same channel layout, converting them up front rather than failing once
+# the frames are rendered: an image with fewer channels is promoted to the mode of the other one (e.g. grayscale to RGB), and
+# the alpha channel is dropped when the output format can't store it (e.g. .jpg). Raises a ValueError for images of different sizes.
+def readImages(leftPath, rightPath, output):
+    leftImage, rightImage = openImage(leftPath), openImage(rightPath)
+    if leftImage.size != rightImage.size:
+        raise ValueError('Input images do not have the same dimensions (' + 'x'.join(map(str, leftImage.size)) + ' and ' +
+                         'x'.join(map(str, rightImage.size)) + ')')
+    mode = max(leftImage.mode, rightImage.mode, key=IMAGE_MODES.index)
+    if mode == 'RGBA' and os.path.splitext(output)[1].lower() in OPAQUE_EXTENSIONS:
+        mode = 'RGB'
+    return np.asarray(leftImage.convert(mode)), np.asarray(rightImage.convert(mode))
+
+
+# Returns whether writeFrames() can write to the given path, based on its extension.
+def isSupportedOutput(path):
+    extension = os.path.splitext(path)[1].lower()
+    return extension == '.gif' or extension in VIDEO_CODECS or extension in IMAGE_EXTENSIONS
+
+
+# Returns the path of the index-th (1-based) frame of an image sequence, matching the GUI's "Morph_1.png" naming.
+def framePath(path, index):
+    filename, filenameExtension = os.path.splitext(path)
+    return filename + '_' + str(index) + filenameExtension
+
+
+# Writes the frames to the output path in the format given by its extension: an animation (.gif / video) or image(s).
+def writeFrames(output, frames, count, fps=DEFAULT_FPS, codec=None, reverse=False, rewind=False, loop=True):
+    extension = os.path.splitext(output)[1].lower()
+    if extension == '.gif':
+        saveGif(output, frames, duration=1 / fps, loop=0 if loop else 1, reverse=reverse, rewind=rewind)
+    elif extension in VIDEO_CODECS:
+        saveVideo(output, frames, fps=fps, codec=codec, reverse=reverse, rewind=rewind)
+    elif extension in IMAGE_EXTENSIONS:
+        for index, frame in enumerate(frames, 1):
+            Image.fromarray(frame).save(output if count == 1 else framePath(output, index))
+    else:
+        raise ValueError('Unsupported output extension "' + extension + '"')
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description='Morphs two images together without the graphical interface.')
+    parser.add_argument('leftImage', help='path of the starting image')
+    parser.add_argument('rightImage', help='path of the ending image')
+    parser.add_argument('leftPoints', help='point file of the starting image (one "x y" pair per line, e.g. saved by the GUI)')
+    parser.add_argument('rightPoints', help='point file of the ending image, in the same order as leftPoints')
+    alphaGroup = parser.add_mutually_exclusive_group()
+    alphaGroup.add_argument('--alpha', type=float, nargs='+', help='alpha value(s) to render (default: 0.5)')
+    alphaGroup.add_argument('--step', type=float, help='renders a full blend from 0 to 1 with this alpha increment')
+    parser.add_argument('-o', '--output', default='Morph.png',
+                        help='output path; .gif and video extensions (' + ', '.join(VIDEO_CODECS) + ') write an animation, '
+                             'image extensions (' + ', '.join(IMAGE_EXTENSIONS) + ') one file per frame (default: Morph.png)')
+    parser.add_argument('-w', '--workers', type=int, default=POOL_WORKERS,
+                        help='number of worker processes, 0 renders in this process (default: ' + str(POOL_WORKERS) + ')')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS, help='frame rate of .gif / video output (default: ' + str(DEFAULT_FPS) + ')')
+    parser.add_argument('--codec', help='FourCC of video output (default: picked from the extension)')
+    parser.add_argument('--reverse', action='store_true', help='plays animations backwards')
+    parser.add_argument('--rewind', action='store_true', help='plays animations forwards, then backwards')
+    parser.add_argument('--no-loop', dest='loop', action='store_false', help='plays .gif output only once')
+    storeGroup = parser.add_mutually_exclusive_group()
+    storeGroup.add_argument('--checkpoint', metavar='FOLDER',
+                            help='checkpoints rendered frames in this folder, so that an interrupted run only renders the missing frames when re-run')
+    storeGroup.add_argument('--cache', metavar='FOLDER',
+                            help='serves frames already rendered from the same images, points, alpha and backend from this persistent cache, '
+                                 'and adds the new ones to it (which also resumes interrupted runs)')
+    parser.add_argument('--cache-limit', type=int, default=CACHE_LIMIT >> 20, metavar='MB',
+                        help='size cap of the cache, beyond which the least recently used frames are evicted (default: ' + str(CACHE_LIMIT >> 20) + ')')
+    parser.add_argument('--backend', choices=list(SAMPLERS), default='numpy', help='sampling backend of the morph (default: numpy)')
+    args = parser.parse_args(argv)
+
+    if not isSupportedOutput(args.output):
+        parser.error('unsupported output extension "' + os.path.splitext(args.output)[1].lower() + '"')
+    if args.workers < 0:
+        parser.error('--workers must be 0 or greater')
+    if args.fps <= 0:
+        parser.error('--fps must be greater than 0')
+    if args.cache_limit <= 0:
+        parser.error('--cache-limit must be greater than 0')
+    if args.alpha is not None and not all(0 <= alpha <= 1 for alpha in args.alpha):
+        parser.error('--alpha values must be within [0, 1]')
+    try:
+        args.alphas = alphaSteps(args.step) if args.step is not None else (args.alpha or [0.5])
+        args.images = readImages(args.leftImage, args.rightImage, args.output)
+        args.mesh = loadMesh(args.leftPoints, args.rightPoints)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    return args
+
+
+def main(argv=None):
+    args = parseArguments(argv)
+    start_time = time.time()
+    leftImage, rightImage = args.images
+    morpher = Morpher(leftImage, args.mesh, rightImage, backend=args.backend)
+
+    writeOptions = {'fps': args.fps, 'codec': args.codec, 'reverse': args.reverse, 'rewind': args.rewind, 'loop': args.loop}
+    store = cache = pool = None
+    if args.checkpoint:
+        store = FrameStore(args.checkpoint, jobKey(args.leftImage, args.rightImage, args.leftPoints, args.rightPoints, args.alphas,
+                                                   os.path.abspath(args.output), args.backend))
+    elif args.cache:
+        cache = RenderCache(args.cache, args.cache_limit << 20)
+    if args.workers > 0:
+        pool = createPool(args.workers)
+        morpher.share()
+    readAhead = 2 * max(args.workers, 1)
+    try:
+        if store is not None:
+            frames = checkpointedFrames(store, morpher, args.alphas, pool, readAhead)
+        elif cache is not None:
+            frames = cachedFrames(cache, morphDigest(morpher), morpher, args.alphas, pool, readAhead)
+        elif pool is not None and len(args.alphas) == 1:
+            frames = [renderTiledFrame(pool, morpher, args.alphas[0])]
+        else:
+            frames = morpher.iterFrames(args.alphas, pool, readAhead)
+        writeFrames(args.output, frames, len(args.alphas), **writeOptions)
+    finally:
+        if pool is not None:
+            closePool(pool)
+            morpher.release()
+    if store is not None:
+        store.clear()  # The output is complete, so its checkpoint is no longer needed
+    print('Morphed ' + str(len(args.alphas)) + ' frame(s) into ' + args.output + ' in ' + "{:.3f}".format(time.time() - start_time) + ' seconds.')
+    if cache is not None:
+        print('Cache: ' + cache.getStatistics())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np                                  # pip install numpy
+
+from Morphing import READ_AHEAD
+
+# Module  level  Variables
+#######################################################
+CACHE_LIMIT = 2 << 30        # Default size cap of a RenderCache on disk (2 GB), beyond which the least recently used frames are evicted
+MEMORY_LIMIT = 512 << 20     # Default size cap of a FrameLRU in memory (512 MB)
+
+
+# Writes a file atomically: write(file) fills a temporary file in the same folder, which then replaces the target.
+# A process that is killed midway therefore leaves either the previous file or the new one behind, never a partial one.
+# Used for frames (.npy) here, and for the point stores' files in MorphingPoints.py.
+def writeAtomically(path, write):
+    handle, temporaryPath = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporaryPath, path)
+    except BaseException:
+        os.remove(temporaryPath)
+        raise
+
+
+# Returns a key identifying a morph job: the paths, sizes and modification times of both images, the contents of both point
+# files, the list of alphas and any other settings given. Re-running the same job yields the same key, while any change to
+# its inputs yields a new one.
+def jobKey(leftImagePath, rightImagePath, leftPointsPath, rightPointsPath, alphas, *settings):
+    digest = hashlib.sha1()
+    for path in (leftImagePath, rightImagePath):
+        stat = os.stat(path)
+        digest.update((os.path.abspath(path) + '|' + str(stat.st_size) + '|' + str(stat.st_mtime_ns) + '|').encode())
+    for path in (leftPointsPath, rightPointsPath):
+        with open(path, 'rb') as file:
+            digest.update(file.read() + b'|')
+    digest.update(repr([float(alpha) for alpha in alphas]).encode())
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()
+
+
+# On-disk checkpoint of the frames of one job, keyed by alpha index (<folder>/<job key>/<index>.npy).
+# Frames are written atomically (to a temporary file which then replaces the frame's file), so a run that is killed midway
+# leaves only complete frames behind, and a re-run can pick up where it stopped.
+class FrameStore:
+    def __init__(self, folder, key):
+        self.folder = os.path.join(folder, key)
+        os.makedirs(self.folder, exist_ok=True)
+
+    def getPath(self, index):
+        return os.path.join(self.folder, str(index) + '.npy')
+
+    def has(self, index):
+        return os.path.exists(self.getPath(index))
+
+    def load(self, index):
+        return np.load(self.getPath(index))
+
+    def save(self, index, frame):
+        writeAtomically(self.getPath(index), lambda file: np.save(file, frame))
+
+    # Returns the indices (out of count frames) that haven't been checkpointed yet.
+    def getMissing(self, count):
+        return [index for index in range(count) if not self.has(index)]
+
+    # Deletes the checkpoint, e.g. once the job's output has been written.
+    def clear(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+# Read-only sequence of the first count frames of a FrameStore, each loaded from disk when it's accessed. Lets a finished
+# job's frames be displayed and exported (e.g. by saveGif()) one at a time instead of holding the sequence in memory.
+class StoredFrames:
+    def __init__(self, store, count):
+        self.store = store
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError('Frame index out of range')
+        return self.store.load(index % self.count)
+
+
+# Yields the frames of every alpha in order, loading checkpointed frames from the store and rendering (then checkpointing)
+# only the missing ones through Morpher.iterFrames() - on the given pool, if any.
+def checkpointedFrames(store, morpher, alphas, pool=None, readAhead=READ_AHEAD):
+    missing = store.getMissing(len(alphas))
+    rendered = morpher.iterFrames([alphas[index] for index in missing], pool, readAhead)
+    missing = set(missing)
+    for index in range(len(alphas)):
+        if index in missing:
+            frame = next(rendered)
+            store.save(index, frame)
+            yield frame
+        else:
+            yield store.load(index)
+
+
+# Returns a digest of everything a Morpher's frames depend on besides alpha: the contents of both images (and so the output
+# size), both meshes and the sampling backend. Compute it once per Morpher and derive the key of each frame with frameKey().
+def morphDigest(morpher):
+    digest = hashlib.blake2b(digest_size=20)
+    for array in (morpher.leftImage, morpher.rightImage, morpher.leftVertices, morpher.rightVertices):
+        digest.update(repr((array.shape, array.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(array).data)
+    digest.update(morpher.backend.encode())
+    return digest.hexdigest()
+
+
+# Returns the content-addressed key of the frame of a morph (see morphDigest()) at the given alpha.
+def frameKey(digest, alpha):
+    return hashlib.blake2b((digest + '|' + repr(float(alpha))).encode(), digest_size=20).hexdigest()
+
+
+# Persistent cache of rendered frames on local disk (<folder>/<frame key>.npy), shared by every run on this machine.
+# Hits refresh a frame's modification time, and the least recently used frames are evicted once the cache exceeds its size cap.
+# Several processes may use the same folder at once: frames are written atomically and eviction tolerates concurrent removals.
+class RenderCache:
+    def __init__(self, folder, limit=CACHE_LIMIT):
+        self.folder = folder
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.folder, exist_ok=True)
+        self.size = sum(entry.stat().st_size for entry in os.scandir(self.folder) if entry.name.endswith('.npy'))
+
+    def getPath(self, key):
+        return os.path.join(self.folder, key + '.npy')
+
+    def has(self, key):
+        return os.path.exists(self.getPath(key))
+
+    # Returns the cached frame of the given key (counted as a hit), or None (counted as a miss).
+    def get(self, key):
+        try:
+            frame = np.load(self.getPath(key))
+            os.utime(self.getPath(key))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return frame
+
+    # Adds (or replaces) the frame of the given key. The cache's size counts the bytes of its files on disk, .npy headers included.
+    def put(self, key, frame):
+        path = self.getPath(key)
+        try:
+            previousSize = os.path.getsize(path)
+        except OSError:
+            previousSize = 0
+        writeAtomically(path, lambda file: np.save(file, frame))
+        self.size += os.path.getsize(path) - previousSize
+        if self.size > self.limit:
+            self.evict()
+
+    # Deletes the least recently used frames until the cache is back under 90% of its size cap.
+    def evict(self):
+        entries = sorted((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in os.scandir(self.folder) if entry.name.endswith('.npy'))
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.limit * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def getStatistics(self):
+        return str(self.hits) + ' hit(s), ' + str(self.misses) + ' miss(es)'
+
+
+# Yields the frames of every alpha in order, serving cached frames from the cache and rendering (then caching) only the
+# missing ones through Morpher.iterFrames() - on the given pool, if any. Digest is the Morpher's morphDigest().
+def cachedFrames(cache, digest, morpher, alphas, pool=None, readAhead=READ_AHEAD):
+    keys = [frameKey(digest, alpha) for alpha in alphas]
+    missing = [index for index, key in enumerate(keys) if not cache.has(key)]
+    rendered = morpher.iterFrames([alphas[index] for index in missing], pool, readAhead)
+    missing = set(missing)
+    for index, key in enumerate(keys):
+        frame = cache.get(key) if index not in missing else None
+        if frame is None:
+            if index in missing:
+                cache.misses += 1
+                frame = next(rendered)
+            else:  # Evicted since the lookup above (e.g. by another process)
+                frame = morpher.getImageAtAlpha(alphas[index])
+            cache.put(key, frame)
+        yield frame
+
+
+# In-memory cache of recently viewed frames (e.g. while scrubbing through alphas), keyed like RenderCache (see frameKey()).
+# Once its frames exceed the memory cap, the least recently used ones are dropped. Safe to share between threads.
+class FrameLRU:
+    def __init__(self, limit=MEMORY_LIMIT):
+        self.limit = limit
+        self.size = 0
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+
+    def has(self, key):
+        with self.lock:
+            return key in self.frames
+
+    # Returns the frame of the given key (marking it as the most recently used), or None.
+    def get(self, key):
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        with self.lock:
+            if key in self.frames:
+                self.frames.move_to_end(key)
+                return
+            self.frames[key] = frame
+            self.size += frame.nbytes
+            while self.size > self.limit and len(self.frames) > 1:
+                _, evicted = self.frames.popitem(last=False)
+                self.size -= evicted.nbytes
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.size = 0
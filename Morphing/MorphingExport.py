@@ -0,0 +1,93 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+import os
+import tempfile
+import numpy as np                                  # pip install numpy
+import imageio                                      # pip install imageio
+import cv2                                          # pip install opencv-python-headless
+
+# Module  level  Variables
+#######################################################
+DEFAULT_FPS = 10                                    # Matches the default .gif frame time of 100 ms
+VIDEO_CODECS = {'.mp4': 'mp4v', '.m4v': 'mp4v', '.mov': 'mp4v', '.avi': 'XVID', '.mkv': 'XVID'}  # Default FourCC per extension
+
+
+# Returns the order in which the frames of a sequence of the given length are played back.
+# Reverse plays it backwards, and rewind appends the (possibly reversed) sequence played backwards once more.
+def frameOrder(count, reverse=False, rewind=False):
+    order = list(range(count - 1, -1, -1)) if reverse else list(range(count))
+    if rewind:
+        order += order[::-1]
+    return order
+
+
+# Yields the frames of a sequence in playback order (see frameOrder()) without duplicating any of them.
+# Sequences (e.g. a list of rendered frames) are replayed by index. Iterables (e.g. Morpher.iterFrames()) are passed through
+# as they arrive, and are only spilled to a temporary file on disk when reverse / rewind needs to play them again.
+def orderedFrames(frames, reverse=False, rewind=False):
+    if hasattr(frames, '__getitem__') and hasattr(frames, '__len__'):
+        for index in frameOrder(len(frames), reverse, rewind):
+            yield frames[index]
+        return
+    if not reverse and not rewind:
+        yield from frames
+        return
+
+    with tempfile.TemporaryFile() as spill:
+        count = 0
+        for frame in frames:
+            shape, dtype = frame.shape, frame.dtype
+            spill.write(np.ascontiguousarray(frame).tobytes())
+            count += 1
+            if not reverse:
+                yield frame
+        if count == 0:
+            return
+        spill.flush()
+        stored = np.memmap(spill, dtype=dtype, mode='r', shape=(count,) + shape)
+        order = frameOrder(count, reverse, rewind)
+        for index in (order if reverse else order[count:]):
+            yield stored[index]
+        del stored
+
+
+# Writes an animated .gif one frame at a time, so that only the frame being encoded is held in memory by the writer.
+# Duration is the frame time in seconds and loop the number of times the animation plays (0 loops forever).
+def saveGif(filepath, frames, duration, loop=0, reverse=False, rewind=False):
+    with imageio.get_writer(filepath, mode='I', duration=duration, loop=loop) as writer:
+        for frame in orderedFrames(frames, reverse, rewind):
+            writer.append_data(frame)
+
+
+# Converts an RGB / RGBA / grayscale frame to the 3-channel BGR layout expected by cv2.VideoWriter (alpha is dropped).
+def videoFrame(frame):
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+    return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+
+# Streams frames into a video file one at a time, so the sequence is never held in memory (pass Morpher.iterFrames() to
+# encode frames while they are being rendered). The codec is a FourCC such as 'mp4v', picked from the extension when omitted.
+def saveVideo(filepath, frames, fps=DEFAULT_FPS, codec=None, reverse=False, rewind=False):
+    if codec is None:
+        codec = VIDEO_CODECS.get(os.path.splitext(filepath)[1].lower(), 'mp4v')
+    if len(codec) != 4:
+        raise ValueError('Input codec is not a four character code (e.g. mp4v)')
+    if fps <= 0:
+        raise ValueError('Input fps must be greater than 0')
+    writer = None
+    try:
+        for frame in orderedFrames(frames, reverse, rewind):
+            if writer is None:
+                writer = cv2.VideoWriter(filepath, cv2.VideoWriter_fourcc(*codec), fps, (frame.shape[1], frame.shape[0]))
+                if not writer.isOpened():
+                    raise ValueError('Unable to open a ' + codec + ' video writer for ' + filepath)
+            writer.write(videoFrame(frame))
+    finally:
+        if writer is not None:
+            writer.release()
@@ -1113,6 +1113,9 @@ class Ui_MainWindow(object):
         self.saveTab_gifRadio.setChecked(True)
         self.saveTab_gifRadio.setObjectName("saveTab_gifRadio")
         self.verticalLayout_3.addWidget(self.saveTab_gifRadio)
+        self.saveTab_videoRadio = QtWidgets.QRadioButton(self.saveTab_fullBlendGroup)
+        self.saveTab_videoRadio.setObjectName("saveTab_videoRadio")
+        self.verticalLayout_3.addWidget(self.saveTab_videoRadio)
         self.horizontalLayout_10.addWidget(self.saveTab_fullBlendGroup)
         spacerItem14 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
         self.horizontalLayout_10.addItem(spacerItem14)
@@ -1560,6 +1563,7 @@ class Ui_MainWindow(object):
         self.saveTab_fullBlendGroup.setTitle(_translate("MainWindow", "Full Blend Mode"))
         self.saveTab_frameRadio.setText(_translate("MainWindow", "Image Frames"))
         self.saveTab_gifRadio.setText(_translate("MainWindow", "GIF"))
+        self.saveTab_videoRadio.setText(_translate("MainWindow", "Video"))
         self.saveTab_imageExtensionGroup.setTitle(_translate("MainWindow", "Image Extension"))
         self.saveTab_jpgRadio.setText(_translate("MainWindow", ".jpg"))
         self.saveTab_pngRadio.setText(_translate("MainWindow", ".png"))
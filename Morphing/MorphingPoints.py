@@ -0,0 +1,457 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+import os
+import zlib
+import struct
+import warnings
+from collections import deque
+import numpy as np                                  # pip install numpy
+
+from MorphingCache import writeAtomically
+
+# Module  level  Variables
+#######################################################
+COMPACT_INTERVAL = 256                              # Number of journaled edits after which a PointStore compacts its journal into a new snapshot
+INDEX_CELL_SIZE = 32                                # Side (in pixels of the displayed image) of the grid cells a PointIndex buckets its points into
+HISTORY_LIMIT = 1000                                # Number of edits an EditHistory keeps for undoing, beyond which the oldest are forgotten
+JOURNAL_MAGIC = b'PIMJ'                             # First bytes of every journal, followed by the generation of the snapshot it applies to
+JOURNAL_HEADER = struct.Struct('<4sq')
+JOURNAL_RECORD = struct.Struct('<Bqdd')             # Operation, index, x, y - each record is followed by the CRC-32 of these bytes
+JOURNAL_CHECKSUM = struct.Struct('<I')
+RECORD_SIZE = JOURNAL_RECORD.size + JOURNAL_CHECKSUM.size
+APPEND, DELETE, MOVE, CLEAR, INSERT = range(5)      # Journal operations
+
+
+# Reads a point file in PIM's legacy text format (one "x y" pair per line) as an (N, 2) float64 array.
+def readPointText(path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # Empty point files
+        return np.loadtxt(path, dtype=np.float64, ndmin=2).reshape(-1, 2)
+
+
+# Returns points in PIM's legacy text format: one right-aligned "x y" pair per line, to one decimal, without a trailing newline.
+def formatPointText(points):
+    return '\n'.join('{:>8}{:>8}'.format(format(x, ".1f"), format(y, ".1f")) for x, y in np.asarray(points).tolist())
+
+
+# In-memory list of the points placed on one image (in its original coordinates), in the order they correspond to those of
+# the other image. Edits are O(1) on disk: each one is appended to a journal (<path>.journal) as a fixed-size checksummed
+# record, and every COMPACT_INTERVAL edits the journal is compacted into a binary snapshot (<path>.npz) and started over.
+# Loading replays the journal over the snapshot, ignoring a record torn by a crash. Records are buffered until flush() (e.g.
+# once per EditHistory command), so a crash loses at most the edit in flight.
+#
+# Path is the image's point file in the legacy text format (e.g. Images_Points/TestImage-jpg.txt). It is rewritten on every
+# compaction (and by save()), so other tools such as MorphingCLI.py can keep reading it, and imported when it is newer than
+# the snapshot and journal (e.g. when it was made or edited outside of PIM). Without a path, the store only lives in memory.
+class PointStore:
+    def __init__(self, path=None):
+        self.path = path
+        self.points = np.empty((64, 2), dtype=np.float64)  # Grown by doubling, so that appends are amortized O(1)
+        self.count = 0
+        self.generation = 0                                 # Number of snapshots taken, which the journal is stamped with
+        self.pending = 0                                    # Number of edits journaled since the last snapshot
+        self.journal = None
+        if path is not None:
+            self.snapshotPath = os.path.splitext(path)[0] + '.npz'
+            self.journalPath = os.path.splitext(path)[0] + '.journal'
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.load()
+
+    def __len__(self):
+        return self.count
+
+    # Returns a copy of the points as an (N, 2) float64 array.
+    def getPoints(self):
+        return self.points[:self.count].copy()
+
+    def getPoint(self, index):
+        return tuple(self.points[self.checkIndex(index)].tolist())
+
+    def append(self, point):
+        self.pushPoint(point)
+        self.record(APPEND, self.count - 1, point)
+
+    # Inserts a point at the given index (up to len(self)), shifting the points from there on up by one.
+    def insert(self, index, point):
+        if not 0 <= index <= self.count:
+            raise IndexError('Point index ' + str(index) + ' is out of range')
+        self.pushPoint(point)
+        self.points[index + 1:self.count] = self.points[index:self.count - 1].copy()
+        self.points[index] = point
+        self.record(INSERT, index, point)
+
+    # Removes the point at the given index, shifting the points after it down by one.
+    def delete(self, index):
+        index = self.checkIndex(index)
+        self.points[index:self.count - 1] = self.points[index + 1:self.count]
+        self.count -= 1
+        self.record(DELETE, index)
+
+    def move(self, index, point):
+        index = self.checkIndex(index)
+        self.points[index] = point
+        self.record(MOVE, index, point)
+
+    def clear(self):
+        self.count = 0
+        self.record(CLEAR)
+
+    # Replaces every point at once (e.g. a bulk import), which is saved as a new snapshot rather than journaled point by point.
+    def setPoints(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.points = np.empty((max(64, 2 * len(points)), 2), dtype=np.float64)
+        self.points[:len(points)] = points
+        self.count = len(points)
+        self.save()
+
+    # Replaces every point with those of a point file in the legacy text format.
+    def importText(self, path):
+        self.setPoints(readPointText(path))
+
+    # Writes the points to a point file in the legacy text format (by default, the store's own path).
+    def exportText(self, path=None):
+        text = formatPointText(self.points[:self.count]).encode()
+        writeAtomically(path or self.path, lambda file: file.write(text))
+
+    # Compacts the journal: writes the points to a new snapshot (and the legacy point file), then starts an empty journal.
+    # A crash at any step leaves a consistent pair behind, as a journal only applies to the snapshot of its own generation.
+    def save(self):
+        if self.path is None:
+            return
+        self.exportText()
+        points = self.points[:self.count]
+        writeAtomically(self.snapshotPath, lambda file: np.savez(file, points=points, generation=self.generation + 1))
+        self.generation += 1
+        self.openJournal(reset=True)
+        self.pending = 0
+
+    # Writes the buffered journal records in one write and syncs them to disk, so that they outlive a crash of PIM or of the OS.
+    def flush(self):
+        if self.journal is not None:
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+
+    # Saves any edits that are only journaled (see save()) and closes the journal.
+    def close(self):
+        if self.pending or (self.path is not None and not os.path.isfile(self.snapshotPath)):
+            self.save()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def load(self):
+        latest = max([os.path.getmtime(path) for path in (self.snapshotPath, self.journalPath) if os.path.isfile(path)], default=None)
+        if os.path.isfile(self.snapshotPath):
+            with np.load(self.snapshotPath) as snapshot:
+                points, self.generation = snapshot['points'], int(snapshot['generation'])
+            self.points = np.empty((max(64, 2 * len(points)), 2), dtype=np.float64)
+            self.points[:len(points)] = points
+            self.count = len(points)
+        if os.path.isfile(self.path) and (latest is None or os.path.getmtime(self.path) > latest):
+            self.importText(self.path)  # Made or edited outside of PIM since its last edit here
+        else:
+            self.replayJournal()
+
+    # Applies the records of the journal to the snapshot's points, up to the first one that is incomplete or corrupt (i.e. torn
+    # by a crash), which is cut off along with anything after it. A journal of another generation is already in the snapshot.
+    def replayJournal(self):
+        if not os.path.isfile(self.journalPath):
+            return
+        with open(self.journalPath, 'rb') as file:
+            data = file.read()
+        if len(data) < JOURNAL_HEADER.size or JOURNAL_HEADER.unpack_from(data) != (JOURNAL_MAGIC, self.generation):
+            return
+        end = JOURNAL_HEADER.size
+        while end + RECORD_SIZE <= len(data):
+            record = data[end:end + JOURNAL_RECORD.size]
+            if JOURNAL_CHECKSUM.unpack_from(data, end + JOURNAL_RECORD.size)[0] != zlib.crc32(record):
+                break
+            operation, index, x, y = JOURNAL_RECORD.unpack(record)
+            if operation == APPEND:
+                self.pushPoint((x, y))
+            elif operation == DELETE:
+                self.points[index:self.count - 1] = self.points[index + 1:self.count]
+                self.count -= 1
+            elif operation == MOVE:
+                self.points[index] = x, y
+            elif operation == CLEAR:
+                self.count = 0
+            elif operation == INSERT:
+                self.pushPoint((x, y))
+                self.points[index + 1:self.count] = self.points[index:self.count - 1].copy()
+                self.points[index] = x, y
+            self.pending += 1
+            end += RECORD_SIZE
+        if end < len(data):
+            with open(self.journalPath, 'r+b') as file:
+                file.truncate(end)
+
+    # Opens the journal for appending, first replacing it with an empty one of the current generation if reset is set (or if
+    # it doesn't belong to the current snapshot).
+    def openJournal(self, reset=False):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if reset or not os.path.isfile(self.journalPath) or os.path.getsize(self.journalPath) < JOURNAL_HEADER.size:
+            header = JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.generation)
+            writeAtomically(self.journalPath, lambda file: file.write(header))
+        else:
+            with open(self.journalPath, 'rb') as file:
+                if JOURNAL_HEADER.unpack(file.read(JOURNAL_HEADER.size)) != (JOURNAL_MAGIC, self.generation):
+                    return self.openJournal(reset=True)
+        self.journal = open(self.journalPath, 'ab')
+
+    # Appends an edit to the journal's buffer (see flush()), compacting the journal when it's long enough.
+    def record(self, operation, index=0, point=(0.0, 0.0)):
+        if self.path is None:
+            return
+        if self.journal is None:
+            self.openJournal()
+        record = JOURNAL_RECORD.pack(operation, index, point[0], point[1])
+        self.journal.write(record + JOURNAL_CHECKSUM.pack(zlib.crc32(record)))
+        self.pending += 1
+        if self.pending >= COMPACT_INTERVAL:
+            self.save()
+
+    def pushPoint(self, point):
+        if self.count == len(self.points):
+            self.points = np.concatenate((self.points, np.empty_like(self.points)))
+        self.points[self.count] = point
+        self.count += 1
+
+    def checkIndex(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError('Point index ' + str(index) + ' is out of range')
+        return index % self.count
+
+
+# Spatial index of the points of one image, in the same order as its PointStore (e.g. by file order index), for hit-testing
+# clicks in Move / Delete mode and detecting duplicate points without scanning every point. Points are bucketed into a uniform
+# grid of cellSize x cellSize cells, so a query only visits the few cells its radius overlaps - constant time for a given
+# radius, however many points there are. Appending, deleting the last point and moving a point are O(1); inserting or
+# deleting before the end renumbers the indices after it, like the point lists themselves.
+class PointIndex:
+    def __init__(self, cellSize=INDEX_CELL_SIZE):
+        if cellSize <= 0:
+            raise ValueError('Input cellSize must be greater than 0')
+        self.cellSize = cellSize
+        self.points = []
+        self.cells = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def setPoints(self, points):
+        self.points = [(x, y) for x, y in points]
+        self.cells = {}
+        for index, point in enumerate(self.points):
+            self.cells.setdefault(self.getCell(point), []).append(index)
+
+    def insert(self, index, point):
+        if not 0 <= index <= len(self.points):
+            raise IndexError('Point index ' + str(index) + ' is out of range')
+        if index < len(self.points):
+            self.shiftIndices(index, 1)
+        self.points.insert(index, (point[0], point[1]))
+        self.cells.setdefault(self.getCell(point), []).append(index)
+
+    def delete(self, index):
+        self.checkIndex(index)
+        self.removeFromCell(self.points.pop(index), index)
+        if index < len(self.points):
+            self.shiftIndices(index + 1, -1)
+
+    def move(self, index, point):
+        self.checkIndex(index)
+        self.removeFromCell(self.points[index], index)
+        self.points[index] = (point[0], point[1])
+        self.cells.setdefault(self.getCell(point), []).append(index)
+
+    def clear(self):
+        self.points = []
+        self.cells = {}
+
+    # Returns the indices of the points within radius of the given point along both axes (i.e. inside the square of side
+    # 2 * radius centered on it, the area a point is drawn over), in ascending order.
+    def within(self, point, radius):
+        x, y = point
+        indices = []
+        for cellX in range(int((x - radius) // self.cellSize), int((x + radius) // self.cellSize) + 1):
+            for cellY in range(int((y - radius) // self.cellSize), int((y + radius) // self.cellSize) + 1):
+                for index in self.cells.get((cellX, cellY), ()):
+                    pointX, pointY = self.points[index]
+                    if abs(pointX - x) <= radius and abs(pointY - y) <= radius:
+                        indices.append(index)
+        return sorted(indices)
+
+    # Returns the index of the closest point (by euclidean distance, then lowest index) within radius of the given point
+    # along both axes, or None if there is none. A radius of 0 finds a point at the exact same position.
+    def nearest(self, point, radius):
+        x, y = point
+        nearestIndex, nearestDistance = None, None
+        for index in self.within(point, radius):
+            distance = (self.points[index][0] - x) ** 2 + (self.points[index][1] - y) ** 2
+            if nearestDistance is None or distance < nearestDistance:
+                nearestIndex, nearestDistance = index, distance
+        return nearestIndex
+
+    def getCell(self, point):
+        return int(point[0] // self.cellSize), int(point[1] // self.cellSize)
+
+    def removeFromCell(self, point, index):
+        cell = self.getCell(point)
+        self.cells[cell].remove(index)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    # Adds offset to every index from start on, after a point was inserted or deleted before them.
+    def shiftIndices(self, start, offset):
+        for indices in self.cells.values():
+            for position, index in enumerate(indices):
+                if index >= start:
+                    indices[position] = index + offset
+
+    def checkIndex(self, index):
+        if not 0 <= index < len(self.points):
+            raise IndexError('Point index ' + str(index) + ' is out of range')
+
+
+# Undo / redo history of point edits (command pattern). Each command holds what it needs to apply and revert its edit on an
+# editor - the object holding the points, e.g. the GUI - through a handful of editor methods (addTempPoint(), removeTempPoint(),
+# insertPointPairs(), deletePointPairs(), movePoint(), getPointState(), setPointState() and flushEdits()), so undoing or redoing
+# an edit only touches the points it changed instead of reloading them. The history keeps the last HISTORY_LIMIT commands, and
+# the editor persists each one at once (flushEdits()) however many points it changed.
+class EditHistory:
+    def __init__(self, editor, limit=HISTORY_LIMIT):
+        self.editor = editor
+        self.undoStack = deque(maxlen=limit)
+        self.redoStack = []
+
+    # Applies a new command and records it, which discards any undone commands.
+    def do(self, command):
+        command.apply(self.editor)
+        self.editor.flushEdits()
+        self.undoStack.append(command)
+        self.redoStack.clear()
+        return command
+
+    # Records a command that takes over the last count commands of the given kind still in the history, e.g. a confirmed point
+    # pair that replaces the placement of its two temporary points, so that undoing it reverts them all at once. The commands
+    # recorded after those keep their order. Applies the command.
+    def replace(self, kind, count, command):
+        kept = []
+        while count and self.undoStack:
+            replaced = self.undoStack.pop()
+            if isinstance(replaced, kind):
+                count -= 1
+            else:
+                kept.append(replaced)
+        self.undoStack.extend(reversed(kept))
+        return self.do(command)
+
+    # Reverts the last command and returns it (None when there is nothing to undo).
+    def undo(self):
+        if not self.undoStack:
+            return None
+        command = self.undoStack.pop()
+        command.revert(self.editor)
+        self.editor.flushEdits()
+        self.redoStack.append(command)
+        return command
+
+    # Applies the last undone command again and returns it (None when there is nothing to redo).
+    def redo(self):
+        if not self.redoStack:
+            return None
+        command = self.redoStack.pop()
+        command.apply(self.editor)
+        self.editor.flushEdits()
+        self.undoStack.append(command)
+        return command
+
+    # Returns the last command that can be undone, or None.
+    def peek(self):
+        return self.undoStack[-1] if self.undoStack else None
+
+    def clear(self):
+        self.undoStack.clear()
+        self.redoStack.clear()
+
+
+# Places a temporary (unconfirmed) point on the left or right image.
+class AddTempPoint:
+    def __init__(self, side, point):
+        self.name = side.lower() + ' temporary point'
+        self.side = side
+        self.point = point
+
+    def apply(self, editor):
+        editor.addTempPoint(self.side, self.point)
+
+    def revert(self, editor):
+        editor.removeTempPoint(self.side)
+
+
+# Adds point pairs at the given index (e.g. a confirmed pair, or the corners added by autoCorner()).
+class AddPointPairs:
+    def __init__(self, index, leftPoints, rightPoints, name='confirmed point pair'):
+        self.name = name
+        self.index = index
+        self.leftPoints = leftPoints
+        self.rightPoints = rightPoints
+
+    def apply(self, editor):
+        editor.insertPointPairs(self.index, self.leftPoints, self.rightPoints)
+
+    def revert(self, editor):
+        editor.deletePointPairs(self.index, len(self.leftPoints))
+
+
+# Deletes the point pair at the given index, keeping its points (and whether it was saved before this session) to restore it.
+class DeletePointPair:
+    def __init__(self, index, leftPoint, rightPoint, saved):
+        self.name = 'point pair deletion'
+        self.index = index
+        self.leftPoint = leftPoint
+        self.rightPoint = rightPoint
+        self.saved = saved
+
+    def apply(self, editor):
+        editor.deletePointPairs(self.index, 1)
+
+    def revert(self, editor):
+        editor.insertPointPairs(self.index, [self.leftPoint], [self.rightPoint], self.saved)
+
+
+# Moves the left or right point of the pair at the given index from one position to another.
+class MovePoint:
+    def __init__(self, index, side, oldPoint, newPoint):
+        self.name = side.lower() + ' point move'
+        self.index = index
+        self.side = side
+        self.oldPoint = oldPoint
+        self.newPoint = newPoint
+
+    def apply(self, editor):
+        editor.movePoint(self.index, self.side, self.newPoint)
+
+    def revert(self, editor):
+        editor.movePoint(self.index, self.side, self.oldPoint)
+
+
+# Replaces every point at once (e.g. a reset or a bulk import), switching between two states of getPointState().
+class ReplacePoints:
+    def __init__(self, oldState, newState, name='point reset'):
+        self.name = name
+        self.oldState = oldState
+        self.newState = newState
+
+    def apply(self, editor):
+        editor.setPointState(self.newState)
+
+    def revert(self, editor):
+        editor.setPointState(self.oldState)
@@ -0,0 +1,83 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+import os
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np                                  # pip install numpy
+
+# Module  level  Variables
+#######################################################
+POOL_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Default worker count - leaves one core free for the GUI / main process
+
+
+# Initializer for every worker process of the pool.
+# Imports NumPy, SciPy and PIL ahead of time so that the first morph submitted to a worker doesn't pay for it.
+def warmWorker():
+    import numpy                # noqa: F401
+    import scipy.spatial        # noqa: F401
+    import PIL.ImageDraw        # noqa: F401
+    import Morphing             # noqa: F401
+
+
+# Starts the long-lived worker pool that is reused across all blends.
+# Creating it once (e.g. when the application starts) avoids spawning and tearing down processes for every frame.
+def createPool(workers=None):
+    # Forked workers must inherit this process' resource tracker. Otherwise the first worker to attach to a shared Morpher
+    # starts a tracker of its own, which unlinks the shared images as soon as that worker exits.
+    if os.name == 'posix':
+        resource_tracker.ensure_running()
+    return multiprocessing.Pool(workers or POOL_WORKERS, initializer=warmWorker)
+
+
+# Shuts a pool down without waiting on tasks that are still running (e.g. when the application is closed mid-blend).
+def closePool(pool):
+    pool.terminate()
+    pool.join()
+
+
+# Task executed by the pool's workers: renders a single frame of a morph.
+def renderFrame(morpher, alpha):
+    return morpher.getImageAtAlpha(alpha)
+
+
+# Task form of renderFrame() for imap_unordered(): takes a (morpher, index, alpha) tuple and returns (index, frame),
+# so that frames finishing out of order can be slotted back into their place in the sequence.
+def renderIndexedFrame(task):
+    morpher, index, alpha = task
+    return index, morpher.getImageAtAlpha(alpha)
+
+
+# Renders a single frame with every worker of the pool: the frame is split into horizontal tiles (one per worker, unless
+# tiles is given), each rendered by one worker straight into a shared output buffer. The label map is rasterized once,
+# serially in this process, and shared with the workers as well - it isn't part of the parallel speedup.
+def renderTiledFrame(pool, morpher, alpha, tiles=None):
+    tiles = tiles or pool._processes
+    targetVertices, leftInvH, rightInvH, valid = morpher.getTransforms(alpha)
+    labelMap = morpher.getLabelMap(alpha, targetVertices, valid)
+    labelMemory = shared_memory.SharedMemory(create=True, size=max(1, labelMap.nbytes))
+    outMemory = shared_memory.SharedMemory(create=True, size=max(1, morpher.leftImage.nbytes))
+    try:
+        np.ndarray(labelMap.shape, dtype=labelMap.dtype, buffer=labelMemory.buf)[...] = labelMap
+        bounds = np.linspace(0, labelMap.shape[0], min(tiles, labelMap.shape[0]) + 1).astype(int)
+        pool.starmap(renderTile, [(morpher, alpha, (start, stop), labelMemory.name, outMemory.name)
+                                  for start, stop in zip(bounds[:-1], bounds[1:]) if start < stop])
+        return np.array(np.ndarray(morpher.leftImage.shape, dtype=np.uint8, buffer=outMemory.buf))
+    finally:
+        for memory in (labelMemory, outMemory):
+            memory.close()
+            memory.unlink()
+
+
+# Task executed by the pool's workers for renderTiledFrame(): renders one tile (a range of rows) of a shared frame.
+def renderTile(morpher, alpha, rows, labelName, outName):
+    labelMemory = shared_memory.SharedMemory(name=labelName)
+    outMemory = shared_memory.SharedMemory(name=outName)
+    labelMap = np.ndarray(morpher.leftImage.shape[:2], dtype=np.int32, buffer=labelMemory.buf)
+    out = np.ndarray(morpher.leftImage.shape, dtype=np.uint8, buffer=outMemory.buf)
+    morpher.getImageAtAlpha(alpha, out=out, rows=rows, labelMap=labelMap)
+    del labelMap, out
+    labelMemory.close()
+    outMemory.close()
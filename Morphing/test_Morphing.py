@@ -0,0 +1,283 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+# Checks the output of Morpher.getImageAtAlpha() against reference frames, its peak memory against the bounds documented on
+# the Morpher class, and that Morpher.updateImageAtAlpha() matches a full render after every kind of mesh edit.
+# Triangulation is checked against SciPy's Delaunay triangulation of the same points after every kind of edit.
+# Run with: python -m pytest Morphing
+
+import tracemalloc
+import numpy as np                                  # pip install numpy
+import pytest                                       # pip install pytest
+from scipy.spatial import ConvexHull, Delaunay      # pip install scipy
+
+import Morphing
+from Morphing import BAND_PIXELS, Morpher, Triangulation, attachMorpher, attachedMorphers, detachMorpher
+
+
+def newMorpher(shape, offset=5):
+    generator = np.random.default_rng(0)
+    height, width = shape[:2]
+    corners = [[0, 0], [width - 1, 0], [0, height - 1], [width - 1, height - 1]]
+    leftPoints = np.concatenate((corners, generator.uniform(0, (width - 1, height - 1), (40, 2))))
+    rightPoints = np.clip(leftPoints + generator.normal(0, offset, leftPoints.shape), 0, (width - 1, height - 1))
+    triangulation = Triangulation(leftPoints, rightPoints)
+    leftImage = generator.integers(0, 256, shape, dtype=np.uint8)
+    rightImage = generator.integers(0, 256, shape, dtype=np.uint8)
+    return Morpher(leftImage, triangulation.getMesh(), rightImage)
+
+
+# Returns the peak of the memory allocated while rendering the given alpha, in bytes.
+def peakMemory(morpher, alpha, scratch):
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        morpher.getImageAtAlpha(alpha, scratch=scratch)
+        return tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('shape', [(1500, 1500), (1500, 1500, 3), (1500, 1500, 4)])
+def test_getImageAtAlphaPeakMemory(shape):
+    morpher = newMorpher(shape)
+    scratch = morpher.newScratch()
+    channels = shape[2] if len(shape) == 3 else 1
+    imageBytes = morpher.leftImage.nbytes
+    bandBytes = BAND_PIXELS * (64 + 16 * channels)
+
+    # New alpha: the output frame, plus the label map twice while it's handed over from PIL
+    assert peakMemory(morpher, 0.5, scratch) <= (1 + 8 / channels) * imageBytes + bandBytes
+
+    # labelCache keeps the label map of the last alpha: 4 / C times one input image
+    cachedAlpha, labelMap = morpher.labelCache
+    assert cachedAlpha == 0.5
+    assert labelMap.nbytes == 4 / channels * imageBytes
+
+    # Same alpha again: only the output frame
+    assert peakMemory(morpher, 0.5, scratch) <= imageBytes + bandBytes
+
+
+# The endpoints are the input images, exactly
+@pytest.mark.parametrize('shape', [(120, 160), (120, 160, 3), (120, 160, 4)])
+def test_getImageAtAlphaEndpoints(shape):
+    morpher = newMorpher(shape)
+    assert np.array_equal(morpher.getImageAtAlpha(0), morpher.leftImage)
+    assert np.array_equal(morpher.getImageAtAlpha(1), morpher.rightImage)
+
+
+# With identical meshes the warp is the identity, so every frame is the plain cross-dissolve
+@pytest.mark.parametrize('alpha', [0.25, 0.5, 0.731])
+def test_getImageAtAlphaCrossDissolve(alpha):
+    morpher = newMorpher((120, 160, 3), offset=0)
+    leftImage, rightImage = morpher.leftImage.astype(np.float32), morpher.rightImage.astype(np.float32)
+    reference = (leftImage * (1 - alpha) + rightImage * alpha).astype(np.uint8)
+    assert np.array_equal(morpher.getImageAtAlpha(alpha), reference)
+
+
+# Every channel of a color morph matches a grayscale morph of that channel alone
+def test_getImageAtAlphaPerChannel():
+    morpher = newMorpher((120, 160, 3), offset=6)
+    frame = morpher.getImageAtAlpha(0.3)
+    for channel in range(3):
+        reference = Morpher(np.ascontiguousarray(morpher.leftImage[..., channel]), morpher.mesh,
+                            np.ascontiguousarray(morpher.rightImage[..., channel])).getImageAtAlpha(0.3)
+        assert np.array_equal(frame[..., channel], reference)
+
+
+# A worker drops its mapping of a released Morpher as soon as it attaches to the next one
+def test_attachMorpherDetachesReleased():
+    first, second = newMorpher((60, 80, 3)), newMorpher((60, 80, 3))
+    try:
+        firstHandle, secondHandle = first.share(), second.share()
+        attached = attachMorpher(firstHandle)
+        assert np.array_equal(attached.getImageAtAlpha(0.4), first.getImageAtAlpha(0.4))
+        first.release()
+        attachMorpher(secondHandle)
+        assert firstHandle not in attachedMorphers and secondHandle in attachedMorphers
+        with pytest.raises(FileNotFoundError):
+            attachMorpher(firstHandle)
+        assert firstHandle not in attachedMorphers
+    finally:
+        first.release()
+        second.release()
+        for handle in list(attachedMorphers):
+            detachMorpher(handle)
+
+
+# Renders the frame of a morph before and after the given edit of its Triangulation, and returns the frame updated by
+# Morpher.updateImageAtAlpha(), the frame of a full render of the edited mesh, and whether the update fell back to a full render.
+def updateAfterEdit(edit, alpha=0.4):
+    generator = np.random.default_rng(1)
+    height, width = 90, 120
+    corners = [[0, 0], [width - 1, 0], [0, height - 1], [width - 1, height - 1]]
+    leftPoints = np.concatenate((corners, generator.uniform(0, (width - 1, height - 1), (30, 2))))
+    rightPoints = np.clip(leftPoints + generator.normal(0, 4, leftPoints.shape), 0, (width - 1, height - 1))
+    leftImage = generator.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    rightImage = generator.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    triangulation = Triangulation(leftPoints, rightPoints)
+    before = Morpher(leftImage, triangulation.getMesh(), rightImage)
+    previousFrame = before.getImageAtAlpha(alpha)
+    edit(triangulation)
+    after = Morpher(leftImage, triangulation.getMesh(), rightImage)
+    reference = after.getImageAtAlpha(alpha)
+    fullRenders = []
+    getImageAtAlpha = after.getImageAtAlpha
+    after.getImageAtAlpha = lambda *args, **kwargs: fullRenders.append(args) or getImageAtAlpha(*args, **kwargs)
+    frame = after.updateImageAtAlpha(alpha, previousFrame, before.leftVertices, before.rightVertices)
+    return frame, reference, bool(fullRenders)
+
+
+# Local edits only re-render the window they touched, and the result is identical to a full render
+@pytest.mark.parametrize('edit', [
+    lambda triangulation: triangulation.movePoint(10, leftPoint=triangulation.leftPoints[10] + (6, -4)),
+    lambda triangulation: triangulation.movePoint(11, rightPoint=triangulation.rightPoints[11] + (-3, 5)),
+    lambda triangulation: triangulation.deletePoint(12),
+    lambda triangulation: triangulation.insertPoint(12, (60.5, 40.25), (62, 39)),
+    lambda triangulation: triangulation.movePoint(0, leftPoint=(12, 9), rightPoint=(10, 7)),  # Hull point (a corner)
+], ids=['moveLeft', 'moveRight', 'delete', 'add', 'hull'])
+def test_updateImageAtAlphaMatchesFullRender(edit):
+    frame, reference, fullRender = updateAfterEdit(edit)
+    assert not fullRender
+    assert np.array_equal(frame, reference)
+
+
+# Edits whose window covers the whole frame, or that reorder the surviving triangles (or their vertices, e.g. a rebuild of
+# the mesh from reversed points), still match a full render - the latter by falling back to one
+@pytest.mark.parametrize('edit, expectFullRender', [
+    (lambda triangulation: triangulation.setPoints(triangulation.leftPoints, triangulation.rightPoints + (1.5, -2)), False),
+    (lambda triangulation: triangulation.setPoints(triangulation.leftPoints[::-1], triangulation.rightPoints[::-1]), True),
+], ids=['wholeFrame', 'reordered'])
+def test_updateImageAtAlphaFallback(edit, expectFullRender):
+    frame, reference, fullRender = updateAfterEdit(edit)
+    assert fullRender == expectFullRender
+    assert np.array_equal(frame, reference)
+
+
+# Returns the triangles of a stack of simplices as a sorted list of sorted index triples, to compare triangulations.
+def triangleSet(simplices):
+    return sorted(tuple(sorted(simplex)) for simplex in np.asarray(simplices).tolist())
+
+
+# Checks that a Triangulation is a Delaunay triangulation of its points: counter-clockwise triangles covering exactly their
+# convex hull, none of whose circumcircles contains a point, as many as SciPy finds. Points in general position have a single
+# Delaunay triangulation, so with exact the triangles must also be SciPy's.
+def assertDelaunay(triangulation, exact=False):
+    points, simplices = triangulation.leftPoints, triangulation.simplices
+    unique = np.unique(points, axis=0)
+    if len(unique) < 3 or np.linalg.matrix_rank(unique[1:] - unique[0]) < 2:
+        assert len(simplices) == 0
+        return
+    reference = Delaunay(points)
+    vertices = points[simplices]
+    areas = Morphing.triangleAreas(vertices)
+    assert (areas > 0).all()
+    assert np.isclose(areas.sum(), ConvexHull(points).volume)
+    assert len(simplices) == len(reference.simplices)
+    # Lifted in-circle determinant of every point against every triangle, positive for a point inside of its circumcircle
+    offsets = vertices[:, np.newaxis, :, :] - points[np.newaxis, :, np.newaxis, :]
+    lifted = np.concatenate((offsets, (offsets ** 2).sum(axis=3, keepdims=True)), axis=3)
+    assert (np.linalg.det(lifted) <= 1e-9 * np.abs(offsets).max() ** 4).all()
+    if exact:
+        assert triangleSet(simplices) == triangleSet(reference.simplices)
+
+
+# Points in general position: built, grown one point at a time (through Qhull's incremental mode, then through local insertions
+# once the mesh has been edited), shrunk from the inside and from the hull, and moved - always SciPy's triangulation
+def test_TriangulationMatchesDelaunay():
+    generator = np.random.default_rng(2)
+    points = generator.uniform(0, 100, (40, 2))
+    triangulation = Triangulation(points[:4], points[:4])
+    assertDelaunay(triangulation, exact=True)
+    for point in points[4:20]:
+        triangulation.addPoints(point, point)
+        assertDelaunay(triangulation, exact=True)
+    for index in (5, 0, 11):
+        triangulation.deletePoint(index)
+        assertDelaunay(triangulation, exact=True)
+    for point in points[20:]:
+        triangulation.addPoints(point, point)
+        assertDelaunay(triangulation, exact=True)
+    triangulation.insertPoint(3, (50.5, 49.5), (50.5, 49.5))
+    assertDelaunay(triangulation, exact=True)
+    for index, point in ((7, (10.25, 80.5)), (3, (-20.0, 50.0)), (12, (60.75, 30.5))):  # (-20, 50) lies outside of the hull
+        triangulation.movePoint(index, point, point)
+        assertDelaunay(triangulation, exact=True)
+
+
+# Every point of the hull deleted one after the other, down to the last triangle
+def test_TriangulationRemovesHullPoints():
+    generator = np.random.default_rng(3)
+    points = generator.uniform(0, 100, (25, 2))
+    triangulation = Triangulation(points, points)
+    while len(triangulation) > 3:
+        triangulation.deletePoint(int(ConvexHull(triangulation.leftPoints).vertices[0]))
+        assertDelaunay(triangulation, exact=True)
+
+
+# Cocircular points (a grid) have many Delaunay triangulations - any of them will do, but it must remain one after every edit
+def test_TriangulationCocircularGrid():
+    grid = np.stack(np.meshgrid(np.arange(6) * 10.0, np.arange(5) * 10.0), axis=2).reshape(-1, 2)
+    triangulation = Triangulation(grid, grid)
+    assertDelaunay(triangulation)
+    for index in (14, 0, 9):  # Interior, corner and edge points of the grid
+        triangulation.deletePoint(index)
+        assertDelaunay(triangulation)
+    for point in ((10.0, 10.0), (0.0, 0.0), (25.0, 25.0), (60.0, 20.0)):
+        triangulation.addPoints(point, point)
+        assertDelaunay(triangulation)
+    triangulation.movePoint(3, (15.0, 15.0), (15.0, 15.0))
+    assertDelaunay(triangulation)
+
+
+# Duplicates of a point are left out of the mesh (like Qhull does), and take its place once it's deleted
+def test_TriangulationDuplicates():
+    generator = np.random.default_rng(4)
+    points = generator.uniform(0, 100, (12, 2))
+    points = np.concatenate((points, points[[2, 5]]))
+    triangulation = Triangulation(points, points)
+    assertDelaunay(triangulation)
+    assert not np.isin([12, 13], triangulation.simplices).any()
+    triangulation.addPoints(points[7], points[7])
+    assertDelaunay(triangulation)
+    assert not np.isin(14, triangulation.simplices).any()
+    triangulation.deletePoint(2)
+    assertDelaunay(triangulation)
+    assert np.isin(11, triangulation.simplices).any()  # The duplicate of point 2 (which was index 12)
+
+
+# Three points make one triangle, two (or three collinear ones) make none, and a third point brings the triangle back
+def test_TriangulationDegenerateTransitions():
+    triangulation = Triangulation([[0, 0], [10, 0], [0, 10]], [[0, 0], [10, 0], [0, 10]])
+    assert len(triangulation.simplices) == 1
+    triangulation.deletePoint(1)
+    assert len(triangulation.simplices) == 0
+    triangulation.addPoints([0, 5], [0, 5])  # Collinear with the other two
+    assert len(triangulation.simplices) == 0
+    triangulation.movePoint(2, (10, 0), (10, 0))
+    assertDelaunay(triangulation, exact=True)
+    assert len(triangulation.simplices) == 1
+    triangulation.deletePoint(0)
+    triangulation.insertPoint(0, (0, 0), (0, 0))
+    assertDelaunay(triangulation, exact=True)
+    assert len(triangulation.simplices) == 1
+
+
+# Local updates that fail the area check rebuild the mesh, which is then just as valid
+def test_TriangulationAreaCheckFallback(monkeypatch):
+    monkeypatch.setattr(Morphing, 'AREA_TOLERANCE', -1.0)  # Fails every area check
+    builds = []
+    build = Triangulation.build
+    monkeypatch.setattr(Triangulation, 'build', lambda self, exclude=None: builds.append(exclude) or build(self, exclude))
+    generator = np.random.default_rng(5)
+    points = generator.uniform(0, 100, (20, 2))
+    triangulation = Triangulation(points, points)
+    triangulation.deletePoint(4)
+    assert builds[-1] == 4
+    assertDelaunay(triangulation, exact=True)
+    del builds[:]
+    triangulation.addPoints([50.5, 50.5], [50.5, 50.5])
+    assert builds == [None]
+    assertDelaunay(triangulation, exact=True)
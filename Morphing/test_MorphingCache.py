@@ -0,0 +1,90 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+# Checks the on-disk frame stores of MorphingCache.py.
+# Run with: python -m pytest Morphing
+
+import os
+import numpy as np                                  # pip install numpy
+
+from Morphing import Morpher, Triangulation
+from MorphingCache import FrameStore, RenderCache, checkpointedFrames, frameKey, morphDigest
+
+
+def newFrame(value):
+    return np.full((4, 6), value, dtype=np.uint8)
+
+
+def newMorpher(middle=(7, 5)):
+    points = [[0, 0], [15, 0], [0, 11], [15, 11], list(middle)]
+    image = np.arange(12 * 16, dtype=np.uint8).reshape(12, 16)
+    return Morpher(image, Triangulation(points, points).getMesh(), image[::-1].copy())
+
+
+# Stands in for a Morpher: renders flat frames of value 100 * alpha, and records every alpha it's asked to render.
+class RecordingMorpher:
+    def __init__(self):
+        self.rendered = []
+
+    def iterFrames(self, alphas, pool=None, readAhead=None):
+        for alpha in alphas:
+            self.rendered.append(alpha)
+            yield newFrame(100 * alpha)
+
+
+# A resumed job only renders the frames missing from its checkpoint, and yields every frame in order
+def test_checkpointedFramesResumes(tmp_path):
+    alphas = [0, 0.25, 0.5, 0.75, 1]
+    store = FrameStore(str(tmp_path), 'job')
+    for index in (0, 2, 3):
+        store.save(index, newFrame(100 * alphas[index]))
+    morpher = RecordingMorpher()
+
+    frames = list(checkpointedFrames(store, morpher, alphas))
+    assert morpher.rendered == [0.25, 1]
+    assert [frame[0, 0] for frame in frames] == [0, 25, 50, 75, 100]
+    assert store.getMissing(len(alphas)) == []
+
+    # Once complete, a re-run renders nothing
+    morpher = RecordingMorpher()
+    assert [frame[0, 0] for frame in checkpointedFrames(store, morpher, alphas)] == [0, 25, 50, 75, 100]
+    assert morpher.rendered == []
+
+
+# Lookups are counted as hits or misses, and replacing a frame doesn't count its size twice
+def test_renderCacheAccounting(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    assert cache.get('frame') is None
+    cache.put('frame', newFrame(1))
+    cache.put('frame', newFrame(2))
+    assert cache.get('frame')[0, 0] == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.getStatistics() == '1 hit(s), 1 miss(es)'
+    assert cache.size == os.path.getsize(cache.getPath('frame'))
+    assert RenderCache(str(tmp_path)).size == cache.size
+
+
+# Eviction removes the least recently used frames first, where reading a frame counts as using it
+def test_renderCacheEvictsLeastRecentlyUsed(tmp_path):
+    frameSize = RenderCache(str(tmp_path / 'probe'))
+    frameSize.put('probe', newFrame(0))
+    frameSize = frameSize.size
+    cache = RenderCache(str(tmp_path / 'cache'), limit=int(3.5 * frameSize))
+    for age, key in enumerate(('a', 'b', 'c'), 1):
+        cache.put(key, newFrame(age))
+        os.utime(cache.getPath(key), ns=(age * 10 ** 9, age * 10 ** 9))
+    cache.get('a')
+    cache.put('d', newFrame(4))
+    assert [cache.has(key) for key in ('a', 'b', 'c', 'd')] == [True, False, True, True]
+    assert cache.size == 3 * frameSize
+
+
+# Frame keys only depend on the morph's contents and the alpha, and don't change between sessions (which would orphan the cache)
+def test_frameKeyStability():
+    assert frameKey('0' * 40, 0.5) == '3c714bcb80f32aab5c5266e3403dbd48f7736c7f'
+    assert frameKey('0' * 40, 1 / 2) == frameKey('0' * 40, np.float64(0.5)) == frameKey('0' * 40, 0.5)
+    assert frameKey('0' * 40, 0.5) != frameKey('0' * 40, 0.501)
+    assert morphDigest(newMorpher()) == morphDigest(newMorpher())
+    assert morphDigest(newMorpher()) != morphDigest(newMorpher((8, 5)))
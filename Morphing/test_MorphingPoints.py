@@ -0,0 +1,200 @@
+#######################################################
+#            Author:     David Dowd
+#            Email:      ddowd97@gmail.com
+#######################################################
+
+# Checks the journaled point stores of MorphingPoints.py (replaying, recovering from a torn journal, compacting and importing)
+# and the undo / redo history of point edits.
+# Run with: python -m pytest Morphing
+
+import os
+import numpy as np                                  # pip install numpy
+import pytest                                       # pip install pytest
+
+from Morphing import loadMesh
+from MorphingPoints import COMPACT_INTERVAL, HISTORY_LIMIT, JOURNAL_HEADER, RECORD_SIZE, PointStore, formatPointText
+from MorphingPoints import EditHistory, AddTempPoint, AddPointPairs, DeletePointPair, MovePoint, ReplacePoints
+
+
+# Makes a store of a few points and edits it with every journaled operation, leaving the edits in the journal only.
+def newEditedStore(path):
+    store = PointStore(path)
+    for point in ((1, 2), (3, 4), (5, 6), (7, 8)):
+        store.append(point)
+    store.insert(1, (9, 10))
+    store.move(3, (11.5, 12.25))
+    store.delete(0)
+    store.flush()
+    return store
+
+
+# A store that wasn't closed (e.g. PIM crashed) is rebuilt from its journal
+def test_pointStoreReplaysJournal(tmp_path):
+    path = str(tmp_path / 'Image-jpg.txt')
+    store = newEditedStore(path)
+    assert not os.path.isfile(store.snapshotPath)
+    assert np.array_equal(PointStore(path).getPoints(), [[9, 10], [3, 4], [11.5, 12.25], [7, 8]])
+
+    store.clear()
+    store.append((13, 14))
+    store.flush()
+    assert np.array_equal(PointStore(path).getPoints(), [[13, 14]])
+
+
+# A record torn or corrupted by a crash is cut off with everything after it, and the journal carries on from there
+@pytest.mark.parametrize('damage', ['truncate', 'corrupt'])
+def test_pointStoreRecoversTornJournal(tmp_path, damage):
+    path = str(tmp_path / 'Image-jpg.txt')
+    journalPath = newEditedStore(path).journalPath  # Never closed, like a crash
+    journalSize = os.path.getsize(journalPath)
+    with open(journalPath, 'r+b') as file:
+        if damage == 'truncate':
+            file.truncate(journalSize - RECORD_SIZE // 2)
+        else:
+            file.seek(journalSize - RECORD_SIZE + 3)
+            file.write(b'\xff')
+
+    store = PointStore(path)  # The last edit (deleting the first point) is lost
+    assert np.array_equal(store.getPoints(), [[1, 2], [9, 10], [3, 4], [11.5, 12.25], [7, 8]])
+    assert os.path.getsize(journalPath) == journalSize - RECORD_SIZE
+    store.delete(4)
+    store.flush()
+    assert np.array_equal(PointStore(path).getPoints(), [[1, 2], [9, 10], [3, 4], [11.5, 12.25]])
+
+
+# Every COMPACT_INTERVAL edits, the journal is folded into a new snapshot (and point file) and started over
+def test_pointStoreCompactsJournal(tmp_path):
+    path = str(tmp_path / 'Image-jpg.txt')
+    store = PointStore(path)
+    for index in range(COMPACT_INTERVAL - 1):
+        store.append((index, index))
+    assert store.generation == 0 and not os.path.isfile(store.snapshotPath)
+    store.append((-1, -1))
+    assert store.generation == 1 and store.pending == 0
+    assert os.path.getsize(store.journalPath) == JOURNAL_HEADER.size
+    assert len(np.loadtxt(path)) == COMPACT_INTERVAL
+    store.move(0, (0.5, 0.5))
+    store.flush()
+    points = PointStore(path).getPoints()
+    assert len(points) == COMPACT_INTERVAL and tuple(points[0]) == (0.5, 0.5) and tuple(points[-1]) == (-1, -1)
+
+
+# The point file is imported when it's newer than both the snapshot and the journal (i.e. edited outside of PIM), and
+# ignored otherwise
+def test_pointStoreImportsNewerText(tmp_path):
+    path = str(tmp_path / 'Image-jpg.txt')
+    store = PointStore(path)
+    store.setPoints([[1, 2], [3, 4], [5, 6]])
+    store.move(0, (7, 8))
+    store.flush()
+    latest = max(os.path.getmtime(store.snapshotPath), os.path.getmtime(store.journalPath))
+
+    os.utime(path, (latest - 10, latest - 10))  # Written by save() before the journaled move
+    assert np.array_equal(PointStore(path).getPoints(), [[7, 8], [3, 4], [5, 6]])
+
+    with open(path, 'w') as file:
+        file.write(formatPointText([[10, 20], [30, 40], [50, 60], [70, 80]]))
+    os.utime(path, (latest + 10, latest + 10))
+    store = PointStore(path)
+    assert np.array_equal(store.getPoints(), [[10, 20], [30, 40], [50, 60], [70, 80]])
+    assert store.generation == 2  # Imported as a new snapshot
+
+
+# A point file left empty by resetting the points can't be loaded as a mesh, which says so
+def test_resetPointFileIsRejected(tmp_path):
+    leftPath, rightPath = str(tmp_path / 'Left-jpg.txt'), str(tmp_path / 'Right-jpg.txt')
+    for path in (leftPath, rightPath):
+        store = PointStore(path)
+        store.setPoints([[0, 0], [10, 0], [0, 10]])
+        store.clear()
+        store.close()
+    with pytest.raises(ValueError, match='fewer than three points'):
+        loadMesh(leftPath, rightPath)
+
+
+# Stands in for the GUI as the editor of an EditHistory: point pairs in lists, the saved (red) ones first.
+class ListEditor:
+    def __init__(self):
+        self.leftPoints, self.rightPoints, self.saved = [(0, 0), (2, 2)], [(1, 1), (3, 3)], 1
+        self.leftTempPoints, self.rightTempPoints = [], []
+        self.flushes = 0
+
+    def addTempPoint(self, side, point):
+        (self.leftTempPoints if side == 'LEFT' else self.rightTempPoints).append(point)
+
+    def removeTempPoint(self, side):
+        (self.leftTempPoints if side == 'LEFT' else self.rightTempPoints).pop()
+
+    def insertPointPairs(self, index, leftPoints, rightPoints, saved=False):
+        self.leftPoints[index:index] = leftPoints
+        self.rightPoints[index:index] = rightPoints
+        self.saved += len(leftPoints) if saved else 0
+
+    def deletePointPairs(self, index, count):
+        self.saved -= max(0, min(index + count, self.saved) - index)
+        del self.leftPoints[index:index + count]
+        del self.rightPoints[index:index + count]
+
+    def movePoint(self, index, side, point):
+        (self.leftPoints if side == 'LEFT' else self.rightPoints)[index] = point
+
+    def getPointState(self):
+        return list(self.leftPoints), list(self.rightPoints), self.saved, list(self.leftTempPoints), list(self.rightTempPoints)
+
+    def setPointState(self, state):
+        leftPoints, rightPoints, self.saved, leftTempPoints, rightTempPoints = state
+        self.leftPoints, self.rightPoints = list(leftPoints), list(rightPoints)
+        self.leftTempPoints, self.rightTempPoints = list(leftTempPoints), list(rightTempPoints)
+
+    def flushEdits(self):
+        self.flushes += 1
+
+
+# Every command changes the points as expected, undoing it restores them and redoing it changes them again - each step
+# persisted once (flushEdits())
+@pytest.mark.parametrize('newCommand, expected', [
+    (lambda editor: AddTempPoint('LEFT', (4, 4)), ([(0, 0), (2, 2)], [(1, 1), (3, 3)], 1, [(4, 4)], [])),
+    (lambda editor: AddPointPairs(1, [(5, 5), (6, 6)], [(7, 7), (8, 8)]), ([(0, 0), (5, 5), (6, 6), (2, 2)], [(1, 1), (7, 7), (8, 8), (3, 3)], 1, [], [])),
+    (lambda editor: DeletePointPair(0, (0, 0), (1, 1), True), ([(2, 2)], [(3, 3)], 0, [], [])),
+    (lambda editor: MovePoint(1, 'RIGHT', (3, 3), (9, 9)), ([(0, 0), (2, 2)], [(1, 1), (9, 9)], 1, [], [])),
+    (lambda editor: ReplacePoints(editor.getPointState(), ((), (), 0, [], [])), ([], [], 0, [], [])),
+], ids=['AddTempPoint', 'AddPointPairs', 'DeletePointPair', 'MovePoint', 'ReplacePoints'])
+def test_editHistoryUndoRedo(newCommand, expected):
+    editor = ListEditor()
+    history = EditHistory(editor)
+    before = editor.getPointState()
+    command = history.do(newCommand(editor))
+    assert editor.getPointState() == expected
+    assert history.undo() is command
+    assert editor.getPointState() == before
+    assert history.redo() is command
+    assert editor.getPointState() == expected
+    assert editor.flushes == 3
+    assert history.undo() is command and history.undo() is None
+
+
+# The history forgets its oldest commands beyond HISTORY_LIMIT
+def test_editHistoryLimit():
+    editor = ListEditor()
+    history = EditHistory(editor)
+    for index in range(HISTORY_LIMIT + 5):
+        history.do(AddTempPoint('LEFT', (index, index)))
+    undone = 0
+    while history.undo() is not None:
+        undone += 1
+    assert undone == HISTORY_LIMIT
+    assert editor.leftTempPoints == [(index, index) for index in range(5)]
+
+
+# A new command discards the commands undone before it
+def test_editHistoryNewCommandClearsRedo():
+    editor = ListEditor()
+    history = EditHistory(editor)
+    history.do(MovePoint(0, 'LEFT', (0, 0), (5, 5)))
+    history.do(MovePoint(1, 'LEFT', (2, 2), (6, 6)))
+    history.undo()
+    command = history.do(AddTempPoint('RIGHT', (7, 7)))
+    assert history.redo() is None
+    assert editor.leftPoints == [(5, 5), (2, 2)]
+    assert history.undo() is command and history.undo().newPoint == (5, 5)
+    assert editor.getPointState() == ([(0, 0), (2, 2)], [(1, 1), (3, 3)], 1, [], [])